@@ -0,0 +1,60 @@
+# Compare XGBClassifier.predict_proba against native Booster.inplace_predict.
+# CLI: python -m benchmarks.bench_booster --data data/customer_churn_synth.csv --artifacts artifacts/
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.features import FeaturePreprocessor
+from src.models import ChurnModel, BoosterModel
+
+BATCH_SIZES = [1, 32, 1024, 100_000]
+
+
+def time_calls(fn, X, repeats):
+    """Return p50/p99 latency in milliseconds for fn(X)"""
+    fn(X)  # warm-up
+    latencies = np.empty(repeats)
+    for i in range(repeats):
+        start = time.perf_counter()
+        fn(X)
+        latencies[i] = time.perf_counter() - start
+    return np.percentile(latencies, 50) * 1e3, np.percentile(latencies, 99) * 1e3
+
+
+def repeats_for(batch_size):
+    return max(5, min(2000, 200_000 // batch_size))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark booster inference paths')
+    parser.add_argument('--data', default='data/customer_churn_synth.csv')
+    parser.add_argument('--artifacts', default='artifacts')
+    parser.add_argument('--nthread', type=int, default=0)
+    args = parser.parse_args()
+
+    data = pd.read_csv(args.data).drop('churned', axis=1)
+    preprocessor = FeaturePreprocessor.load(os.path.join(args.artifacts, 'feature_pipeline.pkl'))
+    X_all = preprocessor.transform(data)
+
+    wrapper = ChurnModel.load(os.path.join(args.artifacts, 'model.pkl'))
+    native = BoosterModel.load(os.path.join(args.artifacts, 'model.ubj'), nthread=args.nthread or None)
+    if args.nthread:
+        wrapper.model.set_params(n_jobs=args.nthread)
+
+    rng = np.random.default_rng(42)
+    print(f"{'batch':>8} {'path':>8} {'p50_ms':>10} {'p99_ms':>10}")
+    for batch_size in BATCH_SIZES:
+        X = X_all[rng.integers(0, len(X_all), size=batch_size)]
+        X32 = np.ascontiguousarray(X, dtype=np.float32)
+        np.testing.assert_allclose(wrapper.predict_proba(X), native.predict_proba(X32), rtol=1e-6)
+        repeats = repeats_for(batch_size)
+        for name, fn, inputs in [('sklearn', wrapper.predict_proba, X), ('native', native.predict_proba, X32)]:
+            p50, p99 = time_calls(fn, inputs, repeats)
+            print(f"{batch_size:>8} {name:>8} {p50:>10.3f} {p99:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+# Compare per-window detect_drift calls with the vectorized detect_drift_windows.
+# CLI: python -m benchmarks.bench_drift --data data/customer_churn_synth.csv --windows 24 --rows 50000
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.drift import detect_drift, detect_drift_windows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark multi-window drift computation')
+    parser.add_argument('--data', default='data/customer_churn_synth.csv')
+    parser.add_argument('--windows', type=int, default=24)
+    parser.add_argument('--rows', type=int, default=50_000, help='Rows per window')
+    args = parser.parse_args()
+
+    data = pd.read_csv(args.data).drop('churned', axis=1)
+    rng = np.random.default_rng(42)
+    ref = data.sample(n=min(len(data), 20_000), random_state=0).reset_index(drop=True)
+    windows = []
+    for k in range(args.windows):
+        window = data.iloc[rng.integers(0, len(data), size=args.rows)].reset_index(drop=True)
+        # Shift a few windows so both drift outcomes are exercised
+        if k % 3 == 0:
+            window['avg_latency_ms'] = window['avg_latency_ms'] * 1.3
+        windows.append(window)
+
+    start = time.perf_counter()
+    expected = [detect_drift(ref, window) for window in windows]
+    loop_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = detect_drift_windows(ref, windows)
+    vectorized_seconds = time.perf_counter() - start
+
+    assert actual == expected, "vectorized reports differ from detect_drift"
+    print(f"windows={args.windows} rows/window={args.rows}")
+    print(f"per-window detect_drift: {loop_seconds:.3f}s")
+    print(f"detect_drift_windows:    {vectorized_seconds:.3f}s")
+    print(f"speedup:                 {loop_seconds / vectorized_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
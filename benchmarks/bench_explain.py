@@ -0,0 +1,61 @@
+# Latency and throughput of per-row explanations (transform + pred_contribs + fold + JSON)
+# at batch sizes 1 and 10k, cold and from the explanation cache.
+# CLI: python -m benchmarks.bench_explain --data data/customer_churn_synth.csv --artifacts artifacts/ --batch-sizes 1,10000
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src import explain
+from src.model_bundle import load_bundle
+
+
+def _timings(fn, repeats):
+    seconds = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        seconds.append(time.perf_counter() - start)
+    return np.array(seconds)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark /explain batches')
+    parser.add_argument('--data', default='data/customer_churn_synth.csv')
+    parser.add_argument('--artifacts', default='artifacts')
+    parser.add_argument('--batch-sizes', default='1,10000')
+    parser.add_argument('--repeats', type=int, default=20)
+    parser.add_argument('--top-k', type=int, default=3)
+    args = parser.parse_args()
+
+    bundle = load_bundle(args.artifacts).warm_up()
+    compiled = bundle.compiled
+    data = pd.read_csv(args.data).drop('churned', axis=1)
+    print(f"model {bundle.version}: {compiled.n_features_out} encoded columns -> {len(compiled.feature_names)} features")
+
+    for batch_size in [int(b) for b in args.batch_sizes.split(',')]:
+        sample = data.sample(n=batch_size, replace=len(data) < batch_size, random_state=0)
+        columns = {f: sample[f].tolist() for f in compiled.feature_names}
+        cache = explain.ExplanationCache(max_entries=max(batch_size, 1))
+        keys = cache.keys_for(columns, compiled.numeric_features, compiled.categorical_features, bundle.version)
+
+        def cold():
+            folded = bundle.explain(compiled.transform_columns(columns))
+            cache.put_many(keys, folded)
+            return explain.encode_explanations(folded, compiled.feature_names, args.top_k)
+
+        def cached():
+            folded = np.array(cache.get_many(cache.keys_for(
+                columns, compiled.numeric_features, compiled.categorical_features, bundle.version)))
+            return explain.encode_explanations(folded, compiled.feature_names, args.top_k)
+
+        for name, fn in [('pred_contribs', cold), ('cache hit', cached)]:
+            seconds = _timings(fn, args.repeats)
+            p50, p99 = np.percentile(seconds, 50) * 1000, np.percentile(seconds, 99) * 1000
+            print(f"batch={batch_size:>6} {name:<14} p50={p50:9.2f}ms p99={p99:9.2f}ms  "
+                  f"{batch_size / np.median(seconds):>12,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+# Open-loop load test of the serving stack: p50/p95/p99 latency, RPS and server CPU per row
+# across batch sizes and concurrency levels, compared against a stored baseline.
+# CLI: python -m benchmarks.bench_load --batch-sizes 1,32,256 --concurrency 1,8,32 --rate 200 --duration 10 \
+#          --out artifacts/bench_load.json [--baseline benchmarks/bench_load_baseline.json] [--save-baseline]
+import argparse
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import requests
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+DEFAULT_BASELINE = os.path.join(ROOT, 'benchmarks', 'bench_load_baseline.json')
+# Metrics compared against the baseline and whether higher is worse
+COMPARED = {'p50_ms': True, 'p95_ms': True, 'p99_ms': True, 'cpu_ms_per_row': True, 'rps': False}
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(port, env=None, timeout=60.0, command=None):
+    """Run src.app:app under uvicorn (or ``command``) and wait until /health answers"""
+    command = command or [sys.executable, '-m', 'uvicorn', 'src.app:app', '--log-level', 'warning']
+    process = subprocess.Popen(
+        command + ['--port', str(port)],
+        cwd=ROOT, env={**os.environ, **(env or {})},
+    )
+    url = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'server exited with code {process.returncode}')
+        try:
+            if requests.get(f'{url}/health', timeout=1).json().get('status') == 'ok':
+                return process, url
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError('server did not become healthy')
+
+
+def cpu_seconds(pid):
+    """User + system CPU of a process from /proc (None where unavailable)"""
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def build_bodies(data_path, batch_size, payload_format, n_bodies=32, seed=0):
+    data = pd.read_csv(data_path).drop('churned', axis=1)
+    rng = np.random.default_rng(seed)
+    bodies = []
+    for _ in range(n_bodies):
+        sample = data.iloc[rng.integers(0, len(data), size=batch_size)]
+        if payload_format == 'columnar':
+            bodies.append(json.dumps(sample.to_dict(orient='list')).encode())
+        else:
+            bodies.append(json.dumps({'data': sample.to_dict(orient='records')}).encode())
+    return bodies
+
+
+def run_level(url, bodies, batch_size, concurrency, rate, duration, server_pid=None):
+    """Send requests at a fixed arrival rate, independent of how fast responses come back
+
+    Latency is measured from each request's scheduled send time, so queueing
+    behind a slow server is counted (no coordinated omission). concurrency
+    caps the number of requests in flight.
+    """
+    local = threading.local()
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+
+    def send(body, scheduled):
+        session = getattr(local, 'session', None)
+        if session is None:
+            session = local.session = requests.Session()
+        try:
+            ok = session.post(f'{url}/predict', data=body, timeout=30,
+                              headers={'Content-Type': 'application/json'}).status_code == 200
+        except requests.RequestException:
+            ok = False
+        with lock:
+            if ok:
+                latencies.append(time.perf_counter() - scheduled)
+            else:
+                errors[0] += 1
+
+    n_requests = max(1, int(rate * duration))
+    cpu_before = cpu_seconds(server_pid) if server_pid else None
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for i in range(n_requests):
+            scheduled = start + i / rate
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(send, bodies[i % len(bodies)], scheduled)
+    wall = time.perf_counter() - start
+    cpu_after = cpu_seconds(server_pid) if server_pid else None
+
+    completed = len(latencies)
+    lat_ms = np.array(latencies) * 1000 if latencies else np.array([np.nan])
+    rows = completed * batch_size
+    return {
+        'batch_size': batch_size,
+        'concurrency': concurrency,
+        'target_rate': rate,
+        'requests': n_requests,
+        'errors': errors[0],
+        'p50_ms': float(np.percentile(lat_ms, 50)),
+        'p95_ms': float(np.percentile(lat_ms, 95)),
+        'p99_ms': float(np.percentile(lat_ms, 99)),
+        'rps': completed / wall,
+        'rows_per_s': rows / wall,
+        'cpu_ms_per_row': ((cpu_after - cpu_before) * 1000 / rows
+                           if cpu_before is not None and cpu_after is not None and rows else None),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Regressions of more than tolerance (relative) against matching baseline levels"""
+    reference = {(r['batch_size'], r['concurrency']): r for r in baseline['results']}
+    regressions = []
+    for result in results:
+        base = reference.get((result['batch_size'], result['concurrency']))
+        if base is None:
+            continue
+        for metric, higher_is_worse in COMPARED.items():
+            new, old = result.get(metric), base.get(metric)
+            if new is None or old is None or not old:
+                continue
+            change = (new - old) / old
+            if (change > tolerance) if higher_is_worse else (change < -tolerance):
+                regressions.append({'batch_size': result['batch_size'], 'concurrency': result['concurrency'],
+                                    'metric': metric, 'baseline': old, 'current': new, 'change': change})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Open-loop load test for /predict')
+    parser.add_argument('--url', help='Target an already running server instead of starting one')
+    parser.add_argument('--data', default=os.path.join(ROOT, 'data', 'customer_churn_synth.csv'))
+    parser.add_argument('--batch-sizes', default='1,32,256')
+    parser.add_argument('--concurrency', default='1,8,32')
+    parser.add_argument('--rate', type=float, default=200.0, help='Requests per second offered at each level')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds per level')
+    parser.add_argument('--format', choices=['rows', 'columnar'], default='rows')
+    parser.add_argument('--out', default=os.path.join(ROOT, 'artifacts', 'bench_load.json'))
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help='Write these results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed relative regression')
+    args = parser.parse_args()
+
+    process = None
+    url, server_pid = args.url, None
+    if url is None:
+        process, url = start_server(_free_port())
+        server_pid = process.pid
+    try:
+        results = []
+        for batch_size in [int(b) for b in args.batch_sizes.split(',')]:
+            bodies = build_bodies(args.data, batch_size, args.format)
+            for concurrency in [int(c) for c in args.concurrency.split(',')]:
+                result = run_level(url, bodies, batch_size, concurrency, args.rate, args.duration, server_pid)
+                results.append(result)
+                print(f"batch={batch_size:>5} conc={concurrency:>3}  p50={result['p50_ms']:7.2f}ms "
+                      f"p95={result['p95_ms']:7.2f}ms p99={result['p99_ms']:7.2f}ms  "
+                      f"rps={result['rps']:8.1f}  errors={result['errors']}")
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'host': {'machine': platform.machine(), 'python': platform.python_version(), 'cpus': os.cpu_count()},
+        'config': {'rate': args.rate, 'duration': args.duration, 'format': args.format},
+        'results': results,
+    }
+    os.makedirs(os.path.dirname(args.out), exist_ok=True)
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results saved to {args.out}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        return
+    with open(args.baseline) as f:
+        regressions = compare(results, json.load(f), args.tolerance)
+    for r in regressions:
+        print(f"REGRESSION batch={r['batch_size']} conc={r['concurrency']} {r['metric']}: "
+              f"{r['baseline']:.3f} -> {r['current']:.3f} ({r['change']:+.0%})")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# Memory of the training data path with default pandas dtypes + one-hot float64
+# versus the compact schema (category/int16/float32) + native categorical codes.
+# CLI: python -m benchmarks.bench_memory --data data/customer_churn_synth.csv --rows 10000000
+import argparse
+import gc
+
+import numpy as np
+import pandas as pd
+
+from src import schema
+from src.features import FeaturePreprocessor
+
+
+def _matrix_mb(n_rows, n_cols, dtype):
+    return n_rows * n_cols * np.dtype(dtype).itemsize / 2 ** 20
+
+
+def _report(label, n_rows, frame_mb, n_cols, dtype):
+    print(f"{label:<28} rows={n_rows:>10,}  frame={frame_mb:>9.1f} MB  "
+          f"model input={_matrix_mb(n_rows, n_cols, dtype):>9.1f} MB ({n_cols} x {np.dtype(dtype).name})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark memory of default vs compact dtypes')
+    parser.add_argument('--data', default='data/customer_churn_synth.csv')
+    parser.add_argument('--rows', type=int, default=10_000_000, help='Rows of the synthetic resampled table')
+    args = parser.parse_args()
+
+    default = pd.read_csv(args.data).drop('churned', axis=1)
+    compact = schema.read_csv(args.data).drop('churned', axis=1)
+
+    onehot = FeaturePreprocessor(encoding='onehot').fit(default)
+    native = FeaturePreprocessor(encoding='native').fit(compact)
+    onehot_matrix = onehot.transform(default)
+    native_matrix = native.transform(compact).astype(schema.MODEL_INPUT_DTYPE)
+
+    print("dtypes:", {name: str(dtype) for name, dtype in compact.dtypes.items()})
+    _report("default + one-hot", len(default), schema.memory_mb(default),
+            onehot_matrix.shape[1], onehot_matrix.dtype)
+    _report("compact + native categorical", len(compact), schema.memory_mb(compact),
+            native_matrix.shape[1], native_matrix.dtype)
+
+    # Synthetic table: resample rows of the real data, so value distributions match
+    idx = np.random.default_rng(42).integers(0, len(default), size=args.rows)
+    big = default.iloc[idx].reset_index(drop=True)
+    _report("default + one-hot", args.rows, schema.memory_mb(big), onehot_matrix.shape[1], onehot_matrix.dtype)
+    del big
+    gc.collect()
+    big = compact.iloc[idx].reset_index(drop=True)
+    _report("compact + native categorical", args.rows, schema.memory_mb(big),
+            native_matrix.shape[1], native_matrix.dtype)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# Request parsing + response serialization cost per /predict format (model excluded).
+# CLI: python -m benchmarks.bench_payloads --data data/customer_churn_synth.csv --rows 10000 --repeats 5
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from src import payloads
+from src.io_schemas import PredictionRequest, PredictionResponse
+from src.compiled_features import CompiledPreprocessor
+from src.features import FeaturePreprocessor
+
+
+def _best_of(fn, repeats):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark row vs columnar /predict payloads')
+    parser.add_argument('--data', default='data/customer_churn_synth.csv')
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    data = pd.read_csv(args.data).drop('churned', axis=1)
+    sample = data.sample(n=args.rows, replace=len(data) < args.rows, random_state=0)
+    compiled = CompiledPreprocessor.from_preprocessor(FeaturePreprocessor().fit(data))
+    probs = np.random.default_rng(0).random(args.rows)
+
+    row_body = json.dumps({'data': sample.to_dict(orient='records')}).encode()
+    columnar_body = json.dumps(sample.to_dict(orient='list')).encode()
+
+    def legacy_rows():
+        request = PredictionRequest(**json.loads(row_body))
+        columns = compiled.columns_from_rows(request.data)
+        compiled.transform_columns(columns)
+        response = PredictionResponse(predictions=[
+            {'churn_probability': float(p), 'churned': bool(p >= 0.5)} for p in probs
+        ])
+        return json.dumps(response.dict())
+
+    def rows():
+        columns = compiled.columns_from_rows(payloads.parse_rows(payloads.decode_json(row_body)))
+        payloads.check_categories(columns, compiled)
+        compiled.transform_columns(columns)
+        return payloads.encode_predictions(probs, 0.5)
+
+    def columnar():
+        columns = payloads.parse_columnar(payloads.decode_json(columnar_body))
+        payloads.check_categories(columns, compiled)
+        compiled.transform_columns(columns)
+        return payloads.encode_predictions(probs, 0.5, columnar=True)
+
+    print(f"rows={args.rows} row body={len(row_body) / 1024:.0f} KiB columnar body={len(columnar_body) / 1024:.0f} KiB")
+    baseline = None
+    for name, fn in [('rows, pydantic response', legacy_rows), ('rows, orjson response', rows),
+                     ('columnar, orjson', columnar)]:
+        seconds = _best_of(fn, args.repeats)
+        baseline = baseline or seconds
+        print(f"{name:<26} {seconds * 1000:8.1f} ms  {args.rows / seconds:>12,.0f} rows/s  "
+              f"{baseline / seconds:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
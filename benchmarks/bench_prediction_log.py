@@ -0,0 +1,54 @@
+# /predict latency with the prediction log off vs on (same open-loop load), plus
+# the log's own counters (rows written, dropped) after the run.
+# CLI: python -m benchmarks.bench_prediction_log --batch-size 32 --concurrency 16 --rate 500 --duration 20
+import argparse
+import os
+import shutil
+import tempfile
+
+import requests
+
+from benchmarks.bench_load import ROOT, _free_port, build_bodies, run_level, start_server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark /predict p99 overhead of the prediction log')
+    parser.add_argument('--data', default=os.path.join(ROOT, 'data', 'customer_churn_synth.csv'))
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--rate', type=float, default=500.0)
+    parser.add_argument('--duration', type=float, default=20.0)
+    parser.add_argument('--capacity', type=int, default=65536, help='PREDICTION_LOG_CAPACITY for the "on" run')
+    args = parser.parse_args()
+
+    bodies = build_bodies(args.data, args.batch_size, 'rows')
+    log_dir = tempfile.mkdtemp(prefix='prediction_log_')
+    results = {}
+    try:
+        for name, env in [('log off', {'PREDICTION_LOG_DIR': ''}),
+                          ('log on', {'PREDICTION_LOG_DIR': log_dir,
+                                      'PREDICTION_LOG_CAPACITY': str(args.capacity),
+                                      'PREDICTION_LOG_FLUSH_S': '1'})]:
+            process, url = start_server(_free_port(), env=env)
+            try:
+                result = run_level(url, bodies, args.batch_size, args.concurrency, args.rate, args.duration,
+                                   process.pid)
+                log_stats = requests.get(f'{url}/stats', timeout=5).json().get('prediction_log')
+            finally:
+                process.terminate()
+                process.wait()
+            results[name] = result
+            print(f"{name:<8} p50={result['p50_ms']:7.2f}ms p95={result['p95_ms']:7.2f}ms "
+                  f"p99={result['p99_ms']:7.2f}ms rps={result['rps']:8.1f} errors={result['errors']}"
+                  + (f"  logged={log_stats['rows_logged']} dropped={log_stats['rows_dropped']}" if log_stats else ''))
+        off, on = results['log off'], results['log on']
+        print(f"p99 overhead: {on['p99_ms'] - off['p99_ms']:+.2f} ms ({(on['p99_ms'] / off['p99_ms'] - 1):+.1%})")
+        files = [f for f in os.listdir(log_dir) if f.endswith('.parquet')]
+        size_mb = sum(os.path.getsize(os.path.join(log_dir, f)) for f in files) / 2 ** 20
+        print(f"log files: {len(files)} ({size_mb:.2f} MB)")
+    finally:
+        shutil.rmtree(log_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
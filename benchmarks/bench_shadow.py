@@ -0,0 +1,59 @@
+# /predict latency with and without a shadow challenger (same open-loop load), plus
+# the shadow's agreement, score deltas and drops after each run.
+# CLI: python -m benchmarks.bench_shadow --challenger <version> --batch-sizes 1,32,256 --concurrency 16 --rate 300
+import argparse
+import os
+
+import requests
+
+from benchmarks.bench_load import ROOT, _free_port, build_bodies, run_level, start_server
+from src import registry
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark /predict latency with shadow scoring off vs on')
+    parser.add_argument('--data', default=os.path.join(ROOT, 'data', 'customer_churn_synth.csv'))
+    parser.add_argument('--artifacts', default=os.path.join(ROOT, 'artifacts'))
+    parser.add_argument('--challenger', help='Registry version to shadow (default: newest inactive version)')
+    parser.add_argument('--batch-sizes', default='1,32,256')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--rate', type=float, default=300.0)
+    parser.add_argument('--duration', type=float, default=15.0)
+    args = parser.parse_args()
+
+    challenger = args.challenger
+    if challenger is None:
+        active = registry.active_version(args.artifacts)
+        candidates = [v for v in registry.list_versions(args.artifacts) if v != active]
+        if not candidates:
+            parser.error('no inactive registry version to use as challenger; train twice or pass --challenger')
+        challenger = candidates[-1]
+    print(f"challenger: {challenger}")
+
+    batch_sizes = [int(b) for b in args.batch_sizes.split(',')]
+    results = {}
+    for name, env in [('shadow off', {'CHALLENGER_VERSION': ''}),
+                      ('shadow on', {'CHALLENGER_VERSION': challenger})]:
+        process, url = start_server(_free_port(), env={'ARTIFACTS_DIR': args.artifacts, **env})
+        try:
+            for batch_size in batch_sizes:
+                bodies = build_bodies(args.data, batch_size, 'rows')
+                results[name, batch_size] = run_level(url, bodies, batch_size, args.concurrency,
+                                                      args.rate, args.duration, process.pid)
+            shadow_stats = requests.get(f'{url}/stats', timeout=5).json().get('shadow')
+        finally:
+            process.terminate()
+            process.wait()
+        if shadow_stats:
+            print(f"shadow: rows={shadow_stats['rows']} agreement={shadow_stats['agreement_rate']} "
+                  f"mean_abs_delta={shadow_stats['mean_abs_delta']} dropped={shadow_stats['dropped_rows']}")
+
+    for batch_size in batch_sizes:
+        off, on = results['shadow off', batch_size], results['shadow on', batch_size]
+        print(f"batch={batch_size:>5}  p50 {off['p50_ms']:7.2f} -> {on['p50_ms']:7.2f} ms  "
+              f"p99 {off['p99_ms']:7.2f} -> {on['p99_ms']:7.2f} ms  "
+              f"cpu/row {off['cpu_ms_per_row'] or 0:.4f} -> {on['cpu_ms_per_row'] or 0:.4f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# Track worker cold-start: API import time and artifact load time, legacy pickles vs serving format.
+# CLI: python -m benchmarks.bench_startup --artifacts artifacts/ --repeats 5 [--out artifacts/startup_bench.json]
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Runs in a fresh interpreter so nothing is already imported or cached
+SNIPPET = """
+import json, sys, time
+start = time.perf_counter()
+import src.app
+import_seconds = time.perf_counter() - start
+from src.model_bundle import load_bundle
+start = time.perf_counter()
+bundle = load_bundle(sys.argv[1], backend=sys.argv[2])
+load_seconds = time.perf_counter() - start
+print(json.dumps({'import_seconds': import_seconds, 'load_seconds': load_seconds,
+                  'modules': len(sys.modules), 'sklearn_loaded': 'sklearn' in sys.modules,
+                  'xgboost_loaded': 'xgboost' in sys.modules}))
+"""
+
+MODES = {
+    'legacy_pickles': 'sklearn',
+    'serving_format': 'native',
+    'compiled_trees': 'trees',
+}
+
+
+def measure(artifacts, backend):
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, '-c', SNIPPET, artifacts, backend], cwd=ROOT,
+                         check=True, capture_output=True, text=True).stdout
+    result = json.loads(out.strip().splitlines()[-1])
+    result['process_seconds'] = time.perf_counter() - start
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark serving cold-start')
+    parser.add_argument('--artifacts', default='artifacts')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--out', help='Write results as JSON')
+    args = parser.parse_args()
+
+    results = {}
+    for mode, backend in MODES.items():
+        runs = [measure(args.artifacts, backend) for _ in range(args.repeats)]
+        results[mode] = {
+            key: float(np.median([r[key] for r in runs]))
+            for key in ('import_seconds', 'load_seconds', 'process_seconds', 'modules')
+        }
+        results[mode]['sklearn_loaded'] = runs[-1]['sklearn_loaded']
+        results[mode]['xgboost_loaded'] = runs[-1]['xgboost_loaded']
+        print(f"{mode:>15}: import {results[mode]['import_seconds']:.3f}s  "
+              f"load {results[mode]['load_seconds']:.3f}s  process {results[mode]['process_seconds']:.3f}s")
+
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
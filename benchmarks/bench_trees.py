@@ -0,0 +1,81 @@
+# Compiled NumPy trees vs. the xgboost booster: parity, single-row and batch latency,
+# and (in fresh interpreters) import time and peak RSS of each scoring stack.
+# CLI: python -m benchmarks.bench_trees --artifacts artifacts/ --batch-sizes 1,32,1024,100000
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+from benchmarks.bench_booster import repeats_for, time_calls
+from src.model_bundle import resolve_artifact_dir
+from src.tree_compiler import TREES_FILE, TreeEnsemble
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Runs in a fresh interpreter: import the scoring stack, load, score one row
+SNIPPET = """
+import json, resource, sys, time
+start = time.perf_counter()
+import numpy as np
+if sys.argv[1] == 'trees':
+    from src.tree_compiler import TreeModel as Model
+else:
+    from src.models import BoosterModel as Model
+import_seconds = time.perf_counter() - start
+start = time.perf_counter()
+model = Model.load(sys.argv[2])
+model.predict_proba(np.zeros((1, int(sys.argv[3])), dtype=np.float32))
+load_seconds = time.perf_counter() - start
+print(json.dumps({'import_seconds': import_seconds, 'load_seconds': load_seconds,
+                  'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+                  'xgboost_loaded': 'xgboost' in sys.modules}))
+"""
+
+
+def measure(kind, path, n_features):
+    out = subprocess.run([sys.executable, '-c', SNIPPET, kind, path, str(n_features)], cwd=ROOT,
+                         check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark compiled trees against xgboost')
+    parser.add_argument('--artifacts', default='artifacts')
+    parser.add_argument('--batch-sizes', default='1,32,1024,100000')
+    parser.add_argument('--nthread', type=int, default=0)
+    args = parser.parse_args()
+
+    from src.models import BoosterModel
+
+    directory, _ = resolve_artifact_dir(args.artifacts)
+    booster_path = os.path.join(directory, 'model.ubj')
+    trees_path = os.path.join(directory, TREES_FILE)
+    if not os.path.exists(trees_path):
+        TreeEnsemble.from_file(booster_path).save(trees_path)
+    ensemble = TreeEnsemble.load(trees_path)
+    native = BoosterModel.load(booster_path, nthread=args.nthread or None)
+    print(f"compiled: {ensemble.summary()}")
+
+    rng = np.random.default_rng(42)
+    print(f"{'batch':>8} {'path':>8} {'p50_ms':>10} {'p99_ms':>10}")
+    for batch_size in [int(b) for b in args.batch_sizes.split(',')]:
+        X = rng.normal(size=(batch_size, ensemble.num_feature)).astype(np.float32)
+        X[rng.random(X.shape) < 0.05] = np.nan
+        diff = np.abs(ensemble.predict_proba(X) - native.predict_proba(X)).max()
+        repeats = repeats_for(batch_size)
+        for name, fn in [('xgboost', native.predict_proba), ('trees', ensemble.predict_proba)]:
+            p50, p99 = time_calls(fn, X, repeats)
+            print(f"{batch_size:>8} {name:>8} {p50:>10.3f} {p99:>10.3f}")
+        print(f"{batch_size:>8} max |trees - xgboost| = {diff:.3g}")
+
+    for kind, path in [('xgboost', booster_path), ('trees', trees_path)]:
+        result = measure(kind, path, ensemble.num_feature)
+        print(f"{kind:>8}: import {result['import_seconds']:.3f}s  load+first score {result['load_seconds']:.3f}s  "
+              f"max RSS {result['max_rss_mb']:.0f} MB  xgboost imported={result['xgboost_loaded']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# Throughput vs worker count for the preforked server (src.serve): rows/s, latency
+# and CPU per row at each workers x threads-per-worker layout under saturating load.
+# CLI: python -m benchmarks.bench_workers --workers 1,2,4,8,16,32 --threads-per-worker 1 \
+#          --batch-size 32 --concurrency 64 --rate 2000 --duration 10 --out artifacts/bench_workers.json
+import argparse
+import json
+import os
+import sys
+import time
+
+from benchmarks.bench_load import ROOT, _free_port, build_bodies, cpu_seconds, run_level, start_server
+
+
+def _tree_pids(pid):
+    """pid and its direct children (the supervisor's workers), from /proc"""
+    try:
+        with open(f'/proc/{pid}/task/{pid}/children') as f:
+            return [pid] + [int(p) for p in f.read().split()]
+    except OSError:
+        return [pid]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark throughput against the number of server workers')
+    parser.add_argument('--data', default=os.path.join(ROOT, 'data', 'customer_churn_synth.csv'))
+    parser.add_argument('--workers', default='1,2,4,8')
+    parser.add_argument('--threads-per-worker', type=int, default=1)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--rate', type=float, default=2000.0,
+                        help='Offered requests per second; set above capacity to measure saturation')
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--no-pin', action='store_true')
+    parser.add_argument('--out', default=os.path.join(ROOT, 'artifacts', 'bench_workers.json'))
+    args = parser.parse_args()
+
+    bodies = build_bodies(args.data, args.batch_size, 'rows')
+    results = []
+    for workers in [int(w) for w in args.workers.split(',')]:
+        command = [sys.executable, '-m', 'src.serve', '--workers', str(workers),
+                   '--threads-per-worker', str(args.threads_per_worker), '--host', '127.0.0.1',
+                   '--log-level', 'warning'] + (['--no-pin'] if args.no_pin else [])
+        process, url = start_server(_free_port(), command=command)
+        try:
+            # Every worker has to be up before the measured run
+            time.sleep(1.0)
+            pids = _tree_pids(process.pid)
+            cpu_before = sum(cpu_seconds(p) or 0.0 for p in pids)
+            result = run_level(url, bodies, args.batch_size, args.concurrency, args.rate, args.duration)
+            cpu_used = sum(cpu_seconds(p) or 0.0 for p in pids) - cpu_before
+        finally:
+            process.terminate()
+            process.wait()
+        rows = result['rps'] * args.duration * args.batch_size
+        result.update(workers=workers, threads_per_worker=args.threads_per_worker,
+                      cpu_ms_per_row=cpu_used * 1000 / rows if rows else None)
+        results.append(result)
+        speedup = result['rows_per_s'] / results[0]['rows_per_s'] if results[0]['rows_per_s'] else float('nan')
+        print(f"workers={workers:>3} x {args.threads_per_worker} threads  rows/s={result['rows_per_s']:>10,.0f}  "
+              f"p50={result['p50_ms']:7.2f}ms p99={result['p99_ms']:7.2f}ms  errors={result['errors']}  "
+              f"speedup={speedup:5.2f}x")
+
+    os.makedirs(os.path.dirname(args.out), exist_ok=True)
+    with open(args.out, 'w') as f:
+        json.dump({'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'cpus': os.cpu_count(),
+                   'config': vars(args), 'results': results}, f, indent=2)
+    print(f"Results saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,34 +1,192 @@
 # TODO: Implement Agentic Monitor (LLM-optional)
 # CLI: python -m src.agent_monitor --metrics data/metrics_history.jsonl --drift data/drift_latest.json --out artifacts/agent_plan.yaml
+#      python -m src.agent_monitor ... --follow [--plans-log artifacts/agent_plans.jsonl] [--key model]
 import argparse
+import heapq
 import json
+import os
+import time
+from collections import deque
+from datetime import datetime, timedelta
+
 import yaml
-import pandas as pd
-from datetime import timedelta
+
+WINDOW = timedelta(days=7)
+AUC_DROP_PCT = 3
+LATENCY_P95_MS = 400
+LATENCY_CONSECUTIVE = 2
+# Shadow scoring: report a challenger that makes a different decision on more rows than this
+SHADOW_AGREEMENT_MIN = 0.95
+
+
+def parse_ts(value):
+    """datetime from an ISO-8601 ``ts`` (a trailing Z is read as UTC)"""
+    if isinstance(value, str) and value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    return datetime.fromisoformat(value)
+
+
+def iter_records(metrics_file, follow=False, poll_interval=1.0):
+    """Parsed metrics_history.jsonl records, one at a time
+
+    Each record gains a ``timestamp`` datetime from its ``ts`` (or
+    ``timestamp``) field. With follow=True the file is tailed: the generator
+    waits for appended lines instead of stopping at the end, and a partially
+    written last line is held back until its newline arrives.
+    """
+    with open(metrics_file) as f:
+        pending = ''
+        while True:
+            line = f.readline()
+            if not line:
+                if not follow:
+                    break
+                time.sleep(poll_interval)
+                continue
+            pending += line
+            if not pending.endswith('\n') and follow:
+                continue
+            line, pending = pending.strip(), ''
+            if not line:
+                continue
+            record = json.loads(line)
+            record['timestamp'] = parse_ts(record.get('ts') or record['timestamp'])
+            yield record
+
 
 def load_metrics(metrics_file):
-    df = pd.read_json(metrics_file, lines=True)
-    if 'timestamp' in df.columns:
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-    else:
-        df['timestamp'] = pd.date_range(start='2024-01-01', periods=len(df), freq='D')
-    return df.sort_values('timestamp')
-
-def analyze_metrics(df):
-    if len(df) < 2:
-        return []
-    latest = df.iloc[-1]
-    week_ago = latest['timestamp'] - timedelta(days=7)
-    recent = df[df['timestamp'] >= week_ago]
+    return iter_records(metrics_file)
+
+
+class RollingMedian:
+    """Median of the values seen in a trailing time window, O(log n) per point
+
+    Two heaps split the window at the median (max-heap ``low``, min-heap
+    ``high``). Values leaving the window are deleted lazily: they are
+    counted in ``_delayed`` and only popped once they reach a heap top, so
+    both add and expire stay logarithmic. Points must arrive in time order.
+    """
+
+    def __init__(self, window=WINDOW):
+        self.window = window
+        self._entries = deque()  # (timestamp, value) in arrival order
+        self._low = []   # negated values, max-heap
+        self._high = []
+        self._low_size = 0
+        self._high_size = 0
+        self._delayed = {}
+
+    def __len__(self):
+        return self._low_size + self._high_size
+
+    def add(self, timestamp, value):
+        self._expire(timestamp - self.window)
+        self._entries.append((timestamp, value))
+        if not self._low or value <= -self._low[0]:
+            heapq.heappush(self._low, -value)
+            self._low_size += 1
+        else:
+            heapq.heappush(self._high, value)
+            self._high_size += 1
+        self._rebalance()
+
+    def median(self):
+        if not len(self):
+            return None
+        if self._low_size > self._high_size:
+            return -self._low[0]
+        return (-self._low[0] + self._high[0]) / 2
+
+    def _expire(self, cutoff):
+        while self._entries and self._entries[0][0] < cutoff:
+            _, value = self._entries.popleft()
+            self._delayed[value] = self._delayed.get(value, 0) + 1
+            if value <= -self._low[0]:
+                self._low_size -= 1
+                if value == -self._low[0]:
+                    self._prune(self._low, -1)
+            else:
+                self._high_size -= 1
+                if value == self._high[0]:
+                    self._prune(self._high, 1)
+            self._rebalance()
+
+    def _prune(self, heap, sign):
+        """Pop heap tops that were already deleted"""
+        while heap:
+            value = sign * heap[0]
+            count = self._delayed.get(value)
+            if not count:
+                break
+            if count == 1:
+                del self._delayed[value]
+            else:
+                self._delayed[value] = count - 1
+            heapq.heappop(heap)
+
+    def _rebalance(self):
+        # low holds the extra element when the size is odd
+        if self._low_size > self._high_size + 1:
+            heapq.heappush(self._high, -heapq.heappop(self._low))
+            self._low_size -= 1
+            self._high_size += 1
+            self._prune(self._low, -1)
+        elif self._low_size < self._high_size:
+            heapq.heappush(self._low, -heapq.heappop(self._high))
+            self._high_size -= 1
+            self._low_size += 1
+            self._prune(self._high, 1)
+
+
+class MetricsEvaluator:
+    """Incremental findings for one model's metrics stream
+
+    Keeps a rolling 7-day ROC-AUC median and a count of consecutive p95
+    latency breaches, so each new point is evaluated in O(log n) without
+    re-reading the history. Null metrics (e.g. serving telemetry, which has
+    no labels) are skipped for the median and reset the breach counter.
+    """
+
+    def __init__(self, window=WINDOW, auc_drop_pct=AUC_DROP_PCT, latency_ms=LATENCY_P95_MS,
+                 consecutive=LATENCY_CONSECUTIVE):
+        self.auc_median = RollingMedian(window)
+        self.auc_drop_pct = auc_drop_pct
+        self.latency_ms = latency_ms
+        self.consecutive = consecutive
+        self.latency_breaches = 0
+        self.points = 0
+
+    def update(self, record):
+        """Findings at this point, in the same shape as analyze_metrics"""
+        self.points += 1
+        findings = []
+        roc_auc = record.get('roc_auc')
+        if roc_auc is not None:
+            self.auc_median.add(record['timestamp'], roc_auc)
+            median_auc = self.auc_median.median()
+            if len(self.auc_median) > 1 and median_auc:
+                drop_pct = (median_auc - roc_auc) / median_auc * 100
+                if drop_pct >= self.auc_drop_pct:
+                    findings.append({"roc_auc_drop_pct": round(drop_pct, 1)})
+        latency = record.get('latency_p95_ms')
+        if latency is not None and latency > self.latency_ms:
+            self.latency_breaches += 1
+        else:
+            self.latency_breaches = 0
+        if self.latency_breaches >= self.consecutive:
+            findings.append({"latency_p95_ms": float(latency)})
+        agreement = record.get('shadow_agreement')
+        if agreement is not None and agreement < SHADOW_AGREEMENT_MIN:
+            findings.append({"shadow_agreement": agreement, "challenger_version": record.get('challenger_version')})
+        return findings if self.points >= 2 else []
+
+
+def analyze_metrics(records):
+    """Findings at the last point of a metrics history"""
+    evaluator = MetricsEvaluator()
     findings = []
-    if 'roc_auc' in latest and len(recent) > 1:
-        median_auc = recent['roc_auc'].median()
-        drop_pct = (median_auc - latest['roc_auc']) / median_auc * 100
-        if drop_pct >= 3:
-            findings.append({"roc_auc_drop_pct": round(drop_pct, 1)})
-    if 'latency_p95_ms' in latest and len(df) >= 2:
-        if all(df.tail(2)['latency_p95_ms'] > 400):
-            findings.append({"latency_p95_ms": float(latest['latency_p95_ms'])})
+    for record in records:
+        findings = evaluator.update(record)
     return findings
 
 def generate_plan(findings, drift_report):
@@ -59,6 +217,11 @@ def generate_plan(findings, drift_report):
         rationale.append("p95 latency > 400ms for two windows")
     if drift:
         rationale.append("overall data drift detected")
+    shadow = next((f for f in findings if "shadow_agreement" in f), None)
+    if shadow:
+        # Informational: the challenger is being evaluated, not serving
+        rationale.append(f"challenger {shadow['challenger_version']} agrees on "
+                         f"{shadow['shadow_agreement']:.1%} of decisions")
 
     if not rationale:
         rationale = ["No significant issues detected"]
@@ -70,20 +233,66 @@ def generate_plan(findings, drift_report):
         "rationale": "; ".join(rationale)
     }
 
+def monitor(records, drift_fn, key=None):
+    """(record, plan) for every point; ``key`` names the field that separates models"""
+    evaluators = {}
+    for record in records:
+        model = record.get(key) if key else None
+        evaluator = evaluators.get(model)
+        if evaluator is None:
+            evaluator = evaluators[model] = MetricsEvaluator()
+        yield record, generate_plan(evaluator.update(record), drift_fn())
+
+
+class DriftReportReader:
+    """Latest drift report, re-read only when the file changes"""
+
+    def __init__(self, path):
+        self.path = path
+        self._mtime = None
+        self._report = {}
+
+    def __call__(self):
+        mtime = os.path.getmtime(self.path)
+        if mtime != self._mtime:
+            with open(self.path) as f:
+                self._report = json.load(f)
+            self._mtime = mtime
+        return self._report
+
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument('--metrics', required=True)
     parser.add_argument('--drift', required=True)
     parser.add_argument('--out', required=True)
+    parser.add_argument('--follow', action='store_true',
+                        help='Tail the metrics file and re-plan on every new point')
+    parser.add_argument('--plans-log', help='Append every plan as a JSON line (with ts and model)')
+    parser.add_argument('--key', help='Record field identifying the model, for multi-model histories')
+    parser.add_argument('--poll-interval', type=float, default=1.0)
     args = parser.parse_args()
 
-    metrics_df = load_metrics(args.metrics)
-    with open(args.drift) as f:
-        drift_report = json.load(f)
-
-    findings = analyze_metrics(metrics_df)
-    plan = generate_plan(findings, drift_report)
+    records = iter_records(args.metrics, follow=args.follow, poll_interval=args.poll_interval)
+    plans_log = open(args.plans_log, 'a', buffering=1) if args.plans_log else None
+    plan = None
+    try:
+        for record, plan in monitor(records, DriftReportReader(args.drift), key=args.key):
+            if plans_log is not None:
+                plans_log.write(json.dumps({'ts': record.get('ts'), 'model': record.get(args.key) if args.key else None,
+                                            **plan}) + '\n')
+            if args.follow:
+                with open(args.out, 'w') as f:
+                    yaml.dump(plan, f)
+                print(f"{record.get('ts')} status={plan['status']} actions={','.join(plan['actions'])}", flush=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if plans_log is not None:
+            plans_log.close()
 
+    if plan is None:
+        plan = generate_plan([], DriftReportReader(args.drift)())
     with open(args.out, 'w') as f:
         yaml.dump(plan, f)
 
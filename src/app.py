@@ -1,62 +1,408 @@
 # TODO: Implement FastAPI app for churn inference.
 # Endpoints: GET /health, POST /predict
-from fastapi import FastAPI, HTTPException
-import joblib
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import PlainTextResponse
 import os
-import pandas as pd
+import numpy as np
 from typing import List
-from src.io_schemas import PredictionRequest, PredictionResponse, HealthResponse
-from src.features import FeaturePreprocessor
+from src.io_schemas import PredictionResponse, HealthResponse
+from src.model_bundle import load_bundle, BundleWatcher
+from src.batching import MicroBatcher
+from src.prediction_cache import PredictionCache
+from src import payloads
+from src.telemetry import Telemetry, HistoryExporter
+from src.prediction_log import PredictionLog
+from src import explain as explanations
+from src.shadow import ShadowScorer
 
 app = FastAPI(title="Churn Prediction API", version="1.0.0")
 
-model = None
-preprocessor = None
+ARTIFACTS_DIR = os.environ.get('ARTIFACTS_DIR', 'artifacts')
+
+# Serving mode: "native" scores through Booster.inplace_predict on model.ubj,
+# "sklearn" through the pickled XGBClassifier, "trees" through the compiled
+# NumPy trees in model_trees.npz (no xgboost import until /explain). Unset
+# picks native when available.
+MODEL_BACKEND = os.environ.get('MODEL_BACKEND', '')
+MODEL_NTHREAD = int(os.environ.get('MODEL_NTHREAD', '0')) or None
+
+# Hot reload: poll the registry's ACTIVE pointer every MODEL_RELOAD_INTERVAL_S
+# seconds (0 disables).
+MODEL_RELOAD_INTERVAL_S = float(os.environ.get('MODEL_RELOAD_INTERVAL_S', '10'))
+
+# Micro-batching: concurrent requests are scored together for up to
+# BATCH_MAX_WAIT_MS milliseconds or BATCH_MAX_ROWS rows.
+BATCH_MAX_WAIT_MS = float(os.environ.get('BATCH_MAX_WAIT_MS', '2'))
+BATCH_MAX_ROWS = int(os.environ.get('BATCH_MAX_ROWS', '1024'))
+BATCH_WORKERS = int(os.environ.get('BATCH_WORKERS', '1'))
+
+# Prediction cache: up to PREDICTION_CACHE_SIZE rows (0 disables) kept for
+# PREDICTION_CACHE_TTL_S seconds, keyed on the row values and model version.
+PREDICTION_CACHE_SIZE = int(os.environ.get('PREDICTION_CACHE_SIZE', '0'))
+PREDICTION_CACHE_TTL_S = float(os.environ.get('PREDICTION_CACHE_TTL_S', '300'))
+
+# Explanation cache: folded per-row contributions from POST /explain, up to
+# EXPLANATION_CACHE_SIZE rows (0 disables), keyed on the row values and model version.
+EXPLANATION_CACHE_SIZE = int(os.environ.get('EXPLANATION_CACHE_SIZE', '10000'))
+EXPLANATION_CACHE_TTL_S = float(os.environ.get('EXPLANATION_CACHE_TTL_S', '3600'))
+
+# Decision threshold: probability >= threshold is churn. Defaults to the
+# operating_threshold the model version recorded in metrics.json at training
+# time (0.5 when absent); MODEL_THRESHOLD overrides it for every version.
+MODEL_THRESHOLD = float(os.environ['MODEL_THRESHOLD']) if os.environ.get('MODEL_THRESHOLD') else None
+
+# Shadow scoring: with CHALLENGER_VERSION set (a registry version), that model
+# scores the same requests in a background thread after each /predict response
+# is sent; agreement and score deltas go to /stats, /metrics and the telemetry
+# JSONL. At most CHALLENGER_MAX_PENDING batches queue; the rest are dropped.
+CHALLENGER_VERSION = os.environ.get('CHALLENGER_VERSION', '')
+CHALLENGER_MAX_PENDING = int(os.environ.get('CHALLENGER_MAX_PENDING', '64'))
+
+# Online drift: scored traffic is bucketed every DRIFT_BUCKET_SECONDS and
+# GET /drift reports over the last DRIFT_WINDOW_SECONDS by default; longer
+# ?minutes= windows are rejected with 400 (older buckets are not kept).
+DRIFT_BUCKET_SECONDS = float(os.environ.get('DRIFT_BUCKET_SECONDS', '60'))
+DRIFT_WINDOW_SECONDS = float(os.environ.get('DRIFT_WINDOW_SECONDS', '3600'))
+
+# Telemetry: GET /metrics serves Prometheus text; with TELEMETRY_EXPORT_PATH set,
+# a metrics_history.jsonl record is appended every TELEMETRY_EXPORT_INTERVAL_S.
+TELEMETRY_EXPORT_PATH = os.environ.get('TELEMETRY_EXPORT_PATH', '')
+TELEMETRY_EXPORT_INTERVAL_S = float(os.environ.get('TELEMETRY_EXPORT_INTERVAL_S', '60'))
+
+# Prediction log: with PREDICTION_LOG_DIR set, scored rows (raw features,
+# probability, model version, time) go through a PREDICTION_LOG_CAPACITY-row
+# ring buffer to Parquet files flushed every PREDICTION_LOG_FLUSH_S seconds and
+# rotated at PREDICTION_LOG_ROTATE_MB or PREDICTION_LOG_ROTATE_S. Rows that do
+# not fit in the buffer are dropped and counted, never waited on.
+PREDICTION_LOG_DIR = os.environ.get('PREDICTION_LOG_DIR', '')
+PREDICTION_LOG_CAPACITY = int(os.environ.get('PREDICTION_LOG_CAPACITY', '65536'))
+PREDICTION_LOG_FLUSH_S = float(os.environ.get('PREDICTION_LOG_FLUSH_S', '5'))
+PREDICTION_LOG_ROTATE_MB = float(os.environ.get('PREDICTION_LOG_ROTATE_MB', '64'))
+PREDICTION_LOG_ROTATE_S = float(os.environ.get('PREDICTION_LOG_ROTATE_S', '3600'))
+
+# The serving model version. Requests read this reference once and use that
+# bundle throughout, so a hot reload only replaces the reference (RCU-style):
+# in-flight requests finish on the old bundle, new ones pick up the new one.
+bundle = None
+watcher = None
+exporter = None
+prediction_log = None
+shadow = None
+telemetry = Telemetry()
+
+def _load():
+    return load_bundle(ARTIFACTS_DIR, backend=MODEL_BACKEND, nthread=MODEL_NTHREAD)
+
+def swap_bundle(new_bundle):
+    global bundle
+    new_bundle.start_monitoring(DRIFT_BUCKET_SECONDS, DRIFT_WINDOW_SECONDS)
+    old_bundle, bundle = bundle, new_bundle
+    if prediction_cache is not None:
+        prediction_cache.invalidate()
+    if explanation_cache is not None:
+        explanation_cache.invalidate()
+    if old_bundle is not None:
+        old_bundle.retire()
+        print(f"Swapped model version {old_bundle.version} -> {new_bundle.version}")
 
 def load_artifacts():
-    global model, preprocessor
-    model_path = os.path.join('artifacts', 'model.pkl')
-    preprocessor_path = os.path.join('artifacts', 'feature_pipeline.pkl')
-    if not os.path.exists(model_path) or not os.path.exists(preprocessor_path):
-        raise FileNotFoundError("Model artifacts not found.")
-    model = joblib.load(model_path)
-    preprocessor = joblib.load(preprocessor_path)
+    if bundle is None:
+        swap_bundle(_load())
+    return bundle
+
+def decision_threshold(current):
+    """Churn decision threshold for a bundle: MODEL_THRESHOLD, else its operating threshold"""
+    return MODEL_THRESHOLD if MODEL_THRESHOLD is not None else current.threshold
+
+def score_batch(X):
+    """Score a stacked feature matrix; runs in the batcher's worker thread"""
+    return bundle.score(X)
+
+batcher = MicroBatcher(score_batch, max_wait_ms=BATCH_MAX_WAIT_MS,
+                       max_batch_rows=BATCH_MAX_ROWS, workers=BATCH_WORKERS,
+                       observer=telemetry.observe_batch)
+
+prediction_cache = (PredictionCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL_S)
+                    if PREDICTION_CACHE_SIZE > 0 else None)
+explanation_cache = (explanations.ExplanationCache(EXPLANATION_CACHE_SIZE, EXPLANATION_CACHE_TTL_S)
+                     if EXPLANATION_CACHE_SIZE > 0 else None)
+
+async def score_columns(current, columns, timer):
+    """(probabilities, encoded matrix) for a column mapping
+
+    Cached rows skip preprocessing and the model; the matrix is None when
+    any row came from the cache.
+    """
+    compiled = current.compiled
+    if prediction_cache is None:
+        X = compiled.transform_columns(columns)
+        timer.mark('transform')
+        probs = await batcher.submit(X, current.score)
+        timer.mark('score')
+        return probs, X
+
+    keys = prediction_cache.keys_for(columns, compiled.numeric_features,
+                                     compiled.categorical_features, current.version)
+    cached = prediction_cache.get_many(keys)
+    misses = [i for i, p in enumerate(cached) if p is None]
+    probs = np.array([np.nan if p is None else p for p in cached], dtype=np.float64)
+    X = None
+    if misses:
+        miss_columns = {name: [values[i] for i in misses] for name, values in columns.items()}
+        X = compiled.transform_columns(miss_columns)
+        timer.mark('transform')
+        miss_probs = await batcher.submit(X, current.score)
+        probs[misses] = miss_probs
+        prediction_cache.put_many([keys[i] for i in misses], miss_probs)
+    timer.mark('score')
+    return probs, (X if len(misses) == len(keys) else None)
+
+async def explain_columns(current, columns):
+    """Folded contributions for a column mapping; cached rows skip the model
+
+    Explanations go through the micro-batcher with current.explain as the
+    scorer, so concurrent /explain requests share one pred_contribs call.
+    """
+    compiled = current.compiled
+    if explanation_cache is None:
+        return await batcher.submit(compiled.transform_columns(columns), current.explain)
+    keys = explanation_cache.keys_for(columns, compiled.numeric_features,
+                                      compiled.categorical_features, current.version)
+    cached = explanation_cache.get_many(keys)
+    misses = [i for i, row in enumerate(cached) if row is None]
+    folded = np.empty((len(keys), len(compiled.feature_names) + 1), dtype=np.float32)
+    for i, row in enumerate(cached):
+        if row is not None:
+            folded[i] = row
+    if misses:
+        miss_columns = {name: [values[i] for i in misses] for name, values in columns.items()}
+        miss_folded = await batcher.submit(compiled.transform_columns(miss_columns), current.explain)
+        folded[misses] = miss_folded
+        explanation_cache.put_many([keys[i] for i in misses], miss_folded)
+    return folded
+
+def parse_payload(payload_type, body, compiled, mark=None):
+    """(columns, X, columnar) of a request body: columns for JSON/Arrow, X for encoded .npy
+
+    Raises payloads.PayloadError for invalid bodies and unknown categories.
+    mark(stage) is called after parsing and after building the columns.
+    """
+    mark = mark or (lambda stage: None)
+    if payload_type == payloads.NPY:
+        X = payloads.parse_npy(body, compiled)
+        mark('parse')
+        return None, X, True
+    columnar = True
+    if payload_type == payloads.ARROW_STREAM:
+        columns = payloads.parse_arrow(body)
+        mark('parse')
+    else:
+        payload = payloads.decode_json(body)
+        columnar = payloads.is_columnar(payload)
+        if columnar:
+            columns = payloads.parse_columnar(payload)
+            mark('parse')
+        else:
+            rows = payloads.parse_rows(payload)
+            mark('parse')
+            columns = compiled.columns_from_rows(rows)
+    payloads.check_categories(columns, compiled)
+    mark('build')
+    return columns, None, columnar
 
 @app.on_event("startup")
 async def startup_event():
+    global watcher, exporter, prediction_log, shadow
     try:
-        load_artifacts()
+        # Under src.serve the bundle is preloaded before the fork; its drift
+        # monitor thread still has to start in this process
+        load_artifacts().start_monitoring(DRIFT_BUCKET_SECONDS, DRIFT_WINDOW_SECONDS)
     except Exception as e:
         print(f"Warning: Could not load artifacts: {e}")
+    if MODEL_RELOAD_INTERVAL_S > 0:
+        current_version = bundle.version if bundle is not None else None
+        watcher = BundleWatcher(ARTIFACTS_DIR, current_version, _load, swap_bundle,
+                                interval=MODEL_RELOAD_INTERVAL_S).start()
+    if CHALLENGER_VERSION:
+        try:
+            # One thread, so the challenger never competes with the champion for cores
+            challenger = load_bundle(ARTIFACTS_DIR, backend=MODEL_BACKEND, nthread=1, version=CHALLENGER_VERSION)
+            shadow = ShadowScorer(challenger, threshold=MODEL_THRESHOLD, max_pending=CHALLENGER_MAX_PENDING)
+            print(f"Shadow scoring with challenger version {challenger.version}")
+        except Exception as e:
+            print(f"Warning: Could not load challenger {CHALLENGER_VERSION}: {e}")
+    if TELEMETRY_EXPORT_PATH:
+        exporter = HistoryExporter(telemetry, TELEMETRY_EXPORT_PATH, interval=TELEMETRY_EXPORT_INTERVAL_S,
+                                   extra_fn=shadow.history_fields if shadow is not None else None).start()
+    if PREDICTION_LOG_DIR:
+        prediction_log = PredictionLog(PREDICTION_LOG_DIR, capacity=PREDICTION_LOG_CAPACITY,
+                                       flush_interval=PREDICTION_LOG_FLUSH_S,
+                                       rotate_bytes=int(PREDICTION_LOG_ROTATE_MB * 2 ** 20),
+                                       rotate_seconds=PREDICTION_LOG_ROTATE_S).start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    batcher.close()
+    if watcher is not None:
+        watcher.stop()
+    if exporter is not None:
+        exporter.stop()
+    if prediction_log is not None:
+        prediction_log.close()
+    if shadow is not None:
+        shadow.close()
+    if bundle is not None:
+        bundle.retire()
 
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
-    if model is None or preprocessor is None:
+    if bundle is None:
         try:
             load_artifacts()
         except:
             return HealthResponse(status="error")
     return HealthResponse(status="ok")
 
+@app.get("/stats")
+async def stats():
+    return {
+        "model_version": bundle.version if bundle is not None else None,
+        "threshold": decision_threshold(bundle) if bundle is not None else None,
+        "batcher": batcher.stats(),
+        "prediction_cache": prediction_cache.stats() if prediction_cache is not None else None,
+        "prediction_log": prediction_log.stats() if prediction_log is not None else None,
+        "explanation_cache": explanation_cache.stats() if explanation_cache is not None else None,
+        "shadow": shadow.stats() if shadow is not None else None,
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics: per-stage latency, batch sizes, request and error counters"""
+    batcher_stats = batcher.stats()
+    gauges = {
+        'churn_batcher_queue_rows': ('Rows waiting for a micro-batch', batcher_stats['queue_depth_rows']),
+    }
+    if prediction_cache is not None:
+        gauges['churn_prediction_cache_hit_rate'] = ('Prediction cache hit rate',
+                                                     prediction_cache.stats()['hit_rate'])
+    if prediction_log is not None:
+        log_stats = prediction_log.stats()
+        gauges['churn_prediction_log_rows_buffered'] = ('Rows waiting to be written to the prediction log',
+                                                        log_stats['rows_buffered'])
+        gauges['churn_prediction_log_rows_dropped'] = ('Rows dropped by the prediction log since start',
+                                                       log_stats['rows_dropped'])
+    if shadow is not None:
+        shadow_stats = shadow.stats()
+        gauges['churn_shadow_agreement_rate'] = ('Share of rows where the challenger makes the same decision',
+                                                 shadow_stats['agreement_rate'] or 0.0)
+        gauges['churn_shadow_mean_abs_delta'] = ('Mean |challenger - champion| probability',
+                                                 shadow_stats['mean_abs_delta'] or 0.0)
+        gauges['churn_shadow_dropped_rows'] = ('Rows not shadow-scored because the queue was full',
+                                               shadow_stats['dropped_rows'])
+    return PlainTextResponse(telemetry.prometheus(gauges), media_type="text/plain; version=0.0.4")
+
+@app.get("/drift")
+def drift(minutes: float = Query(None, gt=0), threshold: float = Query(0.2, gt=0)):
+    current = bundle
+    if current is None or current.drift_monitor is None:
+        raise HTTPException(status_code=404, detail="Drift profile not loaded (retrain to create drift_profile.json)")
+    window_seconds = minutes * 60 if minutes else None
+    try:
+        return current.drift_monitor.report(window_seconds=window_seconds, threshold=threshold)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @app.post("/predict", response_model=PredictionResponse)
-async def predict(request: PredictionRequest):
-    if model is None or preprocessor is None:
+async def predict(request: Request):
+    """Score rows ({"data": [rows]}, PredictionRequest) or columns ({"plan_type": [...], ...})
+
+    Columnar payloads are validated in bulk into arrays and get a columnar
+    response ({"churn_probability": [...], "churned": [...]}). Missing fields,
+    invalid values and unknown categories are a 400 listing every problem.
+
+    Binary callers can send the same columns as an Arrow IPC stream
+    (Content-Type: application/vnd.apache.arrow.stream) or an already-encoded
+    float32 matrix as .npy (application/x-npy); the response uses the same
+    format. Encoded .npy input skips the prediction cache, drift monitor and
+    prediction log, which work on raw feature values.
+    """
+    current = bundle
+    if current is None:
         try:
-            load_artifacts()
+            current = load_artifacts()
         except Exception as e:
+            telemetry.count_error('model_not_loaded')
             raise HTTPException(status_code=500, detail=f"Model not loaded: {e}")
+    timer = telemetry.timer()
+    payload_type = payloads.payload_format(request.headers.get("content-type"))
+    telemetry.count_request(payload_type)
+    body = await request.body()
+    try:
+        columns, X, columnar = parse_payload(payload_type, body, current.compiled, timer.mark)
+    except payloads.PayloadError as e:
+        telemetry.count_error('invalid_payload')
+        raise HTTPException(status_code=400, detail=e.errors)
+    try:
+        if X is not None:
+            probs = await batcher.submit(X, current.score)
+            timer.mark('score')
+        else:
+            probs, X = await score_columns(current, columns, timer)
+            if current.drift_monitor is not None:
+                current.drift_monitor.observe(columns)
+    except ValueError as ve:
+        telemetry.count_error('preprocessing')
+        raise HTTPException(status_code=400, detail=f"Preprocessing error: {ve}")
+    except Exception as e:
+        telemetry.count_error('scoring')
+        raise HTTPException(status_code=400, detail=f"Error processing request: {e}")
+    if prediction_log is not None and columns is not None:
+        # Best effort, outside the scoring try: logging never changes the response
+        prediction_log.append(columns, probs, current.version)
+    threshold = decision_threshold(current)
+    content, media_type = payloads.encode_response(probs, threshold, payload_type, columnar=columnar)
+    timer.mark('serialize')
+    timer.finish()
+    telemetry.request_rows.record(len(probs))
+    background = None
+    if shadow is not None:
+        # Runs after the response has been sent; submit() only enqueues
+        background = BackgroundTasks()
+        background.add_task(shadow.submit, probs, current.compiled, X, columns, threshold)
+    return Response(content, media_type=media_type, background=background)
+
+@app.post("/explain")
+async def explain(request: Request, top_k: int = Query(None, gt=0)):
+    """Per-row reasons: TreeSHAP contributions folded to the request features
+
+    Takes the same bodies as /predict. Each row gets its churn probability,
+    the base value and {feature: contribution} ordered by magnitude (top_k
+    strongest only when given); contributions are in log-odds and sum with
+    the base value to the row's logit.
+    """
+    current = bundle
+    if current is None:
+        try:
+            current = load_artifacts()
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Model not loaded: {e}")
+    payload_type = payloads.payload_format(request.headers.get("content-type"))
+    body = await request.body()
+    try:
+        columns, X, _ = parse_payload(payload_type, body, current.compiled)
+    except payloads.PayloadError as e:
+        raise HTTPException(status_code=400, detail=e.errors)
     try:
-        data = [item.dict() for item in request.data]
-        df = pd.DataFrame(data)
-        X_processed = preprocessor.transform(df)  # Unknow categories
-        probs = model.predict_proba(X_processed)[:, 1]
-        predictions = [{"churn_probability": float(p), "churned": bool(p >= 0.5)} for p in probs]
-        return PredictionResponse(predictions=predictions)
+        if X is not None:
+            folded = await batcher.submit(X, current.explain)
+        else:
+            folded = await explain_columns(current, columns)
     except ValueError as ve:
-        # Unknow categories
         raise HTTPException(status_code=400, detail=f"Preprocessing error: {ve}")
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error processing request: {e}")
+    content = explanations.encode_explanations(folded, current.compiled.feature_names, top_k)
+    return Response(content, media_type=payloads.JSON)
 
 if __name__ == "__main__":
     import uvicorn
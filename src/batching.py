@@ -0,0 +1,135 @@
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+class MicroBatcher:
+    """Coalesce concurrent scoring requests into a single model call
+
+    Callers submit feature matrices from the event loop. A collector task
+    waits up to ``max_wait_ms`` (or until ``max_batch_rows`` rows are queued),
+    stacks the pending matrices, scores them in a worker thread and hands each
+    caller back its own slice of the probabilities. ``observer(rows, seconds)``
+    is called from the worker thread after every model call.
+    """
+
+    def __init__(self, score_fn, max_wait_ms=2.0, max_batch_rows=1024, workers=1, observer=None):
+        self.score_fn = score_fn
+        self.observer = observer
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_batch_rows = max_batch_rows
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='batcher')
+        self._pending = deque()
+        self._pending_rows = 0
+        self._wakeup = None
+        self._task = None
+
+        self.batches = 0
+        self.rows_scored = 0
+        self.max_batch_size = 0
+        self.batch_size_buckets = {}
+
+    def _start(self):
+        # Created lazily so the event and task bind to the server's running loop
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._collect())
+
+    async def submit(self, X, score_fn=None):
+        """Queue a feature matrix and wait for its probabilities
+
+        score_fn overrides the default scorer for this request; requests are only
+        batched together when they share the same scorer.
+        """
+        if self._task is None or self._task.done():
+            self._start()
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((X, future, score_fn or self.score_fn))
+        self._pending_rows += len(X)
+        self._wakeup.set()
+        return await future
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+            deadline = loop.time() + self.max_wait
+            while self._pending_rows < self.max_batch_rows:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), remaining)
+                except asyncio.TimeoutError:
+                    break
+
+            first = self._pending.popleft()
+            score_fn = first[2]
+            items = [first[:2]]
+            rows = len(first[0])
+            while (self._pending and self._pending[0][2] == score_fn
+                   and rows + len(self._pending[0][0]) <= self.max_batch_rows):
+                items.append(self._pending.popleft()[:2])
+                rows += len(items[-1][0])
+            self._pending_rows -= rows
+            # Scoring runs as its own task so the next batch can form meanwhile
+            loop.create_task(self._score(items, rows, score_fn))
+
+    async def _score(self, items, rows, score_fn):
+        loop = asyncio.get_running_loop()
+        if len(items) == 1:
+            batch = items[0][0]
+        else:
+            batch = np.concatenate([X for X, _ in items])
+        self._record_batch(rows)
+        try:
+            probs = await loop.run_in_executor(self._executor, self._run_model, score_fn, batch)
+        except Exception as e:
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        offset = 0
+        for X, future in items:
+            if not future.done():
+                future.set_result(probs[offset:offset + len(X)])
+            offset += len(X)
+
+    def _run_model(self, score_fn, batch):
+        if self.observer is None:
+            return score_fn(batch)
+        start = time.perf_counter()
+        probs = score_fn(batch)
+        self.observer(len(batch), time.perf_counter() - start)
+        return probs
+
+    def _record_batch(self, rows):
+        self.batches += 1
+        self.rows_scored += rows
+        self.max_batch_size = max(self.max_batch_size, rows)
+        bucket = 1 << max(rows - 1, 0).bit_length()
+        self.batch_size_buckets[bucket] = self.batch_size_buckets.get(bucket, 0) + 1
+
+    def stats(self):
+        """Queue depth and batch-size metrics"""
+        return {
+            'queue_depth_requests': len(self._pending),
+            'queue_depth_rows': self._pending_rows,
+            'batches': self.batches,
+            'rows_scored': self.rows_scored,
+            'mean_batch_size': self.rows_scored / self.batches if self.batches else 0.0,
+            'max_batch_size': self.max_batch_size,
+            # Batches per power-of-two size bucket (upper bound, inclusive)
+            'batch_size_buckets': {str(k): v for k, v in sorted(self.batch_size_buckets.items())},
+        }
+
+    def close(self):
+        """Stop the collector and release the worker threads"""
+        if self._task is not None:
+            self._task.cancel()
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,208 @@
+import json
+import os
+
+import numpy as np
+
+CONSTANTS_FILE = 'preprocess_constants.npy'
+META_FILE = 'preprocess_meta.json'
+
+
+def _fill_missing(value):
+    # Mirrors SimpleImputer(strategy='constant', fill_value='missing')
+    if value is None or value != value:
+        return 'missing'
+    return value
+
+
+class DictionaryColumn:
+    """Categorical column as a small dictionary of values plus integer codes
+
+    This is how Arrow dictionary arrays arrive; transform_columns looks up the
+    dictionary once and gathers by code instead of hashing every row.
+    """
+
+    def __init__(self, dictionary, codes):
+        self.dictionary = list(dictionary)
+        self.codes = np.asarray(codes)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __iter__(self):
+        dictionary = self.dictionary
+        return (dictionary[c] for c in self.codes)
+
+    def __getitem__(self, i):
+        return self.dictionary[self.codes[i]]
+
+    def __array__(self, dtype=None, copy=None):
+        values = np.asarray(self.dictionary, dtype=object)[self.codes]
+        return values if dtype is None else values.astype(dtype)
+
+    def used_values(self):
+        """Dictionary values that at least one row refers to"""
+        return [self.dictionary[i] for i in np.unique(self.codes)]
+
+
+class CompiledPreprocessor:
+    """Pandas-free replica of a fitted FeaturePreprocessor
+
+    The fitted medians, scaler statistics and one-hot vocabularies are frozen
+    into NumPy lookup tables so request rows can be written straight into a
+    float32 matrix without building a DataFrame or calling sklearn.
+    encoding "onehot" writes indicator blocks, "native" one ordinal code
+    column per categorical (NaN for unknown values).
+    """
+
+    def __init__(self, numeric_features, categorical_features, medians, means,
+                 scales, categories, encoding='onehot'):
+        self.numeric_features = list(numeric_features)
+        self.categorical_features = list(categorical_features)
+        self.feature_names = self.numeric_features + self.categorical_features
+        self.medians = np.asarray(medians, dtype=np.float64)
+        self.means = np.asarray(means, dtype=np.float64)
+        self.scales = np.asarray(scales, dtype=np.float64)
+        self.categories = [list(c) for c in categories]
+        self.encoding = encoding
+
+        # Column offset of each one-hot block (or code column) and a value -> index lookup
+        self.vocabularies = []
+        self.offsets = []
+        offset = len(self.numeric_features)
+        for cats in self.categories:
+            self.offsets.append(offset)
+            self.vocabularies.append({c: i for i, c in enumerate(cats)})
+            offset += 1 if encoding == 'native' else len(cats)
+        self.n_features_out = offset
+
+    @classmethod
+    def from_preprocessor(cls, preprocessor):
+        """Freeze a fitted FeaturePreprocessor"""
+        transformers = preprocessor.preprocessor.named_transformers_
+        num = transformers['num'].named_steps
+        cat = transformers['cat'].named_steps
+        encoder = cat['ordinal'] if 'ordinal' in cat else cat['onehot']
+        return cls(
+            numeric_features=preprocessor.numeric_features,
+            categorical_features=preprocessor.categorical_features,
+            medians=num['imputer'].statistics_,
+            means=num['scaler'].mean_,
+            scales=num['scaler'].scale_,
+            categories=[list(c) for c in encoder.categories_],
+            encoding='native' if 'ordinal' in cat else 'onehot',
+        )
+
+    def output_feature_names(self):
+        """Encoded column names, as ColumnTransformer.get_feature_names_out() spells them"""
+        names = [f'num__{f}' for f in self.numeric_features]
+        for feature, cats in zip(self.categorical_features, self.categories):
+            if self.encoding == 'native':
+                names.append(f'cat__{feature}')
+            else:
+                names.extend(f'cat__{feature}_{c}' for c in cats)
+        return names
+
+    def feature_types(self):
+        """XGBoost feature_types for the output columns, None for one-hot"""
+        if self.encoding != 'native':
+            return None
+        return ['q'] * len(self.numeric_features) + ['c'] * len(self.categorical_features)
+
+    def save(self, directory):
+        """Write the serving format: a flat .npy of numeric constants plus JSON metadata"""
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, CONSTANTS_FILE),
+                np.stack([self.medians, self.means, self.scales]))
+        with open(os.path.join(directory, META_FILE), 'w') as f:
+            json.dump({
+                'numeric_features': self.numeric_features,
+                'categorical_features': self.categorical_features,
+                'categories': self.categories,
+                'encoding': self.encoding,
+            }, f, indent=2)
+
+    @classmethod
+    def load(cls, directory, mmap_mode='r'):
+        """Load the serving format; constants are memory-mapped so forked workers share pages"""
+        constants = np.load(os.path.join(directory, CONSTANTS_FILE), mmap_mode=mmap_mode)
+        with open(os.path.join(directory, META_FILE)) as f:
+            meta = json.load(f)
+        return cls(meta['numeric_features'], meta['categorical_features'],
+                   constants[0], constants[1], constants[2], meta['categories'],
+                   encoding=meta.get('encoding', 'onehot'))
+
+    @staticmethod
+    def exists(directory):
+        return (os.path.exists(os.path.join(directory, CONSTANTS_FILE))
+                and os.path.exists(os.path.join(directory, META_FILE)))
+
+    def columns_from_rows(self, rows):
+        """Gather request rows (Pydantic models or dicts) into columns"""
+        if rows and isinstance(rows[0], dict):
+            return {f: [row.get(f) for row in rows] for f in self.feature_names}
+        return {f: [getattr(row, f) for row in rows] for f in self.feature_names}
+
+    def transform_columns(self, columns, out=None):
+        """Fill a float32 matrix from a mapping of feature name -> values"""
+        n_rows = len(columns[self.feature_names[0]])
+        if out is None:
+            out = np.empty((n_rows, self.n_features_out), dtype=np.float32)
+
+        # Training reads float32 columns (schema.read_csv), so the imputer and
+        # scaler run in float32 there; the same arithmetic here keeps values
+        # that sit on a tree split on the same side
+        medians = self.medians.astype(np.float32)
+        means = self.means.astype(np.float32)
+        scales = self.scales.astype(np.float32)
+        for j, feature in enumerate(self.numeric_features):
+            values = np.asarray(columns[feature], dtype=np.float32)
+            missing = np.isnan(values)
+            if missing.any():
+                values = np.where(missing, medians[j], values)
+            out[:, j] = (values - means[j]) / scales[j]
+
+        if self.encoding != 'native':
+            out[:, len(self.numeric_features):] = 0.0
+        for j, feature in enumerate(self.categorical_features):
+            vocabulary = self.vocabularies[j]
+            values = columns[feature]
+            if isinstance(values, DictionaryColumn):
+                lookup = np.array([vocabulary.get(_fill_missing(v), -1) for v in values.dictionary],
+                                  dtype=np.intp)
+                codes = lookup[values.codes]
+            else:
+                codes = np.fromiter(
+                    (vocabulary.get(_fill_missing(v), -1) for v in values),
+                    dtype=np.intp, count=n_rows)
+            if self.encoding == 'native':
+                # handle_unknown='use_encoded_value': unknown categories become NaN (missing)
+                out[:, self.offsets[j]] = np.where(codes >= 0, codes, np.nan)
+                continue
+            # handle_unknown='ignore': unknown categories leave the block at zero
+            known = codes >= 0
+            out[np.nonzero(known)[0], self.offsets[j] + codes[known]] = 1.0
+        return out
+
+    def encoded_errors(self, X):
+        """Problems with an already-encoded matrix: wrong width, NaN numerics, invalid category encodings"""
+        if X.ndim != 2 or X.shape[1] != self.n_features_out:
+            return [('shape', f'Expected shape (n, {self.n_features_out}), got {X.shape}')]
+        errors = []
+        n_numeric = len(self.numeric_features)
+        for j in np.flatnonzero(np.isnan(X[:, :n_numeric]).any(axis=0)):
+            errors.append((self.numeric_features[j], 'Field required (NaN in encoded input)'))
+        for j, feature in enumerate(self.categorical_features):
+            offset = self.offsets[j]
+            if self.encoding == 'native':
+                codes = X[:, offset]
+                valid = (codes >= 0) & (codes < len(self.categories[j])) & (codes % 1 == 0)
+            else:
+                block = X[:, offset:offset + len(self.categories[j])]
+                valid = ((block == 0) | (block == 1)).all(axis=1) & (block.sum(axis=1) == 1)
+            if not valid.all():
+                errors.append((feature, f'Unknown or invalid category encoding in {int((~valid).sum())} rows'))
+        return errors
+
+    def transform_rows(self, rows, out=None):
+        """Fill a float32 matrix straight from request rows"""
+        return self.transform_columns(self.columns_from_rows(rows), out=out)
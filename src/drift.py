@@ -6,8 +6,14 @@ import json
 import os
 import warnings
 
+from src.drift_sketch import ReferenceProfile, DriftSketch, is_numeric_column, ks_pvalue
+from src import schema
+
 warnings.filterwarnings("ignore", message="ks_2samp: Exact calculation unsuccessful. Switching to method=asymp.")
 
+# ks_2samp's method='auto' switches to the asymptotic distribution above this size
+MAX_EXACT_KS_N = 10000
+
 def calculate_psi(expected, actual, buckets=10):
     breakpoints = np.percentile(expected, np.linspace(0, 100, buckets + 1))
     breakpoints[-1] += 1e-6
@@ -30,7 +36,7 @@ def detect_drift(ref_data, new_data, threshold=0.2):
     for column in ref_data.columns:
         if column not in new_data.columns:
             continue
-        if ref_data[column].dtype in ['float64', 'int64']:
+        if is_numeric_column(ref_data[column]):
             ks_stat, ks_pvalue = ks_2samp(ref_data[column], new_data[column])
             psi = calculate_psi(ref_data[column], new_data[column])
             feature_drift = psi > threshold or ks_pvalue < 0.05
@@ -51,18 +57,187 @@ def detect_drift(ref_data, new_data, threshold=0.2):
     results["overall_drift"] = drift_detected
     return results
 
+def _stack_windows(frames, column):
+    """Concatenate one column of every window, with the window id of each row"""
+    values = [frame[column].to_numpy() for frame in frames]
+    sizes = np.array([len(v) for v in values])
+    window_ids = np.repeat(np.arange(len(frames)), sizes)
+    return np.concatenate(values), window_ids, sizes
+
+def _windows_psi(ref_values, values, window_ids, sizes, buckets=10):
+    """PSI of every window against the reference, with np.histogram's bin semantics"""
+    breakpoints = np.percentile(ref_values, np.linspace(0, 100, buckets + 1))
+    breakpoints[-1] += 1e-6
+    expected_counts, _ = np.histogram(ref_values, breakpoints)
+    expected_percents = np.clip(expected_counts / len(ref_values), 1e-6, 1)
+
+    # Bin i holds [e_i, e_i+1); the last bin is closed; values outside are dropped
+    bins = np.searchsorted(breakpoints, values, side='right') - 1
+    bins[values == breakpoints[-1]] = buckets - 1
+    inside = (bins >= 0) & (bins < buckets)
+    counts = np.bincount(window_ids[inside] * buckets + bins[inside],
+                         minlength=len(sizes) * buckets).reshape(len(sizes), buckets)
+    actual_percents = np.clip(counts / sizes[:, None], 1e-6, 1)
+    return np.sum((actual_percents - expected_percents) * np.log(actual_percents / expected_percents), axis=1)
+
+def _windows_ks_statistic(ref_values, values, window_ids, sizes):
+    """Two-sample KS statistic of every window against the reference
+
+    The windows are sorted once (by window, then value). Between two points of a
+    window its CDF is flat, so the supremum over the union of both samples is
+    reached either at a window point or just before one; both are read off
+    with searchsorted against the sorted reference.
+    """
+    ref_sorted = np.sort(ref_values)
+    order = np.lexsort((values, window_ids))
+    v = values[order]
+    w = window_ids[order]
+    n = len(v)
+    index = np.arange(n)
+    offsets = np.concatenate([[0], np.cumsum(sizes)])
+
+    new_run = np.ones(n, dtype=bool)
+    new_run[1:] = (w[1:] != w[:-1]) | (v[1:] != v[:-1])
+    run_end = np.ones(n, dtype=bool)
+    run_end[:-1] = new_run[1:]
+    first = np.maximum.accumulate(np.where(new_run, index, 0))
+    last = np.minimum.accumulate(np.where(run_end, index, n)[::-1])[::-1]
+
+    start = offsets[w]
+    window_sizes = sizes[w]
+    new_right = (last + 1 - start) / window_sizes
+    new_left = (first - start) / window_sizes
+    ref_right = np.searchsorted(ref_sorted, v, side='right') / len(ref_sorted)
+    ref_left = np.searchsorted(ref_sorted, v, side='left') / len(ref_sorted)
+    diffs = np.maximum(np.abs(ref_right - new_right), np.abs(ref_left - new_left))
+
+    statistics = np.zeros(len(sizes))
+    non_empty = sizes > 0
+    statistics[non_empty] = np.maximum.reduceat(diffs, offsets[:-1][non_empty])
+    return statistics
+
+def _ks_pvalue(statistic, ref_values, window_values):
+    n1, n2 = len(ref_values), len(window_values)
+    if max(n1, n2) <= MAX_EXACT_KS_N:
+        # ks_2samp would use its exact distribution here; defer to it so results match
+        return ks_2samp(ref_values, window_values)[1]
+    return ks_pvalue(statistic, n1, n2)
+
+def _windows_tvd(ref_column, values, window_ids, sizes):
+    """Total variation distance of every window against the reference"""
+    codes, _ = pd.factorize(np.concatenate([ref_column.to_numpy(), values]))
+    n_categories = codes.max() + 1
+    ref_codes = codes[:len(ref_column)]
+    new_codes = codes[len(ref_column):]
+    ref_counts = np.bincount(ref_codes[ref_codes >= 0], minlength=n_categories)
+    known = new_codes >= 0
+    new_counts = np.bincount(window_ids[known] * n_categories + new_codes[known],
+                             minlength=len(sizes) * n_categories).reshape(len(sizes), n_categories)
+    ref_freqs = ref_counts / ref_counts.sum()
+    totals = new_counts.sum(axis=1, keepdims=True)
+    new_freqs = new_counts / np.where(totals == 0, 1, totals)
+    return 0.5 * np.sum(np.abs(ref_freqs - new_freqs), axis=1)
+
+def detect_drift_windows(ref_data, windows, threshold=0.2):
+    """detect_drift for many windows at once
+
+    windows is a list or dict of DataFrames; the result has the same type with
+    one report per window, identical to calling detect_drift on each. PSI,
+    the KS statistic and TVD are one vectorized pass over all windows per
+    feature. The KS p-value is still per window: whenever max(n_ref, n_window)
+    <= MAX_EXACT_KS_N (the usual case for reference samples) it comes from
+    scipy's exact ks_2samp, one call per window not already flagged by PSI.
+    """
+    keys = list(windows) if isinstance(windows, dict) else list(range(len(windows)))
+    frames = [windows[k] for k in keys]
+    reports = [{"threshold": threshold, "overall_drift": False, "features": {}} for _ in frames]
+
+    for column in ref_data.columns:
+        present = [i for i, frame in enumerate(frames) if column in frame.columns]
+        if not present:
+            continue
+        values, window_ids, sizes = _stack_windows([frames[i] for i in present], column)
+        if is_numeric_column(ref_data[column]):
+            ref_values = ref_data[column].to_numpy()
+            psis = _windows_psi(ref_values, values.astype(np.float64), window_ids, sizes)
+            statistics = _windows_ks_statistic(ref_values.astype(np.float64), values.astype(np.float64),
+                                               window_ids, sizes)
+            # _stack_windows lays the windows out contiguously, in order
+            offsets = np.concatenate([[0], np.cumsum(sizes)])
+            for j, i in enumerate(present):
+                feature_drift = psis[j] > threshold
+                if not feature_drift:
+                    window_values = values[offsets[j]:offsets[j + 1]]
+                    feature_drift = _ks_pvalue(statistics[j], ref_values, window_values) < 0.05
+                reports[i]["features"][column] = round(psis[j], 3)
+                if feature_drift:
+                    reports[i]["overall_drift"] = True
+        else:
+            tvds = _windows_tvd(ref_data[column], values, window_ids, sizes)
+            for j, i in enumerate(present):
+                reports[i]["features"][column] = round(tvds[j], 3)
+                if tvds[j] > threshold:
+                    reports[i]["overall_drift"] = True
+
+    if isinstance(windows, dict):
+        return dict(zip(keys, reports))
+    return reports
+
+def sketch_file(profile, path, chunksize=100_000):
+    """Stream a CSV or Parquet file/directory into a DriftSketch without holding it in memory"""
+    sketch = profile.new_sketch()
+    for chunk in schema.iter_table(path, chunksize):
+        sketch.update(chunk)
+    return sketch
+
 def main():
     parser = argparse.ArgumentParser()
-    parser.add_argument("--ref", required=True)
-    parser.add_argument("--new", required=True)
+    parser.add_argument("--ref", help="Reference CSV or Parquet")
+    parser.add_argument("--new", help="New-data CSV, Parquet file or prediction log directory")
     parser.add_argument("--out", default="artifacts/drift_report.json")
     parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--save-profile", help="Write the reference profile built from --ref to this path")
+    parser.add_argument("--profile", help="Use a saved reference profile instead of --ref")
+    parser.add_argument("--sketch", nargs="*", default=[], help="Saved new-side sketches to merge")
+    parser.add_argument("--save-sketch", help="Write the new-side sketch to this path")
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--by", help="Split --new into windows by this column and report each")
     args = parser.parse_args()
 
-    ref_data = pd.read_csv(args.ref)
-    new_data = pd.read_csv(args.new)
+    if args.save_profile:
+        if not args.ref:
+            parser.error("--save-profile requires --ref")
+        ReferenceProfile.from_frame(schema.read_table(args.ref)).save(args.save_profile)
+        print(f"Reference profile saved to {args.save_profile}")
+        if not (args.new or args.sketch):
+            return
 
-    drift_report = detect_drift(ref_data, new_data, args.threshold)
+    if args.profile or args.sketch or args.save_sketch:
+        # Sketch mode: reference profile vs. mergeable new-side sketches
+        if args.profile:
+            profile = ReferenceProfile.load(args.profile)
+        elif args.ref:
+            profile = ReferenceProfile.from_frame(schema.read_table(args.ref))
+        else:
+            parser.error("sketch mode requires --profile or --ref")
+        sketch = profile.new_sketch()
+        for path in args.sketch:
+            sketch.merge(DriftSketch.load(profile, path))
+        if args.new:
+            sketch.merge(sketch_file(profile, args.new, args.chunksize))
+        if args.save_sketch:
+            sketch.save(args.save_sketch)
+        drift_report = sketch.report(args.threshold)
+    else:
+        if not (args.ref and args.new):
+            parser.error("--ref and --new are required")
+        ref_data = schema.read_table(args.ref)
+        new_data = schema.read_table(args.new)
+        if args.by:
+            windows = {str(key): frame for key, frame in new_data.groupby(args.by, sort=True, observed=True)}
+            drift_report = detect_drift_windows(ref_data, windows, args.threshold)
+        else:
+            drift_report = detect_drift(ref_data, new_data, args.threshold)
 
     os.makedirs(os.path.dirname(args.out), exist_ok=True)
     with open(args.out, "w") as f:
@@ -0,0 +1,115 @@
+import threading
+import time
+from collections import deque
+
+from src.drift_sketch import DriftSketch
+
+
+class OnlineDriftMonitor:
+    """Sliding-window drift over the traffic the service scores
+
+    The request path only appends the scored batch to a bounded deque (no lock,
+    no NumPy work). A background thread folds queued batches into per-interval
+    DriftSketch buckets; a report merges the buckets inside the requested
+    window, so its cost depends on the number of bins, not on traffic volume.
+    """
+
+    def __init__(self, profile, bucket_seconds=60, window_seconds=3600,
+                 max_pending_batches=4096, flush_interval=0.5):
+        self.profile = profile
+        self.bucket_seconds = bucket_seconds
+        self.window_seconds = window_seconds
+        self.flush_interval = flush_interval
+        self._buckets = deque(maxlen=max(1, int(window_seconds // bucket_seconds) + 1))
+        self._pending = deque(maxlen=max_pending_batches)
+        self._lock = threading.Lock()
+        # Draining is serialized (background thread vs. /drift reports) so
+        # batches are folded in the order they were queued
+        self._drain_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.observed_batches = 0
+        self.dropped_batches = 0
+
+    def start(self):
+        """Start the background thread that folds batches into sketches"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='drift-monitor', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def observe(self, columns):
+        """Queue a scored batch (mapping of feature -> values); never blocks"""
+        if len(self._pending) == self._pending.maxlen:
+            # The deque discards its oldest entry rather than growing
+            self.dropped_batches += 1
+        self._pending.append((time.time(), columns))
+        self.observed_batches += 1
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.drain()
+
+    def drain(self):
+        """Fold every queued batch into the sketch of its time bucket"""
+        with self._drain_lock:
+            while True:
+                try:
+                    ts, columns = self._pending.popleft()
+                except IndexError:
+                    return
+                with self._lock:
+                    sketch = self._bucket(ts - ts % self.bucket_seconds)
+                    if sketch is None:
+                        self.dropped_batches += 1
+                    else:
+                        sketch.update(columns)
+
+    def _bucket(self, bucket_start):
+        """Sketch of the bucket starting at bucket_start, created in order if missing
+
+        Caller holds _lock. Returns None for a bucket older than every
+        retained one when the window is full.
+        """
+        buckets = self._buckets
+        if not buckets or buckets[-1][0] < bucket_start:
+            buckets.append((bucket_start, DriftSketch.empty(self.profile)))
+            return buckets[-1][1]
+        position = len(buckets)
+        while position and buckets[position - 1][0] > bucket_start:
+            position -= 1
+        if position and buckets[position - 1][0] == bucket_start:
+            return buckets[position - 1][1]
+        if len(buckets) == buckets.maxlen:
+            if position == 0:
+                return None
+            buckets.popleft()
+            position -= 1
+        buckets.insert(position, (bucket_start, DriftSketch.empty(self.profile)))
+        return buckets[position][1]
+
+    def sketch(self, window_seconds=None):
+        """Merged sketch of the buckets overlapping the last window_seconds
+
+        Raises ValueError for windows longer than window_seconds: older
+        buckets are not retained.
+        """
+        if window_seconds is not None and window_seconds > self.window_seconds:
+            raise ValueError(f"Window of {window_seconds:g}s exceeds the retained "
+                             f"{self.window_seconds:g}s (DRIFT_WINDOW_SECONDS)")
+        self.drain()
+        cutoff = time.time() - (window_seconds or self.window_seconds)
+        merged = DriftSketch.empty(self.profile)
+        with self._lock:
+            for bucket_start, sketch in self._buckets:
+                if bucket_start + self.bucket_seconds > cutoff:
+                    merged.merge(sketch)
+        return merged
+
+    def report(self, window_seconds=None, threshold=0.2):
+        """Drift report over the sliding window, in detect_drift's JSON shape"""
+        return self.sketch(window_seconds).report(threshold)
@@ -0,0 +1,273 @@
+import json
+import os
+
+import numpy as np
+
+PSI_BUCKETS = 10
+MAX_KS_GRID = 8192
+KS_PVALUE_THRESHOLD = 0.05
+MISSING_KEYS = ('None', 'nan')
+ARRAY_KEYS = ('breakpoints', 'counts', 'ks_grid', 'ks_cdf')
+
+
+def is_numeric_column(series):
+    """Same numeric/categorical split that detect_drift uses
+
+    Any int/uint/float width counts as numeric, so compact dtypes (int16,
+    float32) are not mistaken for categoricals; bool and category are not.
+    """
+    return series.dtype.kind in 'iuf'
+
+
+def ks_pvalue(d, n1, n2):
+    """Two-sided KS p-value from the asymptotic distribution ks_2samp uses for large samples"""
+    from scipy.stats import kstwo
+    m, n = sorted([float(n1), float(n2)], reverse=True)
+    return float(kstwo.sf(d, np.round(m * n / (m + n))))
+
+
+def _values(batch, name):
+    return np.asarray(batch[name])
+
+
+class ReferenceProfile:
+    """Reference-side drift statistics, computed once and persisted
+
+    Numeric features keep the PSI percentile breakpoints with the reference
+    histogram over them, plus a KS grid (the distinct reference values, or
+    quantiles of them when there are more than ``max_ks_grid``) with the
+    reference CDF on that grid. Categorical features keep category
+    frequencies.
+    """
+
+    def __init__(self, features):
+        self.features = features
+        for ref in features.values():
+            if ref['kind'] == 'numeric':
+                for key in ARRAY_KEYS:
+                    ref[key] = np.asarray(ref[key])
+
+    @classmethod
+    def from_frame(cls, ref_data, buckets=PSI_BUCKETS, max_ks_grid=MAX_KS_GRID):
+        """Build the profile from a reference DataFrame"""
+        features = {}
+        for column in ref_data.columns:
+            series = ref_data[column]
+            if is_numeric_column(series):
+                values = series.to_numpy(dtype=np.float64)
+                breakpoints = np.percentile(values, np.linspace(0, 100, buckets + 1))
+                breakpoints[-1] += 1e-6
+                ref_counts, _ = np.histogram(values, breakpoints)
+                valid = np.sort(values[~np.isnan(values)])
+                grid = np.unique(valid)
+                if len(grid) > max_ks_grid:
+                    grid = np.unique(np.quantile(valid, np.linspace(0, 1, max_ks_grid)))
+                cdf = np.searchsorted(valid, grid, side='right') / len(valid)
+                features[column] = {
+                    'kind': 'numeric',
+                    # float32 references are compared against float32-rounded new values
+                    'dtype': 'float32' if series.dtype == np.float32 else 'float64',
+                    'n': int(len(values)),
+                    'n_valid': int(len(valid)),
+                    'breakpoints': breakpoints,
+                    'counts': ref_counts,
+                    'ks_grid': grid,
+                    'ks_cdf': cdf,
+                }
+            else:
+                freqs = series.value_counts(normalize=True)
+                features[column] = {
+                    'kind': 'categorical',
+                    'n': int(series.notna().sum()),
+                    'frequencies': {str(k): float(v) for k, v in freqs.items()},
+                }
+        return cls(features)
+
+    def new_sketch(self):
+        """Empty streaming sketch aligned to this profile"""
+        return DriftSketch.empty(self)
+
+    def to_dict(self):
+        features = {}
+        for name, ref in self.features.items():
+            features[name] = {k: (v.tolist() if isinstance(v, np.ndarray) else v) for k, v in ref.items()}
+        return {'features': features}
+
+    @classmethod
+    def from_dict(cls, obj):
+        return cls(obj['features'])
+
+    def save(self, filepath):
+        """Save the profile as JSON"""
+        directory = os.path.dirname(filepath)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(filepath, 'w') as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, filepath):
+        """Load a profile saved with save()"""
+        with open(filepath) as f:
+            return cls.from_dict(json.load(f))
+
+
+class DriftSketch:
+    """Mergeable streaming summary of the "new" side of a drift check
+
+    Numeric features count rows into the profile's PSI buckets and into the
+    KS grid (separate buckets for values equal to a grid point and values
+    strictly between two grid points). Categorical features count each
+    category. All counts are additive, so sketches built batch by batch or
+    on several workers can be merged, and a drift report costs O(bins)
+    however many rows were observed.
+    """
+
+    def __init__(self, profile, features):
+        self.profile = profile
+        self.features = features
+
+    @classmethod
+    def empty(cls, profile):
+        features = {}
+        for name, ref in profile.features.items():
+            if ref['kind'] == 'numeric':
+                features[name] = {
+                    'n': 0,
+                    'n_valid': 0,
+                    'counts': np.zeros(len(ref['counts']), dtype=np.int64),
+                    'ks_counts': np.zeros(2 * len(ref['ks_grid']) + 1, dtype=np.int64),
+                }
+            else:
+                features[name] = {'n': 0, 'counts': {}}
+        return cls(profile, features)
+
+    def update(self, batch):
+        """Fold a batch (DataFrame or mapping of column -> values) into the sketch"""
+        for name, ref in self.profile.features.items():
+            if name not in batch:
+                continue
+            state = self.features[name]
+            values = _values(batch, name)
+            if ref['kind'] == 'numeric':
+                if ref.get('dtype') == 'float32':
+                    values = values.astype(np.float32, copy=False)
+                values = values.astype(np.float64, copy=False)
+                counts, _ = np.histogram(values, ref['breakpoints'])
+                state['counts'] += counts
+                state['n'] += len(values)
+                valid = values[~np.isnan(values)]
+                grid = ref['ks_grid']
+                # Bucket 2j holds (grid[j-1], grid[j]), bucket 2j+1 holds grid[j] exactly
+                buckets = (np.searchsorted(grid, valid, side='left')
+                           + np.searchsorted(grid, valid, side='right'))
+                state['ks_counts'] += np.bincount(buckets, minlength=len(state['ks_counts']))
+                state['n_valid'] += len(valid)
+            else:
+                counts = state['counts']
+                keys, key_counts = np.unique(values.astype(str), return_counts=True)
+                for key, count in zip(keys.tolist(), key_counts.tolist()):
+                    # None/NaN stringify to these; value_counts drops them too
+                    if key in MISSING_KEYS:
+                        continue
+                    counts[key] = counts.get(key, 0) + count
+                    state['n'] += count
+        return self
+
+    def merge(self, other):
+        """Add another sketch built against the same profile into this one"""
+        for name, state in self.features.items():
+            theirs = other.features[name]
+            state['n'] += theirs['n']
+            if 'n_valid' in state:
+                state['n_valid'] += theirs['n_valid']
+                state['counts'] += theirs['counts']
+                state['ks_counts'] += theirs['ks_counts']
+            else:
+                for key, count in theirs['counts'].items():
+                    state['counts'][key] = state['counts'].get(key, 0) + count
+        return self
+
+    def psi(self, name):
+        ref = self.profile.features[name]
+        state = self.features[name]
+        expected_percents = ref['counts'] / ref['n']
+        actual_percents = state['counts'] / state['n']
+        expected_percents = np.clip(expected_percents, 1e-6, 1)
+        actual_percents = np.clip(actual_percents, 1e-6, 1)
+        return np.sum((actual_percents - expected_percents) * np.log(actual_percents / expected_percents))
+
+    def ks(self, name):
+        """KS statistic and p-value against the reference; exact when the grid holds every reference value"""
+        ref = self.profile.features[name]
+        state = self.features[name]
+        ref_cdf = ref['ks_cdf']
+        ref_cdf_left = np.concatenate([[0.0], ref_cdf[:-1]])
+        cumulative = np.cumsum(state['ks_counts']) / state['n_valid']
+        new_cdf = cumulative[1::2]
+        new_cdf_left = cumulative[0::2][:len(ref_cdf)]
+        d = max(np.max(np.abs(ref_cdf - new_cdf)), np.max(np.abs(ref_cdf_left - new_cdf_left)))
+        return float(d), ks_pvalue(d, ref['n_valid'], state['n_valid'])
+
+    def tvd(self, name):
+        ref = self.profile.features[name]['frequencies']
+        state = self.features[name]
+        new = {k: v / state['n'] for k, v in state['counts'].items()}
+        categories = sorted(set(ref) | set(new))
+        return 0.5 * np.sum([abs(ref.get(c, 0.0) - new.get(c, 0.0)) for c in categories])
+
+    def report(self, threshold=0.2):
+        """Drift report with the same JSON shape as detect_drift"""
+        results = {
+            "threshold": threshold,
+            "overall_drift": False,
+            "features": {}
+        }
+        drift_detected = False
+        for name, ref in self.profile.features.items():
+            if self.features[name]['n'] == 0:
+                continue
+            if ref['kind'] == 'numeric':
+                psi = self.psi(name)
+                has_ks = self.features[name]['n_valid'] and ref['n_valid']
+                pvalue = self.ks(name)[1] if has_ks else 1.0
+                feature_drift = psi > threshold or pvalue < KS_PVALUE_THRESHOLD
+                results["features"][name] = round(psi, 3)
+            else:
+                tvd = self.tvd(name)
+                feature_drift = tvd > threshold
+                results["features"][name] = round(tvd, 3)
+            if feature_drift:
+                drift_detected = True
+        results["overall_drift"] = drift_detected
+        return results
+
+    def to_dict(self):
+        features = {}
+        for name, state in self.features.items():
+            features[name] = {k: (v.tolist() if isinstance(v, np.ndarray) else v) for k, v in state.items()}
+        return {'features': features}
+
+    @classmethod
+    def from_dict(cls, profile, obj):
+        sketch = cls.empty(profile)
+        for name, state in obj['features'].items():
+            for key, value in state.items():
+                if isinstance(sketch.features[name][key], np.ndarray):
+                    value = np.asarray(value, dtype=np.int64)
+                sketch.features[name][key] = value
+        return sketch
+
+    def save(self, filepath):
+        """Save the sketch as JSON"""
+        directory = os.path.dirname(filepath)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(filepath, 'w') as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, profile, filepath):
+        """Load a sketch saved with save()"""
+        with open(filepath) as f:
+            return cls.from_dict(profile, json.load(f))
@@ -0,0 +1,161 @@
+# Binary classifier evaluation from a single sort: ROC-AUC, PR-AUC (average
+# precision), accuracy/precision/recall/F1 at any threshold, operating threshold
+# selection and vectorized (Poisson or multinomial) bootstrap confidence intervals.
+import numpy as np
+
+OBJECTIVES = ('f1', 'youden', 'accuracy')
+
+
+class SortedScores:
+    """Labels sorted by descending score, with cumulative counts at every distinct score
+
+    Sorting is the only O(n log n) step; every metric below is a cumulative
+    sum or a lookup over the distinct thresholds. Curves and metrics match
+    sklearn's roc_auc_score / average_precision_score (ties are one threshold).
+    """
+
+    def __init__(self, y, scores):
+        scores = np.asarray(scores)
+        y = np.asarray(y)
+        order = np.argsort(-scores, kind='stable')
+        self.scores = scores[order]
+        self.y = y[order].astype(np.int8)
+        self.n = len(self.y)
+        # Last position of each run of equal scores: the counts there include every tie
+        self.ends = np.r_[np.flatnonzero(np.diff(self.scores)), self.n - 1]
+        self.thresholds = self.scores[self.ends]
+        self.tps = np.cumsum(self.y, dtype=np.int64)[self.ends]
+        self.fps = self.ends + 1 - self.tps
+        self.positives = int(self.tps[-1]) if self.n else 0
+        self.negatives = self.n - self.positives
+
+    def roc_auc(self):
+        return _roc_auc(self.tps, self.fps)
+
+    def pr_auc(self):
+        return _average_precision(self.tps, self.fps)
+
+    def _index(self, threshold):
+        """Index of the last distinct threshold >= threshold (-1: nothing predicted positive)"""
+        return int(np.searchsorted(-self.thresholds, -threshold, side='right')) - 1
+
+    def at(self, threshold):
+        """Confusion-matrix metrics for predicting positive when score >= threshold"""
+        i = self._index(threshold)
+        tp = int(self.tps[i]) if i >= 0 else 0
+        fp = int(self.fps[i]) if i >= 0 else 0
+        return _point_metrics(tp, fp, self.positives, self.negatives)
+
+    def evaluate(self, threshold=0.5):
+        return {'roc_auc': self.roc_auc(), 'pr_auc': self.pr_auc(), **self.at(threshold)}
+
+    def curve(self):
+        """Precision, recall, F1, FPR and accuracy at every distinct threshold (arrays)"""
+        tps, fps = self.tps.astype(np.float64), self.fps.astype(np.float64)
+        precision = tps / (tps + fps)
+        recall = tps / self.positives if self.positives else np.zeros_like(tps)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+        return {
+            'threshold': self.thresholds,
+            'precision': precision,
+            'recall': recall,
+            'f1': f1,
+            'fpr': fps / self.negatives if self.negatives else np.zeros_like(fps),
+            'accuracy': (tps + self.negatives - fps) / self.n,
+        }
+
+    def select_threshold(self, objective='f1'):
+        """Threshold maximizing f1, Youden's J (tpr - fpr) or accuracy, with its metrics"""
+        if objective not in OBJECTIVES:
+            raise ValueError(f"objective must be one of {OBJECTIVES}, got {objective!r}")
+        curve = self.curve()
+        score = curve['recall'] - curve['fpr'] if objective == 'youden' else curve[objective]
+        best = int(np.argmax(score))
+        threshold = float(self.thresholds[best])
+        return {'threshold': threshold, 'objective': objective, **self.at(threshold)}
+
+    def bootstrap(self, threshold=0.5, n_boot=200, alpha=0.05, seed=42, method='poisson',
+                  max_block_elements=2 ** 23):
+        """Percentile confidence intervals for roc_auc, pr_auc and the metrics at threshold
+
+        Rows with the same score only matter through their positive and
+        negative counts, so replicates resample those counts per distinct
+        score instead of resampling rows: under "poisson" (Poisson(1) weight
+        per row) a group of k rows gets Poisson(k) weight, under
+        "multinomial" (exactly n rows drawn with replacement) the 2 x groups
+        counts are one multinomial draw. Both are exact, vectorized over
+        (replicate, group) blocks of at most max_block_elements, and never
+        touch the n rows again.
+        """
+        rng = np.random.default_rng(seed)
+        pos = np.diff(self.tps, prepend=0)
+        neg = np.diff(self.fps, prepend=0)
+        groups = len(pos)
+        block = max(1, min(n_boot, max_block_elements // max(2 * groups, 1)))
+        i = self._index(threshold)
+        replicates = {name: [] for name in ('roc_auc', 'pr_auc', 'accuracy', 'precision', 'recall', 'f1')}
+        for start in range(0, n_boot, block):
+            size = min(block, n_boot - start)
+            if method == 'poisson':
+                pos_w = rng.poisson(pos, size=(size, groups))
+                neg_w = rng.poisson(neg, size=(size, groups))
+            elif method == 'multinomial':
+                counts = rng.multinomial(self.n, np.r_[pos, neg] / self.n, size=size)
+                pos_w, neg_w = counts[:, :groups], counts[:, groups:]
+            else:
+                raise ValueError(f"method must be 'poisson' or 'multinomial', got {method!r}")
+            tps = np.cumsum(pos_w, axis=1)
+            fps = np.cumsum(neg_w, axis=1)
+            replicates['roc_auc'].append(_roc_auc(tps, fps))
+            replicates['pr_auc'].append(_average_precision(tps, fps))
+            tp = tps[:, i] if i >= 0 else np.zeros(size)
+            fp = fps[:, i] if i >= 0 else np.zeros(size)
+            for name, values in _point_metrics(tp, fp, tps[:, -1], fps[:, -1]).items():
+                replicates[name].append(values)
+        quantiles = [alpha / 2, 1 - alpha / 2]
+        return {name: [float(q) for q in np.nanquantile(np.concatenate(values), quantiles)]
+                for name, values in replicates.items()}
+
+
+def _roc_auc(tps, fps):
+    """Trapezoidal ROC-AUC from cumulative counts (last axis: thresholds, high to low)"""
+    tps, fps = np.asarray(tps, dtype=np.float64), np.asarray(fps, dtype=np.float64)
+    P, N = tps[..., -1:], fps[..., -1:]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        tpr = np.concatenate([np.zeros_like(P), tps / P], axis=-1)
+        fpr = np.concatenate([np.zeros_like(N), fps / N], axis=-1)
+    auc = (np.diff(fpr, axis=-1) * (tpr[..., 1:] + tpr[..., :-1]) / 2).sum(axis=-1)
+    return float(auc) if np.ndim(auc) == 0 else auc
+
+
+def _average_precision(tps, fps):
+    """sum_k (R_k - R_{k-1}) * P_k, as sklearn's average_precision_score"""
+    tps, fps = np.asarray(tps, dtype=np.float64), np.asarray(fps, dtype=np.float64)
+    P = tps[..., -1:]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # Zero-weight leading groups (bootstrap replicates) contribute no recall
+        precision = np.where(tps + fps > 0, tps / (tps + fps), 0.0)
+        recall = np.concatenate([np.zeros_like(P), tps / P], axis=-1)
+    ap = (np.diff(recall, axis=-1) * precision).sum(axis=-1)
+    return float(ap) if np.ndim(ap) == 0 else ap
+
+
+def _point_metrics(tp, fp, positives, negatives):
+    """Accuracy, precision, recall and F1 from counts (scalars or arrays of replicates)"""
+    tp, fp = np.asarray(tp, dtype=np.float64), np.asarray(fp, dtype=np.float64)
+    positives, negatives = np.asarray(positives, dtype=np.float64), np.asarray(negatives, dtype=np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        accuracy = (tp + negatives - fp) / (positives + negatives)
+        precision = np.where(tp + fp > 0, tp / (tp + fp), 0.0)
+        recall = np.where(positives > 0, tp / positives, 0.0)
+        f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+    metrics = {'accuracy': accuracy, 'precision': precision, 'recall': recall, 'f1': f1}
+    if np.ndim(tp) == 0:
+        return {name: float(value) for name, value in metrics.items()}
+    return metrics
+
+
+def evaluate(y, scores, threshold=0.5):
+    """roc_auc, pr_auc and accuracy/precision/recall/f1 at threshold, from one sort"""
+    return SortedScores(y, scores).evaluate(threshold)
@@ -0,0 +1,134 @@
+# Content-addressed cache of the train/val split and transformed feature matrices.
+# Layout: <cache_dir>/<key>/{train_idx,val_idx,X_train,X_val,y_train,y_val}.npy,
+#         feature_pipeline.pkl, drift_profile.json, meta.json
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+
+from src import features, schema
+from src.registry import file_sha256
+
+CACHE_FORMAT = 2
+ARRAYS = ('train_idx', 'val_idx', 'X_train', 'X_val', 'y_train', 'y_val')
+META_FILE = 'meta.json'
+
+
+class FeatureSet:
+    """Split and preprocessed matrices for one (data file, feature code, split) combination"""
+
+    def __init__(self, key, preprocessor, arrays, profile, hit, seconds, path=None):
+        self.key = key
+        self.preprocessor = preprocessor
+        self.profile = profile
+        self.hit = hit
+        self.seconds = seconds
+        self.path = path
+        for name in ARRAYS:
+            setattr(self, name, arrays[name])
+
+    def cache_info(self):
+        """Summary logged to metrics.json"""
+        return {'key': self.key, 'hit': self.hit, 'path': self.path, 'seconds': self.seconds}
+
+
+def data_sha256(data_path):
+    """Content hash of a data file, or of every visible file of a Parquet directory"""
+    if not os.path.isdir(data_path):
+        return file_sha256(data_path)
+    listing = ''.join(f'{os.path.basename(f)}:{file_sha256(f)}\n' for f in schema.dataset_files(data_path))
+    return hashlib.sha256(listing.encode()).hexdigest()
+
+
+def cache_key(data_path, preprocessor, test_size, random_state, target):
+    """Hash of the data file, the feature and dtype code, the pipeline config and the split settings"""
+    import sklearn
+    config = {
+        'format': CACHE_FORMAT,
+        'data_sha256': data_sha256(data_path),
+        'features_sha256': file_sha256(features.__file__),
+        'schema_sha256': file_sha256(schema.__file__),
+        'numeric_features': preprocessor.numeric_features,
+        'categorical_features': preprocessor.categorical_features,
+        'pipeline': repr(preprocessor.preprocessor),
+        'sklearn': sklearn.__version__,
+        'test_size': test_size,
+        'random_state': random_state,
+        'target': target,
+    }
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()[:32]
+
+
+def load_or_build(data_path, cache_dir=None, test_size=0.2, random_state=42, target='churned',
+                  encoding='onehot'):
+    """Cached FeatureSet for data_path, building (and persisting) it on a miss
+
+    Hits memory-map the stored matrices and skip CSV parsing and the
+    ColumnTransformer entirely. cache_dir=None always builds in memory.
+    """
+    from src.drift_sketch import ReferenceProfile
+
+    start = time.perf_counter()
+    preprocessor = features.FeaturePreprocessor(encoding=encoding)
+    key = cache_key(data_path, preprocessor, test_size, random_state, target)
+    path = os.path.join(cache_dir, key) if cache_dir else None
+
+    if path and os.path.exists(os.path.join(path, META_FILE)):
+        arrays = {name: np.load(os.path.join(path, name + '.npy'), mmap_mode='r') for name in ARRAYS}
+        preprocessor = features.FeaturePreprocessor.load(os.path.join(path, 'feature_pipeline.pkl'))
+        profile = ReferenceProfile.load(os.path.join(path, 'drift_profile.json'))
+        return FeatureSet(key, preprocessor, arrays, profile, True, time.perf_counter() - start, path)
+
+    arrays, profile = _build(data_path, preprocessor, test_size, random_state, target)
+    if path:
+        _write(path, arrays, preprocessor, profile)
+    return FeatureSet(key, preprocessor, arrays, profile, False, time.perf_counter() - start, path)
+
+
+def _build(data_path, preprocessor, test_size, random_state, target):
+    from sklearn.model_selection import train_test_split
+    from src.drift_sketch import ReferenceProfile
+
+    data = schema.read_table(data_path)
+    if target not in data.columns:
+        raise ValueError(f"{data_path} has no '{target}' column (prediction logs need labels joined in to train)")
+    # Only the features: prediction logs also carry scores, versions and timestamps
+    X = data[preprocessor.numeric_features + preprocessor.categorical_features]
+    y = data[target].to_numpy()
+    # Splitting positions gives the same rows as splitting X and y directly
+    train_idx, val_idx = train_test_split(
+        np.arange(len(data)), test_size=test_size, random_state=random_state, stratify=y
+    )
+    X_train, X_val = X.iloc[train_idx], X.iloc[val_idx]
+    arrays = {
+        'train_idx': train_idx,
+        'val_idx': val_idx,
+        'X_train': preprocessor.fit_transform(X_train).astype(np.float32),
+        'X_val': preprocessor.transform(X_val).astype(np.float32),
+        'y_train': y[train_idx],
+        'y_val': y[val_idx],
+    }
+    return arrays, ReferenceProfile.from_frame(X_train)
+
+
+def _write(path, arrays, preprocessor, profile):
+    # Assemble under a temporary name and rename, so a crashed run never leaves a partial entry
+    staging = f'{path}.tmp-{os.getpid()}'
+    os.makedirs(staging, exist_ok=True)
+    try:
+        for name in ARRAYS:
+            np.save(os.path.join(staging, name + '.npy'), arrays[name])
+        preprocessor.save(os.path.join(staging, 'feature_pipeline.pkl'))
+        profile.save(os.path.join(staging, 'drift_profile.json'))
+        with open(os.path.join(staging, META_FILE), 'w') as f:
+            json.dump({'format': CACHE_FORMAT, 'shapes': {n: list(arrays[n].shape) for n in ARRAYS}}, f)
+        os.rename(staging, path)
+    except OSError:
+        # Another run published the same key first; its entry is identical
+        if not os.path.exists(os.path.join(path, META_FILE)):
+            raise
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
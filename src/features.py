@@ -2,16 +2,26 @@
 import pandas as pd
 import numpy as np
 from sklearn.base import BaseEstimator, TransformerMixin
-from sklearn.preprocessing import StandardScaler, OneHotEncoder
+from sklearn.preprocessing import StandardScaler, OneHotEncoder, OrdinalEncoder
 from sklearn.impute import SimpleImputer
 from sklearn.pipeline import Pipeline
 from sklearn.compose import ColumnTransformer
 import joblib
 
+ENCODINGS = ('onehot', 'native')
+
 class FeaturePreprocessor:
-    """Preprocess features for churn prediction"""
+    """Preprocess features for churn prediction
+
+    encoding="onehot" expands categoricals into dense indicator columns;
+    "native" emits one ordinal code column per categorical (unknown -> NaN)
+    for XGBoost's native categorical splits.
+    """
     
-    def __init__(self):
+    def __init__(self, encoding='onehot'):
+        if encoding not in ENCODINGS:
+            raise ValueError(f"encoding must be one of {ENCODINGS}, got {encoding!r}")
+        self.encoding = encoding
         self.numeric_features = [
             'add_on_count', 'tenure_months', 'monthly_usage_gb', 
             'avg_latency_ms', 'support_tickets_30d', 'discount_pct', 
@@ -31,9 +41,14 @@ class FeaturePreprocessor:
             ('scaler', StandardScaler())
         ])
         
+        if self.encoding == 'native':
+            encoder = ('ordinal', OrdinalEncoder(handle_unknown='use_encoded_value', unknown_value=np.nan,
+                                                 dtype=np.float32))
+        else:
+            encoder = ('onehot', OneHotEncoder(handle_unknown='ignore', sparse_output=False))
         categorical_transformer = Pipeline(steps=[
             ('imputer', SimpleImputer(strategy='constant', fill_value='missing')),
-            ('onehot', OneHotEncoder(handle_unknown='ignore', sparse_output=False))
+            encoder
         ])
         
         preprocessor = ColumnTransformer(
@@ -44,18 +59,33 @@ class FeaturePreprocessor:
         
         return preprocessor
     
+    def feature_types(self):
+        """XGBoost feature_types for the transformed columns ('c' marks native categoricals)"""
+        if self.encoding != 'native':
+            return None
+        return ['q'] * len(self.numeric_features) + ['c'] * len(self.categorical_features)
+    
+    def _float32_numerics(self, X):
+        """Numeric columns as float32, whatever dtypes the caller read them with
+
+        Imputing and scaling then use the same float32 arithmetic as
+        CompiledPreprocessor, so serving encodes rows exactly as training did.
+        """
+        casts = {f: np.float32 for f in self.numeric_features if f in X.columns and X[f].dtype != np.float32}
+        return X.astype(casts) if casts else X
+    
     def fit(self, X, y=None):
         """Fit the preprocessor"""
-        self.preprocessor.fit(X)
+        self.preprocessor.fit(self._float32_numerics(X))
         return self
     
     def transform(self, X):
         """Transform the data"""
-        return self.preprocessor.transform(X)
+        return self.preprocessor.transform(self._float32_numerics(X))
     
     def fit_transform(self, X, y=None):
         """Fit and transform the data"""
-        return self.preprocessor.fit_transform(X, y)
+        return self.preprocessor.fit_transform(self._float32_numerics(X), y)
     
     def save(self, filepath):
         """Save the preprocessor"""
@@ -65,6 +95,7 @@ class FeaturePreprocessor:
     def load(cls, filepath):
         """Load the preprocessor"""
         preprocessor = joblib.load(filepath)
-        instance = cls()
+        encoding = 'native' if 'ordinal' in preprocessor.named_transformers_['cat'].named_steps else 'onehot'
+        instance = cls(encoding=encoding)
         instance.preprocessor = preprocessor
         return instance
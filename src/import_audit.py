@@ -0,0 +1,81 @@
+# Check that the serving path does not import training-only modules.
+# CLI: python -m src.import_audit [--artifacts artifacts/]
+import argparse
+import importlib.abc
+import json
+import sys
+import time
+
+# Training-only code that serving must never import directly. Third-party
+# libraries are attributed to whoever imported them, so e.g. sklearn being
+# pulled in by xgboost's own import is not counted against our code.
+FORBIDDEN_PACKAGES = ('sklearn', 'scipy', 'pandas', 'joblib')
+FORBIDDEN_MODULES = ('src.train', 'src.features', 'src.drift', 'src.score')
+
+
+class _ImportTracer(importlib.abc.MetaPathFinder):
+    """Record which module triggered the first import of each watched module"""
+
+    def __init__(self):
+        self.violations = []
+
+    def find_spec(self, fullname, path, target=None):
+        watched = fullname in FORBIDDEN_MODULES or fullname.split('.')[0] in FORBIDDEN_PACKAGES
+        if watched and fullname not in sys.modules:
+            importer = _importing_module()
+            if fullname in FORBIDDEN_MODULES or importer.startswith('src.') or importer == 'src':
+                self.violations.append({'module': fullname, 'imported_by': importer})
+        return None  # defer to the regular finders
+
+
+def _importing_module():
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if not filename.startswith('<frozen importlib') and filename != __file__:
+            return frame.f_globals.get('__name__', '?')
+        frame = frame.f_back
+    return '?'
+
+
+def audit_serving_imports(artifacts_dir='artifacts', load=True):
+    """Import the API (and optionally load and run the model) in this process
+
+    Must run in a fresh interpreter. Returns timings and the list of violations.
+    """
+    tracer = _ImportTracer()
+    sys.meta_path.insert(0, tracer)
+    try:
+        start = time.perf_counter()
+        import src.app  # noqa: F401
+        import_seconds = time.perf_counter() - start
+
+        load_seconds = None
+        if load:
+            from src.model_bundle import load_bundle
+            start = time.perf_counter()
+            bundle = load_bundle(artifacts_dir)
+            load_seconds = time.perf_counter() - start
+            bundle.warm_up(batch_sizes=(1,))
+    finally:
+        sys.meta_path.remove(tracer)
+    return {
+        'import_seconds': import_seconds,
+        'load_seconds': load_seconds,
+        'violations': tracer.violations,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Audit imports on the serving path')
+    parser.add_argument('--artifacts', default='artifacts')
+    parser.add_argument('--no-load', action='store_true', help='Only import the API module')
+    args = parser.parse_args()
+
+    result = audit_serving_imports(args.artifacts, load=not args.no_load)
+    print(json.dumps(result, indent=2))
+    sys.exit(1 if result['violations'] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -29,3 +29,10 @@ class PredictionRequest(BaseModel):
 
 class PredictionResponse(BaseModel):
     predictions: List[PredictionOutput]
+
+def field_types():
+    """Feature name -> Python type (str, int or float) of every PredictionInput field"""
+    fields = getattr(PredictionInput, 'model_fields', None)
+    if fields is not None:  # pydantic 2
+        return {name: field.annotation for name, field in fields.items()}
+    return {name: field.outer_type_ for name, field in PredictionInput.__fields__.items()}
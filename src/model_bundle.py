@@ -0,0 +1,174 @@
+import json
+import os
+import threading
+
+import numpy as np
+
+from src import registry
+from src.compiled_features import CompiledPreprocessor
+from src.drift_sketch import ReferenceProfile
+from src.drift_monitor import OnlineDriftMonitor
+from src.explain import fold_starts, fold_contributions
+from src.tree_compiler import TREES_FILE, TreeModel
+
+
+class ModelBundle:
+    """Everything one model version needs to serve, swapped as a single unit"""
+
+    def __init__(self, version, model, preprocessor, compiled, profile=None, manifest=None, threshold=0.5):
+        self.version = version
+        self.model = model
+        self.preprocessor = preprocessor
+        self.compiled = compiled
+        self.profile = profile
+        self.manifest = manifest
+        # Operating threshold chosen at training time (probability >= threshold is churn)
+        self.threshold = threshold
+        self.drift_monitor = None
+        self._fold_starts = fold_starts(compiled)
+
+    def score(self, X):
+        """Churn probabilities for an encoded feature matrix"""
+        return self.model.predict_proba(X)
+
+    def explain(self, X):
+        """Log-odds contributions per input feature (compiled.feature_names order), bias last"""
+        contribs = self.model.predict_contribs(X, feature_types=self.compiled.feature_types())
+        return fold_contributions(contribs, self._fold_starts)
+
+    def warm_up(self, batch_sizes=(1, 32, 1024)):
+        """Run the model once per batch size so the first real request is not the slow one"""
+        for n in batch_sizes:
+            self.score(np.zeros((n, self.compiled.n_features_out), dtype=np.float32))
+        return self
+
+    def start_monitoring(self, bucket_seconds, window_seconds):
+        if self.profile is not None and self.drift_monitor is None:
+            self.drift_monitor = OnlineDriftMonitor(self.profile, bucket_seconds=bucket_seconds,
+                                                    window_seconds=window_seconds).start()
+        return self
+
+    def retire(self):
+        """Release background resources once the bundle has been swapped out"""
+        if self.drift_monitor is not None:
+            self.drift_monitor.stop()
+
+
+def resolve_artifact_dir(artifacts_dir):
+    """Directory of the active registry version, or the flat artifacts directory"""
+    version = registry.active_version(artifacts_dir)
+    if version is None:
+        return artifacts_dir, None
+    return registry.version_dir(artifacts_dir, version), version
+
+
+def load_bundle(artifacts_dir='artifacts', backend='', nthread=None, version=None):
+    """Load the active model version, or ``version`` from the registry
+
+    backend "native" scores through Booster.inplace_predict on model.ubj,
+    "sklearn" through the pickled XGBClassifier, "trees" walks the compiled
+    trees in model_trees.npz without importing xgboost; empty picks native
+    when the booster file exists.
+    """
+    if version:
+        directory = registry.version_dir(artifacts_dir, version)
+    else:
+        directory, version = resolve_artifact_dir(artifacts_dir)
+    manifest = registry.verify_checksums(artifacts_dir, version) if version else None
+
+    model_path = os.path.join(directory, 'model.pkl')
+    booster_path = os.path.join(directory, 'model.ubj')
+    preprocessor_path = os.path.join(directory, 'feature_pipeline.pkl')
+    use_trees = backend == 'trees'
+    use_native = use_trees or backend == 'native' or (not backend and os.path.exists(booster_path))
+    if use_trees:
+        model_path = os.path.join(directory, TREES_FILE)
+    elif use_native:
+        model_path = booster_path
+
+    preprocessor = None
+    if use_native and CompiledPreprocessor.exists(directory):
+        # Serving format: no sklearn/joblib import, constants memory-mapped
+        if not os.path.exists(model_path):
+            raise FileNotFoundError("Model artifacts not found.")
+        compiled = CompiledPreprocessor.load(directory)
+    else:
+        if not os.path.exists(model_path) or not os.path.exists(preprocessor_path):
+            raise FileNotFoundError("Model artifacts not found.")
+        from src.features import FeaturePreprocessor
+        preprocessor = FeaturePreprocessor.load(preprocessor_path)
+        compiled = CompiledPreprocessor.from_preprocessor(preprocessor)
+
+    if use_trees:
+        model = TreeModel.load(model_path, booster_path=booster_path, nthread=nthread)
+    elif use_native:
+        from src.models import BoosterModel
+        model = BoosterModel.load(model_path, nthread=nthread)
+    else:
+        from src.models import ChurnModel
+        model = ChurnModel.load(model_path)
+        if nthread:
+            model.model.set_params(n_jobs=nthread)
+
+    profile_path = os.path.join(directory, 'drift_profile.json')
+    profile = ReferenceProfile.load(profile_path) if os.path.exists(profile_path) else None
+    return ModelBundle(version or 'unversioned', model, preprocessor, compiled,
+                       profile=profile, manifest=manifest, threshold=load_threshold(directory))
+
+
+def load_threshold(directory, default=0.5):
+    """Operating threshold recorded in metrics.json by training (default for older models)"""
+    metrics_path = os.path.join(directory, 'metrics.json')
+    if not os.path.exists(metrics_path):
+        return default
+    with open(metrics_path) as f:
+        threshold = json.load(f).get('operating_threshold')
+    return default if threshold is None else float(threshold)
+
+
+class BundleWatcher:
+    """Poll the registry's ACTIVE pointer and hot-swap new versions
+
+    A new version is loaded, checksum-verified and warmed up on this thread;
+    only then is on_swap called to publish it, so requests never wait on a load.
+    """
+
+    def __init__(self, artifacts_dir, current_version, load_fn, on_swap, interval=10.0):
+        self.artifacts_dir = artifacts_dir
+        self.version = current_version
+        self.load_fn = load_fn
+        self.on_swap = on_swap
+        self.interval = interval
+        self._failed = set()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='model-watcher', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def check(self):
+        """Swap in the active version if it changed; returns True on swap"""
+        version = registry.active_version(self.artifacts_dir)
+        if version is None or version == self.version or version in self._failed:
+            return False
+        try:
+            bundle = self.load_fn().warm_up()
+        except Exception as e:
+            # Keep serving the current version; do not retry a broken one every poll
+            print(f"Warning: could not load model version {version}: {e}")
+            self._failed.add(version)
+            return False
+        self.version = bundle.version
+        self.on_swap(bundle)
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
@@ -1,23 +1,29 @@
 # TODO: Train/save/load utilities
 import xgboost as xgb
-from sklearn.metrics import roc_auc_score, average_precision_score, accuracy_score
 import numpy as np
-import joblib
+
+from src import evaluation
+
+# sklearn and joblib are imported where they are used so that serving through
+# BoosterModel does not pull in the training stack.
+
+DEFAULT_PARAMS = dict(
+    random_state=42,
+    n_estimators=100,
+    max_depth=6,
+    learning_rate=0.1,
+    subsample=0.8,
+    colsample_bytree=0.8,
+    use_label_encoder=False,
+    eval_metric='logloss'
+)
 
 class ChurnModel:
     """Churn prediction model"""
     
-    def __init__(self, model=None):
-        self.model = model or xgb.XGBClassifier(
-            random_state=42,
-            n_estimators=100,
-            max_depth=6,
-            learning_rate=0.1,
-            subsample=0.8,
-            colsample_bytree=0.8,
-            use_label_encoder=False,
-            eval_metric='logloss'
-        )
+    def __init__(self, model=None, **params):
+        """params override DEFAULT_PARAMS (e.g. the result of a hyperparameter search)"""
+        self.model = model or xgb.XGBClassifier(**{**DEFAULT_PARAMS, **params})
     
     def fit(self, X, y):
         """Train the model"""
@@ -33,23 +39,72 @@ class ChurnModel:
         probs = self.predict_proba(X)
         return (probs >= threshold).astype(int)
     
-    def evaluate(self, X, y):
-        """Evaluate model performance"""
-        probs = self.predict_proba(X)
-        preds = self.predict(X)
-        
-        return {
-            'roc_auc': roc_auc_score(y, probs),
-            'pr_auc': average_precision_score(y, probs),
-            'accuracy': accuracy_score(y, preds)
-        }
+    def predict_contribs(self, X, feature_types=None):
+        """Per-column contributions in log-odds, bias in the last column"""
+        booster = self.model.get_booster()
+        best_iteration = booster.attr('best_iteration')
+        iteration_range = (0, int(best_iteration) + 1) if best_iteration is not None else (0, 0)
+        return _contribs(booster, X, feature_types, iteration_range)
+    
+    def evaluate(self, X, y, threshold=0.5):
+        """Evaluate model performance (one predict_proba call, one sort)"""
+        return evaluation.evaluate(y, self.predict_proba(X), threshold)
     
     def save(self, filepath):
         """Save the model"""
+        import joblib
         joblib.dump(self.model, filepath)
     
+    def export_booster(self, filepath):
+        """Save the booster in XGBoost's native format (.json or .ubj)"""
+        self.model.get_booster().save_model(filepath)
+    
     @classmethod
     def load(cls, filepath):
         """Load the model"""
+        import joblib
         model = joblib.load(filepath)
-        return cls(model)
\ No newline at end of file
+        return cls(model)
+
+
+class BoosterModel:
+    """Serving model that calls the native booster without the sklearn wrapper"""
+    
+    def __init__(self, booster, nthread=None):
+        self.booster = booster
+        if nthread:
+            self.booster.set_param({'nthread': int(nthread)})
+        # Honour early stopping the same way XGBClassifier.predict_proba does
+        best_iteration = booster.attr('best_iteration')
+        if best_iteration is not None:
+            self.iteration_range = (0, int(best_iteration) + 1)
+        else:
+            self.iteration_range = (0, 0)
+    
+    def predict_proba(self, X):
+        """Predict probabilities with inplace_predict (no per-call DMatrix)"""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        return self.booster.inplace_predict(X, iteration_range=self.iteration_range)
+    
+    def predict(self, X, threshold=0.5):
+        """Predict classes"""
+        probs = self.predict_proba(X)
+        return (probs >= threshold).astype(int)
+    
+    def predict_contribs(self, X, feature_types=None):
+        """Per-column contributions in log-odds (TreeSHAP), bias in the last column"""
+        return _contribs(self.booster, X, feature_types, self.iteration_range)
+    
+    @classmethod
+    def load(cls, filepath, nthread=None):
+        """Load a booster saved with ChurnModel.export_booster"""
+        booster = xgb.Booster()
+        booster.load_model(filepath)
+        return cls(booster, nthread=nthread)
+
+
+def _contribs(booster, X, feature_types, iteration_range):
+    """Booster.predict(pred_contribs=True); feature_types marks native categorical columns"""
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    dmatrix = xgb.DMatrix(X, feature_types=feature_types, enable_categorical=feature_types is not None)
+    return booster.predict(dmatrix, pred_contribs=True, iteration_range=iteration_range)
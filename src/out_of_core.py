@@ -0,0 +1,200 @@
+# Out-of-core training helpers: streaming preprocessor statistics and an
+# XGBoost external-memory iterator over preprocessed chunks cached on disk.
+# Used by: python -m src.train --data ... --out-of-core [--chunksize 100000]
+import os
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+from src.compiled_features import CompiledPreprocessor, _fill_missing
+
+
+class QuantileSketch:
+    """Mergeable (value, count) summary of one numeric column
+
+    Values are kept exactly while there are at most ``max_centroids`` distinct
+    ones, so quantiles match np.quantile on the full column. Past that, adjacent
+    values are merged into equal-weight centroids and quantiles become
+    approximate (rank error about 1 / max_centroids).
+    """
+
+    def __init__(self, max_centroids=8192):
+        self.max_centroids = max_centroids
+        self.values = np.empty(0, dtype=np.float64)
+        self.counts = np.empty(0, dtype=np.int64)
+        self.exact = True
+
+    @property
+    def n(self):
+        return int(self.counts.sum())
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        new_values, new_counts = np.unique(values, return_counts=True)
+        merged, inverse = np.unique(np.concatenate([self.values, new_values]), return_inverse=True)
+        self.counts = np.bincount(inverse, weights=np.concatenate([self.counts, new_counts]),
+                                  minlength=len(merged)).astype(np.int64)
+        self.values = merged
+        if len(self.values) > self.max_centroids:
+            self._compress()
+        return self
+
+    def _compress(self):
+        target = self.max_centroids // 2
+        cumulative = np.cumsum(self.counts)
+        groups = (cumulative - 1) * target // cumulative[-1]
+        counts = np.bincount(groups, weights=self.counts, minlength=target)
+        sums = np.bincount(groups, weights=self.values * self.counts, minlength=target)
+        keep = counts > 0
+        self.values = sums[keep] / counts[keep]
+        self.counts = counts[keep].astype(np.int64)
+        self.exact = False
+
+    def quantile(self, q):
+        """Same linear interpolation as np.quantile"""
+        n = self.n
+        if n == 0:
+            return float('nan')
+        position = q * (n - 1)
+        lo, hi = int(np.floor(position)), int(np.ceil(position))
+        cumulative = np.cumsum(self.counts)
+        v_lo, v_hi = self.values[np.searchsorted(cumulative, [lo, hi], side='right')]
+        return float(v_lo + (v_hi - v_lo) * (position - lo))
+
+
+class StreamingFeatureStats:
+    """FeaturePreprocessor statistics fitted one chunk at a time
+
+    Numeric features keep a median sketch plus count, mean and sum of squared
+    deviations of the observed values (merged with Chan's formula). The
+    scaler is fitted after median imputation, so finalize() folds the missing
+    rows back in as copies of the median. Categorical features keep the set of
+    seen values, sorted at the end like OneHotEncoder's categories_.
+    """
+
+    def __init__(self, numeric_features, categorical_features, max_centroids=8192):
+        self.numeric_features = list(numeric_features)
+        self.categorical_features = list(categorical_features)
+        self.n = 0
+        self.n_valid = np.zeros(len(self.numeric_features), dtype=np.int64)
+        self.means = np.zeros(len(self.numeric_features))
+        self.m2 = np.zeros(len(self.numeric_features))
+        self.sketches = [QuantileSketch(max_centroids) for _ in self.numeric_features]
+        self.vocabularies = [set() for _ in self.categorical_features]
+
+    def update(self, chunk):
+        """Fold a DataFrame chunk into the statistics"""
+        self.n += len(chunk)
+        # Rounded to float32 like FeaturePreprocessor's inputs, accumulated in float64
+        values = chunk[self.numeric_features].to_numpy(dtype=np.float32).astype(np.float64)
+        valid = ~np.isnan(values)
+        n_b = valid.sum(axis=0)
+        has_rows = n_b > 0
+        mean_b = np.zeros_like(self.means)
+        mean_b[has_rows] = np.nansum(values[:, has_rows], axis=0) / n_b[has_rows]
+        m2_b = np.nansum((values - mean_b) ** 2, axis=0)
+
+        n_a = self.n_valid
+        total = n_a + n_b
+        delta = mean_b - self.means
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.means = np.where(total > 0, self.means + delta * n_b / total, 0.0)
+            self.m2 = np.where(total > 0, self.m2 + m2_b + delta ** 2 * n_a * n_b / total, 0.0)
+        self.n_valid = total
+
+        for j, sketch in enumerate(self.sketches):
+            sketch.update(values[:, j])
+        for j, feature in enumerate(self.categorical_features):
+            self.vocabularies[j].update(_fill_missing(v) for v in pd.unique(chunk[feature]))
+        return self
+
+    def finalize(self):
+        """CompiledPreprocessor equivalent to FeaturePreprocessor.fit on all rows seen"""
+        medians = np.array([sketch.quantile(0.5) for sketch in self.sketches])
+        n_missing = self.n - self.n_valid
+        means = (self.n_valid * self.means + n_missing * medians) / self.n
+        m2 = self.m2 + (self.means - medians) ** 2 * self.n_valid * n_missing / self.n
+        scales = np.sqrt(m2 / self.n)
+        # StandardScaler leaves constant columns unscaled
+        scales[scales < 10 * np.finfo(np.float64).eps] = 1.0
+        return CompiledPreprocessor(
+            self.numeric_features, self.categorical_features, medians, means, scales,
+            [sorted(vocabulary) for vocabulary in self.vocabularies],
+        )
+
+
+class ReservoirSample:
+    """Uniform sample of at most ``size`` rows across chunks (for the drift profile)"""
+
+    def __init__(self, size=100_000, seed=42):
+        self.size = size
+        self.rng = np.random.default_rng(seed)
+        self._rows = None
+        self._keys = np.empty(0)
+
+    def update(self, chunk):
+        # Keep the rows with the smallest random keys seen so far
+        keys = np.concatenate([self._keys, self.rng.random(len(chunk))])
+        rows = chunk if self._rows is None else pd.concat([self._rows, chunk], ignore_index=True)
+        if len(rows) > self.size:
+            keep = np.sort(np.argpartition(keys, self.size)[:self.size])
+            rows, keys = rows.iloc[keep].reset_index(drop=True), keys[keep]
+        self._rows, self._keys = rows, keys
+        return self
+
+    @property
+    def frame(self):
+        return self._rows
+
+
+def split_masks(chunks, test_size=0.2, seed=42):
+    """Deterministic per-row validation mask for each chunk, in order"""
+    rng = np.random.default_rng(seed)
+    for chunk in chunks:
+        yield chunk, rng.random(len(chunk)) < test_size
+
+
+class ChunkIter(xgb.DataIter):
+    """External-memory iterator over (X, y) .npy chunk pairs
+
+    XGBoost pages the quantized chunks to ``cache_prefix`` so only one chunk
+    is held in memory at a time.
+    """
+
+    def __init__(self, chunk_files, cache_prefix=None):
+        self.chunk_files = chunk_files
+        self._it = 0
+        super().__init__(cache_prefix=cache_prefix)
+
+    def next(self, input_data):
+        if self._it == len(self.chunk_files):
+            return 0
+        X_path, y_path = self.chunk_files[self._it]
+        input_data(data=np.load(X_path, mmap_mode='r'), label=np.load(y_path))
+        self._it += 1
+        return 1
+
+    def reset(self):
+        self._it = 0
+
+
+def write_chunk(cache_dir, name, index, X, y):
+    """Cache one preprocessed chunk as float32 .npy files; returns the (X, y) paths"""
+    X_path = os.path.join(cache_dir, f'{name}_X_{index:05d}.npy')
+    y_path = os.path.join(cache_dir, f'{name}_y_{index:05d}.npy')
+    np.save(X_path, np.ascontiguousarray(X, dtype=np.float32))
+    np.save(y_path, np.asarray(y, dtype=np.float32))
+    return X_path, y_path
+
+
+def predict_chunks(booster, chunk_files):
+    """Probabilities and labels over cached chunks, one chunk in memory at a time"""
+    probs, labels = [], []
+    for X_path, y_path in chunk_files:
+        probs.append(booster.inplace_predict(np.load(X_path, mmap_mode='r')))
+        labels.append(np.load(y_path))
+    return np.concatenate(probs), np.concatenate(labels)
@@ -0,0 +1,219 @@
+# /predict payload parsing: row-oriented JSON ({"data": [rows]} or a bare list),
+# columnar JSON ({"plan_type": [...], "tenure_months": [...], ...}), Arrow IPC
+# streams of the same columns, and .npy buffers of already-encoded features.
+import io
+
+import numpy as np
+import orjson
+from pydantic import ValidationError
+
+from src.io_schemas import PredictionRequest, field_types
+from src.compiled_features import DictionaryColumn
+
+FIELD_TYPES = field_types()
+
+JSON = 'application/json'
+ARROW_STREAM = 'application/vnd.apache.arrow.stream'
+NPY = 'application/x-npy'
+
+
+class PayloadError(ValueError):
+    """Invalid payload; errors is a list of {"loc", "msg", "type"} dicts (returned as a 400)"""
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__('; '.join(f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in errors))
+
+
+def _error(loc, msg, type_):
+    return {'loc': list(loc), 'msg': msg, 'type': type_}
+
+
+def decode_json(body):
+    try:
+        return orjson.loads(body)
+    except orjson.JSONDecodeError as e:
+        raise PayloadError([_error(['body'], f'Invalid JSON: {e}', 'json_invalid')])
+
+
+def is_columnar(payload):
+    return isinstance(payload, dict) and 'data' not in payload
+
+
+def parse_rows(payload):
+    """Validate a row-oriented payload with the Pydantic schema; returns the rows"""
+    if isinstance(payload, list):
+        payload = {'data': payload}
+    validate = getattr(PredictionRequest, 'model_validate', None) or PredictionRequest.parse_obj
+    try:
+        return validate(payload).data
+    except ValidationError as e:
+        raise PayloadError([_error(err['loc'], err['msg'], err['type']) for err in e.errors()])
+
+
+def parse_columnar(payload):
+    """Validate a columnar payload in bulk into NumPy arrays (categoricals stay lists of str)
+
+    Same rules as PredictionInput: every field present and non-null, numbers
+    for numeric fields, whole numbers for int fields, strings for str fields.
+    """
+    errors = []
+    columns = {}
+    n_rows = None
+    for name, kind in FIELD_TYPES.items():
+        values = payload.get(name)
+        if values is None:
+            errors.append(_error([name], 'Field required', 'missing'))
+            continue
+        if not isinstance(values, list):
+            errors.append(_error([name], 'Input should be a list', 'list_type'))
+            continue
+        if n_rows is None:
+            n_rows = len(values)
+        elif len(values) != n_rows:
+            errors.append(_error([name], f'Expected {n_rows} values, got {len(values)}', 'length_mismatch'))
+            continue
+
+        if kind is str:
+            bad = [i for i, v in enumerate(values) if not isinstance(v, str)]
+            if bad:
+                errors.append(_error([name, bad[0]], f'Input should be a valid string ({len(bad)} invalid)',
+                                     'string_type'))
+            else:
+                columns[name] = values
+            continue
+
+        try:
+            array = np.array(values, dtype=np.float64)
+        except (TypeError, ValueError):
+            errors.append(_error([name], 'Input should be a list of numbers', 'float_type'))
+            continue
+        # None converts to NaN; JSON itself cannot carry NaN
+        missing = np.flatnonzero(np.isnan(array))
+        if len(missing):
+            errors.append(_error([name, int(missing[0])], f'Field required ({len(missing)} null)', 'missing'))
+        elif kind is int and (array % 1 != 0).any():
+            errors.append(_error([name, int(np.flatnonzero(array % 1 != 0)[0])],
+                                 'Input should be a valid integer', 'int_type'))
+        else:
+            columns[name] = array
+    if errors:
+        raise PayloadError(errors)
+    return columns
+
+
+def payload_format(content_type):
+    """JSON, ARROW_STREAM or NPY from a Content-Type header (JSON when absent or unrecognised)"""
+    media_type = (content_type or '').split(';')[0].strip().lower()
+    return media_type if media_type in (ARROW_STREAM, NPY) else JSON
+
+
+def parse_arrow(body):
+    """Columns of an Arrow IPC stream, with the same rules as parse_columnar
+
+    Numeric columns without nulls are NumPy views of the Arrow buffers (no
+    copy). String columns are dictionary-encoded, so categoricals reach the
+    preprocessor as a few distinct values plus integer codes.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    try:
+        table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+    except (pa.ArrowInvalid, OSError) as e:
+        raise PayloadError([_error(['body'], f'Invalid Arrow stream: {e}', 'arrow_invalid')])
+
+    errors = []
+    columns = {}
+    for name, kind in FIELD_TYPES.items():
+        if name not in table.column_names:
+            errors.append(_error([name], 'Field required', 'missing'))
+            continue
+        column = table.column(name)
+        if column.null_count:
+            errors.append(_error([name], f'Field required ({column.null_count} null)', 'missing'))
+            continue
+        array = column.combine_chunks() if column.num_chunks != 1 else column.chunk(0)
+        if kind is str:
+            if pa.types.is_dictionary(array.type):
+                dictionary = array.dictionary
+            elif pa.types.is_string(array.type) or pa.types.is_large_string(array.type):
+                array = pc.dictionary_encode(array)
+                dictionary = array.dictionary
+            else:
+                errors.append(_error([name], f'Input should be a string column, got {array.type}', 'string_type'))
+                continue
+            if not (pa.types.is_string(dictionary.type) or pa.types.is_large_string(dictionary.type)):
+                errors.append(_error([name], f'Input should be a string column, got {array.type}', 'string_type'))
+                continue
+            columns[name] = DictionaryColumn(dictionary.to_pylist(), array.indices.to_numpy())
+        elif pa.types.is_integer(array.type) or pa.types.is_floating(array.type):
+            values = array.to_numpy()
+            if kind is int and values.dtype.kind == 'f' and (values % 1 != 0).any():
+                errors.append(_error([name], 'Input should be a valid integer', 'int_type'))
+                continue
+            columns[name] = values
+        else:
+            errors.append(_error([name], f'Input should be a numeric column, got {array.type}', 'float_type'))
+    if errors:
+        raise PayloadError(errors)
+    return columns
+
+
+def parse_npy(body, compiled):
+    """Already-encoded float32 feature matrix from a .npy buffer, checked against the model's encoding"""
+    try:
+        X = np.load(io.BytesIO(body), allow_pickle=False)
+    except (ValueError, OSError) as e:
+        raise PayloadError([_error(['body'], f'Invalid .npy buffer: {e}', 'npy_invalid')])
+    if X.dtype.kind not in 'iuf':
+        raise PayloadError([_error(['body'], f'Expected a numeric array, got {X.dtype}', 'float_type')])
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    errors = compiled.encoded_errors(X)
+    if errors:
+        raise PayloadError([_error([loc], msg, 'invalid_encoding') for loc, msg in errors])
+    return X
+
+
+def check_categories(columns, compiled):
+    """Reject values outside the training vocabulary of each categorical feature"""
+    errors = []
+    for feature, vocabulary in zip(compiled.categorical_features, compiled.vocabularies):
+        values = columns[feature]
+        if isinstance(values, DictionaryColumn):
+            values = values.used_values()
+        unknown = sorted({v for v in values if v not in vocabulary})
+        if unknown:
+            errors.append(_error([feature], f'Unknown categories {unknown}; expected one of {sorted(vocabulary)}',
+                                 'unknown_category'))
+    if errors:
+        raise PayloadError(errors)
+
+
+def encode_response(probs, threshold, payload_type=JSON, columnar=False):
+    """(body, media type) in the request's format: Arrow stream, .npy probabilities or JSON"""
+    if payload_type == ARROW_STREAM:
+        import pyarrow as pa
+        probs = np.asarray(probs, dtype=np.float64)
+        table = pa.table({'churn_probability': probs, 'churned': probs >= threshold})
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes(), ARROW_STREAM
+    if payload_type == NPY:
+        buffer = io.BytesIO()
+        np.save(buffer, np.asarray(probs, dtype=np.float32), allow_pickle=False)
+        return buffer.getvalue(), NPY
+    return encode_predictions(probs, threshold, columnar=columnar), JSON
+
+
+def encode_predictions(probs, threshold, columnar=False):
+    """Serialize probabilities with orjson, without building a response model per row"""
+    probs = np.asarray(probs, dtype=np.float64)
+    if columnar:
+        return orjson.dumps({'churn_probability': probs, 'churned': probs >= threshold},
+                            option=orjson.OPT_SERIALIZE_NUMPY)
+    churned = (probs >= threshold).tolist()
+    return orjson.dumps({'predictions': [
+        {'churn_probability': p, 'churned': c} for p, c in zip(probs.tolist(), churned)
+    ]})
@@ -0,0 +1,91 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+
+class PredictionCache:
+    """In-process LRU + TTL cache of per-row churn probabilities
+
+    Keys are a 16-byte BLAKE2 digest of the canonicalized feature values plus
+    the model version, so entries can never be served across model versions.
+    The cache holds at most ``max_entries`` rows; each entry is a small fixed
+    size (digest, expiry, float), which bounds memory.
+    """
+
+    def __init__(self, max_entries=100_000, ttl_seconds=300.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def keys_for(columns, numeric_features, categorical_features, version):
+        """One key per row of a column mapping"""
+        numeric = [[float('nan') if v is None else float(v) for v in columns[f]] for f in numeric_features]
+        categorical = [[str(v) for v in columns[f]] for f in categorical_features]
+        prefix = f"{version}|".encode()
+        return [
+            hashlib.blake2b(prefix + repr(row).encode(), digest_size=16).digest()
+            for row in zip(*numeric, *categorical)
+        ]
+
+    def get_many(self, keys):
+        """Cached probability for each key, or None on a miss"""
+        now = time.monotonic()
+        results = []
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    self.misses += 1
+                    results.append(None)
+                elif entry[0] < now:
+                    del self._entries[key]
+                    self.expirations += 1
+                    self.misses += 1
+                    results.append(None)
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    results.append(entry[1])
+        return results
+
+    def put_many(self, keys, probs):
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            for key, prob in zip(keys, probs):
+                self._entries[key] = (expires_at, self._value(prob))
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    @staticmethod
+    def _value(prob):
+        return float(prob)
+
+    def invalidate(self):
+        """Drop every entry (called when the serving model changes)"""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'invalidations': self.invalidations,
+        }
@@ -0,0 +1,212 @@
+# Append-only log of scored requests: the request path copies rows into a
+# preallocated ring buffer, a background thread flushes them to Parquet.
+# Layout: <log_dir>/predictions-<start>-<pid>-<seq>.parquet (complete files);
+#         the file being written is hidden as .predictions-...parquet until rotated.
+import os
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+from src.io_schemas import field_types
+
+# Request annotation -> ring buffer dtype (categoricals stay Python strings)
+_BUFFER_DTYPES = {str: object, int: np.int64, float: np.float64}
+
+
+class PredictionLog:
+    """Bounded, non-blocking prediction log
+
+    append() is O(rows) array copies under a short lock and never waits on
+    disk: when the ring is full the rows are dropped and counted instead.
+    The writer thread flushes every ``flush_interval`` seconds (or once
+    ``flush_rows`` rows are buffered) as one Parquet row group, and rotates
+    to a new file after ``rotate_bytes`` or ``rotate_seconds``. Files are
+    renamed into place only when closed, so readers (pd.read_parquet on the
+    directory, src.drift, src.train) never see a partial file.
+    """
+
+    def __init__(self, log_dir, capacity=65536, flush_rows=8192, flush_interval=5.0,
+                 rotate_bytes=64 * 2 ** 20, rotate_seconds=3600.0, compression='zstd'):
+        self.log_dir = log_dir
+        self.capacity = capacity
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.rotate_bytes = rotate_bytes
+        self.rotate_seconds = rotate_seconds
+        self.compression = compression
+
+        self.fields = field_types()
+        self._columns = {name: np.empty(capacity, dtype=_BUFFER_DTYPES[kind]) for name, kind in self.fields.items()}
+        self._columns['churn_probability'] = np.empty(capacity, dtype=np.float32)
+        self._columns['model_version'] = np.empty(capacity, dtype=object)
+        self._columns['ts'] = np.empty(capacity, dtype='datetime64[us]')
+        # head: next slot to fill, tail: oldest unflushed slot (both monotonic)
+        self._head = 0
+        self._tail = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self._writer = None
+        self._file_path = None
+        self._file_opened = None
+        self._sequence = 0
+
+        self.rows_logged = 0
+        self.rows_dropped = 0
+        self.rows_written = 0
+        self.files_written = 0
+        self.write_errors = 0
+        self.append_errors = 0
+
+    def start(self):
+        os.makedirs(self.log_dir, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name='prediction-log', daemon=True)
+        self._thread.start()
+        return self
+
+    def append(self, columns, probs, version):
+        """Buffer one request's rows; returns False (and counts a drop) when the ring is full
+
+        Never raises: rows that cannot be copied into the ring (e.g. a dtype
+        mismatch) are dropped and counted in append_errors.
+        """
+        n = len(probs)
+        now = np.datetime64(datetime.now(), 'us')
+        with self._lock:
+            if self._head + n - self._tail > self.capacity:
+                self.rows_dropped += n
+                return False
+            start = self._head % self.capacity
+            first = min(n, self.capacity - start)
+            try:
+                for name in self.fields:
+                    values = columns[name]
+                    if not isinstance(values, (list, np.ndarray)):
+                        values = np.asarray(values)
+                    self._copy(self._columns[name], start, first, values)
+                self._copy(self._columns['churn_probability'], start, first, probs)
+                self._fill(self._columns['model_version'], start, first, n, version)
+                self._fill(self._columns['ts'], start, first, n, now)
+            except Exception:
+                # Best effort: the head has not moved, so the partly written slots are never read
+                self.append_errors += 1
+                self.rows_dropped += n
+                return False
+            self._head += n
+            self.rows_logged += n
+            buffered = self._head - self._tail
+        if buffered >= self.flush_rows:
+            self._wakeup.set()
+        return True
+
+    @staticmethod
+    def _copy(buffer, start, first, values):
+        buffer[start:start + first] = values[:first]
+        if first < len(values):
+            buffer[:len(values) - first] = values[first:]
+
+    @staticmethod
+    def _fill(buffer, start, first, n, value):
+        buffer[start:start + first] = value
+        if first < n:
+            buffer[:n - first] = value
+
+    def stats(self):
+        with self._lock:
+            buffered = self._head - self._tail
+        return {
+            'rows_logged': self.rows_logged,
+            'rows_dropped': self.rows_dropped,
+            'rows_written': self.rows_written,
+            'rows_buffered': buffered,
+            'files_written': self.files_written,
+            'write_errors': self.write_errors,
+            'append_errors': self.append_errors,
+        }
+
+    def flush(self):
+        """Write every buffered row as one row group (called from the writer thread)"""
+        with self._lock:
+            tail, head = self._tail, self._head
+        if head == tail:
+            return 0
+        # Slots in [tail, head) are not reused until the tail advances, so they
+        # can be read without holding the lock while appends continue
+        start, n = tail % self.capacity, head - tail
+        first = min(n, self.capacity - start)
+        table = self._table(start, first, n)
+        try:
+            self._write(table)
+        except Exception as e:
+            # Keep serving; the rows are lost but counted
+            self.write_errors += 1
+            self.rows_dropped += n
+            print(f"Prediction log write failed: {e}")
+        else:
+            self.rows_written += n
+        with self._lock:
+            self._tail = head
+        return n
+
+    def _table(self, start, first, n):
+        import pyarrow as pa
+
+        def column(buffer):
+            if first == n:
+                return buffer[start:start + n]
+            return np.concatenate([buffer[start:], buffer[:n - first]])
+
+        arrays = {}
+        for name, kind in self.fields.items():
+            values = column(self._columns[name])
+            arrays[name] = pa.array(values, type=pa.string()) if kind is str else pa.array(values)
+        arrays['churn_probability'] = pa.array(column(self._columns['churn_probability']))
+        arrays['model_version'] = pa.array(column(self._columns['model_version']), type=pa.string())
+        arrays['ts'] = pa.array(column(self._columns['ts']))
+        return pa.table(arrays)
+
+    def _write(self, table):
+        import pyarrow.parquet as pq
+
+        if self._writer is not None and (
+                os.path.getsize(self._file_path) >= self.rotate_bytes
+                or time.monotonic() - self._file_opened >= self.rotate_seconds):
+            self._rotate()
+        if self._writer is None:
+            self._sequence += 1
+            name = f"predictions-{datetime.now():%Y%m%dT%H%M%S}-{os.getpid()}-{self._sequence:05d}.parquet"
+            self._file_path = os.path.join(self.log_dir, '.' + name)
+            self._writer = pq.ParquetWriter(self._file_path, table.schema, compression=self.compression)
+            self._file_opened = time.monotonic()
+        self._writer.write_table(table)
+
+    def _rotate(self):
+        """Close the current file and publish it under its visible name"""
+        if self._writer is None:
+            return
+        self._writer.close()
+        directory, hidden = os.path.split(self._file_path)
+        os.replace(self._file_path, os.path.join(directory, hidden[1:]))
+        self._writer = None
+        self.files_written += 1
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+            if self._writer is not None and time.monotonic() - self._file_opened >= self.rotate_seconds:
+                self._rotate()
+
+    def close(self):
+        """Flush what is buffered and publish the open file"""
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+        self._rotate()
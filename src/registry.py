@@ -0,0 +1,125 @@
+# Versioned artifact registry.
+# Layout: <outdir>/versions/<version>/{model.pkl, ..., manifest.json} and <outdir>/ACTIVE
+# CLI: python -m src.registry --outdir artifacts/ [--activate VERSION]
+import argparse
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime
+
+VERSIONS_DIR = 'versions'
+ACTIVE_FILE = 'ACTIVE'
+MANIFEST_FILE = 'manifest.json'
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def version_dir(outdir, version):
+    return os.path.join(outdir, VERSIONS_DIR, version)
+
+
+def list_versions(outdir):
+    """Published versions, oldest first"""
+    root = os.path.join(outdir, VERSIONS_DIR)
+    if not os.path.isdir(root):
+        return []
+    return sorted(v for v in os.listdir(root) if os.path.exists(os.path.join(root, v, MANIFEST_FILE)))
+
+
+def publish_version(outdir, files, metrics, git_sha, activate=True):
+    """Copy files into a new version directory with a manifest, optionally activating it
+
+    The directory is assembled under a temporary name and renamed into place,
+    so readers never see a partially written version.
+    """
+    version = f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{git_sha}"
+    suffix = 1
+    while os.path.exists(version_dir(outdir, version)):
+        version = f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{git_sha}-{suffix}"
+        suffix += 1
+
+    target = version_dir(outdir, version)
+    staging = target + '.tmp'
+    os.makedirs(staging, exist_ok=True)
+    checksums = {}
+    for path in files:
+        name = os.path.basename(path)
+        shutil.copy2(path, os.path.join(staging, name))
+        checksums[name] = file_sha256(os.path.join(staging, name))
+
+    manifest = {
+        'version': version,
+        'git_sha': git_sha,
+        'created_at': datetime.now().isoformat(),
+        'metrics': metrics,
+        'files': checksums,
+    }
+    with open(os.path.join(staging, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.rename(staging, target)
+
+    if activate:
+        set_active(outdir, version)
+    return version
+
+
+def set_active(outdir, version):
+    """Atomically point ACTIVE at a published version"""
+    if not os.path.exists(os.path.join(version_dir(outdir, version), MANIFEST_FILE)):
+        raise FileNotFoundError(f"Version {version} is not published in {outdir}")
+    tmp_path = os.path.join(outdir, ACTIVE_FILE + '.tmp')
+    with open(tmp_path, 'w') as f:
+        f.write(version + '\n')
+    os.replace(tmp_path, os.path.join(outdir, ACTIVE_FILE))
+
+
+def active_version(outdir):
+    """Currently active version, or None when the registry is not in use"""
+    try:
+        with open(os.path.join(outdir, ACTIVE_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def load_manifest(outdir, version):
+    with open(os.path.join(version_dir(outdir, version), MANIFEST_FILE)) as f:
+        return json.load(f)
+
+
+def verify_checksums(outdir, version):
+    """Raise ValueError if any file of the version does not match its manifest"""
+    manifest = load_manifest(outdir, version)
+    directory = version_dir(outdir, version)
+    for name, expected in manifest['files'].items():
+        actual = file_sha256(os.path.join(directory, name))
+        if actual != expected:
+            raise ValueError(f"Checksum mismatch for {name} in version {version}")
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect or switch the active model version')
+    parser.add_argument('--outdir', default='artifacts', help='Artifacts directory')
+    parser.add_argument('--activate', help='Version to make active (e.g. to roll back)')
+    args = parser.parse_args()
+
+    if args.activate:
+        set_active(args.outdir, args.activate)
+    active = active_version(args.outdir)
+    for version in list_versions(args.outdir):
+        manifest = load_manifest(args.outdir, version)
+        roc_auc = manifest.get('metrics', {}).get('val_metrics', {}).get('roc_auc')
+        marker = '*' if version == active else ' '
+        print(f"{marker} {version}  git_sha={manifest['git_sha']}  val_roc_auc={roc_auc}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# Compact column dtypes for every entry point that loads tabular data,
+# derived from the request schema (io_schemas.PredictionInput).
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.io_schemas import field_types
+
+# Python annotation -> storage dtype. Integers fall back to FLOAT_DTYPE for
+# columns with missing values, since int16 cannot hold NaN.
+CATEGORICAL_DTYPE = 'category'
+INTEGER_DTYPE = 'int16'
+FLOAT_DTYPE = 'float32'
+MODEL_INPUT_DTYPE = np.float32
+
+_DTYPES = {str: CATEGORICAL_DTYPE, int: INTEGER_DTYPE, float: FLOAT_DTYPE}
+
+
+def feature_dtypes():
+    """Column name -> compact pandas dtype for every request field"""
+    return {name: _DTYPES[annotation] for name, annotation in field_types().items()}
+
+
+def apply_schema(df):
+    """Cast the schema's columns of df to their compact dtypes (other columns are left alone)"""
+    dtypes = feature_dtypes()
+    casts = {}
+    for name in df.columns:
+        dtype = dtypes.get(name)
+        if dtype is None or df[name].dtype == dtype:
+            continue
+        if dtype == INTEGER_DTYPE:
+            series = df[name]
+            if series.isna().any() or (series.dtype.kind == 'f' and (series % 1 != 0).any()):
+                dtype = FLOAT_DTYPE
+            elif series.dtype.kind in 'iuf' and not series.between(-2 ** 15, 2 ** 15 - 1).all():
+                dtype = 'int32'
+        casts[name] = dtype
+    return df.astype(casts) if casts else df
+
+
+def read_csv(path, **kwargs):
+    """pd.read_csv with compact dtypes; chunksize returns an iterator of compact chunks"""
+    dtypes = {name: dtype for name, dtype in feature_dtypes().items() if dtype != INTEGER_DTYPE}
+    reader = pd.read_csv(path, dtype=dtypes, **kwargs)
+    if kwargs.get('chunksize'):
+        return (apply_schema(chunk) for chunk in reader)
+    return apply_schema(reader)
+
+
+def is_parquet(path):
+    """Parquet file, or a directory of Parquet files such as a prediction log"""
+    return os.path.isdir(path) or path.endswith('.parquet') or path.endswith('.pq')
+
+
+def dataset_files(path):
+    """Files that make up ``path``: itself, or the visible Parquet files of a directory
+
+    Hidden files (an in-progress prediction log file) are skipped, as pyarrow does.
+    """
+    if not os.path.isdir(path):
+        return [path]
+    return sorted(os.path.join(path, name) for name in os.listdir(path)
+                  if name.endswith('.parquet') and not name.startswith(('.', '_')))
+
+
+def read_table(path, columns=None):
+    """CSV, Parquet file or Parquet directory as a DataFrame with compact dtypes"""
+    if is_parquet(path):
+        frames = [pd.read_parquet(file, columns=columns) for file in dataset_files(path)]
+        return apply_schema(pd.concat(frames, ignore_index=True) if len(frames) != 1 else frames[0])
+    return read_csv(path, usecols=columns)
+
+
+def iter_table(path, chunksize, columns=None):
+    """Chunks of at most chunksize rows from a CSV, Parquet file or Parquet directory"""
+    if is_parquet(path):
+        import pyarrow.parquet as pq
+        for file in dataset_files(path):
+            for batch in pq.ParquetFile(file).iter_batches(batch_size=chunksize, columns=columns):
+                yield apply_schema(batch.to_pandas())
+    else:
+        yield from read_csv(path, chunksize=chunksize, usecols=columns)
+
+
+def memory_mb(df):
+    return df.memory_usage(deep=True).sum() / 2 ** 20
@@ -0,0 +1,136 @@
+# Bulk scoring of CSV/Parquet files with bounded memory.
+# CLI: python -m src.score --in data/customer_churn_synth.csv --out artifacts/scores.csv
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from src import schema
+from src.features import FeaturePreprocessor
+from src.model_bundle import load_bundle, load_threshold, resolve_artifact_dir
+
+# Per-process model bundle, loaded once by the pool initializer
+_bundle = None
+
+
+def iter_chunks(path, chunksize, columns=None):
+    """Yield DataFrames of at most chunksize rows from a CSV, Parquet file or Parquet directory, with compact dtypes"""
+    return schema.iter_table(path, chunksize, columns=columns)
+
+
+class ChunkWriter:
+    """Append scored chunks to a CSV or Parquet file"""
+
+    def __init__(self, path):
+        self.path = path
+        self._parquet_writer = None
+        self._first = True
+
+    def write(self, df):
+        if schema.is_parquet(self.path):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.path, table.schema)
+            self._parquet_writer.write_table(table)
+        else:
+            df.to_csv(self.path, mode='w' if self._first else 'a', header=self._first, index=False)
+        self._first = False
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+
+
+def _init_worker(artifacts_dir, version, nthread):
+    global _bundle
+    _bundle = load_bundle(artifacts_dir, nthread=nthread, version=version)
+
+
+def _score_chunk(chunk):
+    columns = {f: chunk[f].to_numpy() for f in _bundle.compiled.feature_names}
+    return _bundle.score(_bundle.compiled.transform_columns(columns))
+
+
+def score_file(in_path, out_path, artifacts_dir='artifacts', chunksize=100_000,
+               workers=None, id_column=None, threshold=None):
+    """Score in_path chunk by chunk on a process pool and stream results to out_path
+
+    Workers load the registry's active version (the flat artifacts directory
+    when there is none), the same model the service answers with; the version
+    is pinned up front so an activation mid-run cannot mix models in one file.
+    threshold defaults to that version's operating threshold from metrics.json.
+    """
+    workers = workers or os.cpu_count() or 1
+    nthread = max(1, (os.cpu_count() or 1) // workers)
+    directory, version = resolve_artifact_dir(artifacts_dir)
+    if threshold is None:
+        threshold = load_threshold(directory)
+    features = FeaturePreprocessor()
+    feature_columns = features.numeric_features + features.categorical_features
+    columns = feature_columns + ([id_column] if id_column else [])
+
+    out_dir = os.path.dirname(out_path)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    writer = ChunkWriter(out_path)
+
+    # At most two chunks per worker are in flight, which bounds memory use
+    max_inflight = 2 * workers
+    inflight = deque()
+    rows_done = 0
+    start = time.perf_counter()
+
+    def drain_one():
+        nonlocal rows_done
+        ids, future = inflight.popleft()
+        probs = future.result()
+        result = pd.DataFrame({'churn_probability': probs, 'churned': probs >= threshold})
+        if ids is not None:
+            result.insert(0, id_column, ids)
+        writer.write(result)
+        rows_done += len(result)
+        elapsed = time.perf_counter() - start
+        print(f"Scored {rows_done} rows ({rows_done / elapsed:,.0f} rows/sec)")
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(artifacts_dir, version, nthread)) as pool:
+            for chunk in iter_chunks(in_path, chunksize, columns=columns):
+                ids = chunk[id_column].to_numpy() if id_column else None
+                inflight.append((ids, pool.submit(_score_chunk, chunk[feature_columns])))
+                if len(inflight) >= max_inflight:
+                    drain_one()
+            while inflight:
+                drain_one()
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    rows_per_sec = rows_done / elapsed if elapsed > 0 else 0.0
+    print(f"Done: {rows_done} rows in {elapsed:.1f}s ({rows_per_sec:,.0f} rows/sec) -> {out_path}")
+    return {'rows': rows_done, 'seconds': elapsed, 'rows_per_sec': rows_per_sec}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Score a CSV/Parquet file in bulk')
+    parser.add_argument('--in', dest='in_path', required=True, help='Input CSV or Parquet file')
+    parser.add_argument('--out', dest='out_path', required=True, help='Output CSV or Parquet file')
+    parser.add_argument('--artifacts', default='artifacts', help='Artifacts directory')
+    parser.add_argument('--chunksize', type=int, default=100_000, help='Rows per chunk')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: all cores)')
+    parser.add_argument('--id-column', default=None, help='Column copied through to the output')
+    parser.add_argument('--threshold', type=float, default=None,
+                        help="Churn cutoff (default: the active version's operating threshold)")
+    args = parser.parse_args()
+
+    score_file(args.in_path, args.out_path, artifacts_dir=args.artifacts, chunksize=args.chunksize,
+               workers=args.workers, id_column=args.id_column, threshold=args.threshold)
+
+
+if __name__ == "__main__":
+    main()
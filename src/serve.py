@@ -0,0 +1,175 @@
+# Production server: preload the model once, fork N uvicorn workers that share it
+# copy-on-write, pin each worker to its own cores and size OpenMP/BLAS pools to match.
+# CLI: python -m src.serve --workers 8 --threads-per-worker 4 --host 0.0.0.0 --port 8000
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+
+# Thread pools read these once, when numpy/xgboost are first imported
+THREAD_ENV_VARS = ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS',
+                   'NUMEXPR_NUM_THREADS', 'MODEL_NTHREAD')
+
+
+def available_cpus():
+    """CPUs this process may run on (respects cgroup/taskset limits where the OS exposes them)"""
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def plan_workers(cpus, workers=0, threads_per_worker=0):
+    """(workers, threads per worker, core set per worker) without oversubscribing ``cpus``
+
+    Zero means derive: threads default to 1 and workers to as many as fit.
+    When the product exceeds the CPU count the core sets wrap around and
+    overlap, which is allowed but reported by the caller.
+    """
+    n = len(cpus)
+    if workers <= 0 and threads_per_worker <= 0:
+        threads_per_worker = 1
+    if threads_per_worker <= 0:
+        threads_per_worker = max(1, n // workers)
+    if workers <= 0:
+        workers = max(1, n // threads_per_worker)
+    core_sets = [{cpus[(w * threads_per_worker + t) % n] for t in range(threads_per_worker)}
+                 for w in range(workers)]
+    return workers, threads_per_worker, core_sets
+
+
+def configure_threads(threads_per_worker):
+    for name in THREAD_ENV_VARS:
+        os.environ[name] = str(threads_per_worker)
+
+
+def bind_socket(host, port, backlog=2048):
+    """Listening socket created before forking; every worker accepts on it"""
+    family = socket.AF_INET6 if ':' in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(index, sock, core_set, log_level):
+    """Child process body: pin, warm the inherited model, serve until signalled"""
+    import uvicorn
+    from src import app as serving
+
+    if core_set and hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, core_set)
+    if serving.bundle is not None:
+        # First model call happens here, after the fork, so each worker gets
+        # its own OpenMP pool (libgomp pools do not survive fork)
+        serving.bundle.warm_up()
+    config = uvicorn.Config(serving.app, log_level=log_level, lifespan='on')
+    server = uvicorn.Server(config)
+    print(f"Worker {index} (pid {os.getpid()}) serving on cores {sorted(core_set) if core_set else 'all'}")
+    server.run(sockets=[sock])
+
+
+class Supervisor:
+    """Fork the workers, restart any that die, and forward shutdown signals"""
+
+    def __init__(self, sock, core_sets, log_level='info', restart_delay=1.0):
+        self.sock = sock
+        self.core_sets = core_sets
+        self.log_level = log_level
+        self.restart_delay = restart_delay
+        self.children = {}
+        self.stopping = False
+
+    def spawn(self, index):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            code = 0
+            try:
+                run_worker(index, self.sock, self.core_sets[index], self.log_level)
+            except BaseException as e:
+                print(f"Worker {index} failed: {e}", file=sys.stderr)
+                code = 1
+            finally:
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os._exit(code)
+        self.children[pid] = index
+
+    def stop(self, signum, frame):
+        self.stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        for index in range(len(self.core_sets)):
+            self.spawn(index)
+        while self.children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+            index = self.children.pop(pid, None)
+            if index is None or self.stopping:
+                continue
+            print(f"Worker {index} (pid {pid}) exited with status {status}; restarting", file=sys.stderr)
+            time.sleep(self.restart_delay)
+            self.spawn(index)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the churn API with preforked, CPU-pinned workers')
+    parser.add_argument('--host', default=os.environ.get('SERVE_HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('SERVE_PORT', '8000')))
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('SERVE_WORKERS', '0')),
+                        help='Worker processes (0: available CPUs / threads per worker)')
+    parser.add_argument('--threads-per-worker', type=int,
+                        default=int(os.environ.get('SERVE_THREADS_PER_WORKER', '0')),
+                        help='OpenMP/BLAS/XGBoost threads per worker (0: available CPUs / workers)')
+    parser.add_argument('--no-pin', action='store_true', help='Do not pin workers to core sets')
+    parser.add_argument('--log-level', default='info')
+    args = parser.parse_args()
+
+    cpus = available_cpus()
+    workers, threads, core_sets = plan_workers(cpus, args.workers, args.threads_per_worker)
+    if workers * threads > len(cpus):
+        print(f"Warning: {workers} workers x {threads} threads oversubscribes {len(cpus)} CPUs", file=sys.stderr)
+    if args.no_pin:
+        core_sets = [None] * workers
+    configure_threads(threads)
+
+    # Imported only now so numpy/xgboost see the thread settings above
+    from src import app as serving
+
+    # Preload in the parent without scoring: the booster, compiled constants
+    # and profile are inherited by every worker and shared copy-on-write.
+    # Drift monitoring threads start per worker (threads do not survive fork).
+    try:
+        serving.bundle = serving._load()
+        print(f"Preloaded model version {serving.bundle.version}")
+    except Exception as e:
+        print(f"Warning: Could not load artifacts: {e}")
+    # Move everything allocated so far out of the collector's reach, so
+    # collections in the workers do not write to (and un-share) those pages
+    gc.collect()
+    gc.freeze()
+
+    sock = bind_socket(args.host, args.port)
+    print(f"Serving on {args.host}:{args.port} with {workers} workers x {threads} threads")
+    Supervisor(sock, core_sets, log_level=args.log_level).run()
+
+
+if __name__ == "__main__":
+    main()
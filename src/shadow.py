@@ -0,0 +1,166 @@
+# Shadow (challenger) scoring: a second model version scores the same traffic
+# off the request path and its decisions are compared with the champion's.
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src.telemetry import Histogram
+
+# |challenger - champion| probability deltas are counted in bins of this width
+DELTA_BIN = 0.001
+N_DELTA_BINS = int(round(1 / DELTA_BIN))
+
+
+def _delta_quantile(counts, q):
+    """Upper edge of the delta bin holding the q-th value (None when empty)"""
+    total = counts.sum()
+    if not total:
+        return None
+    return (int(np.searchsorted(np.cumsum(counts), q * total)) + 1) * DELTA_BIN
+
+
+def same_encoding(a, b):
+    """Whether two compiled preprocessors produce identical matrices"""
+    return (a.output_feature_names() == b.output_feature_names()
+            and np.array_equal(a.medians, b.medians)
+            and np.array_equal(a.means, b.means)
+            and np.array_equal(a.scales, b.scales))
+
+
+class ShadowScorer:
+    """Score champion traffic with a challenger bundle in a background thread
+
+    submit() only enqueues: it is called from a BackgroundTask after the
+    response has been sent, and once ``max_pending`` batches are queued
+    further batches are dropped and counted rather than queued without
+    bound. When the challenger was trained with the same preprocessing as
+    the champion its encoded matrix is reused; otherwise the challenger's
+    compiled preprocessor re-encodes the raw columns in the background thread.
+    Each model's decision is taken at its own operating threshold (threshold
+    overrides the challenger's).
+    """
+
+    def __init__(self, challenger, threshold=None, max_pending=64):
+        self.challenger = challenger
+        self.threshold = getattr(challenger, 'threshold', 0.5) if threshold is None else threshold
+        self.max_pending = max_pending
+        self._champion_compiled = None
+        self.reuse_matrix = False
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='shadow')
+        self._lock = threading.Lock()
+        self._pending = 0
+
+        self.delta_counts = np.zeros(N_DELTA_BINS, dtype=np.int64)
+        self.seconds = Histogram(scale=1e-6)
+        self.rows = 0
+        self.agreements = 0
+        self.delta_sum = 0.0
+        self.dropped = 0
+        self.skipped = 0
+        self.errors = 0
+        self._last_export = None
+
+    @property
+    def version(self):
+        return self.challenger.version
+
+    def submit(self, champion_probs, compiled, X=None, columns=None, champion_threshold=0.5):
+        """Queue one request's rows for challenger scoring; never blocks
+
+        X is the champion's encoded matrix (built with ``compiled``) when
+        there is one; columns the raw request columns.
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.dropped += len(champion_probs)
+                return False
+            self._pending += 1
+        self._executor.submit(self._score, np.asarray(champion_probs, dtype=np.float64), compiled, X, columns,
+                              champion_threshold)
+        return True
+
+    def _reuses(self, compiled):
+        # Checked once per champion version (hot reloads swap the compiled object)
+        if compiled is not self._champion_compiled:
+            self.reuse_matrix = same_encoding(self.challenger.compiled, compiled)
+            self._champion_compiled = compiled
+        return self.reuse_matrix
+
+    def _score(self, champion_probs, compiled, X, columns, champion_threshold):
+        try:
+            start = time.perf_counter()
+            if X is None or not self._reuses(compiled):
+                if columns is None:
+                    # Encoded-only input (.npy) in an incompatible encoding
+                    with self._lock:
+                        self.skipped += len(champion_probs)
+                    return
+                X = self.challenger.compiled.transform_columns(columns)
+            probs = np.asarray(self.challenger.score(X), dtype=np.float64)
+            self.seconds.record((time.perf_counter() - start) * 1e6)
+            self.record(champion_probs, probs, champion_threshold)
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+            print(f"Shadow scoring failed: {e}")
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def record(self, champion_probs, challenger_probs, champion_threshold=0.5):
+        delta = np.abs(challenger_probs - champion_probs)
+        agree = int(np.count_nonzero((challenger_probs >= self.threshold) == (champion_probs >= champion_threshold)))
+        bins = np.bincount(np.minimum((delta / DELTA_BIN).astype(np.int64), N_DELTA_BINS - 1),
+                           minlength=N_DELTA_BINS)
+        with self._lock:
+            self.delta_counts += bins
+            self.rows += len(delta)
+            self.agreements += agree
+            self.delta_sum += float(delta.sum())
+
+    def stats(self):
+        with self._lock:
+            rows, agreements, delta_sum = self.rows, self.agreements, self.delta_sum
+            pending, dropped, skipped, errors = self._pending, self.dropped, self.skipped, self.errors
+            delta_counts = self.delta_counts.copy()
+        return {
+            'challenger_version': self.version,
+            'reuses_champion_matrix': self.reuse_matrix,
+            'rows': rows,
+            'agreement_rate': agreements / rows if rows else None,
+            'mean_abs_delta': delta_sum / rows if rows else None,
+            'p95_abs_delta': _delta_quantile(delta_counts, 0.95),
+            'p95_seconds': self.seconds.snapshot().quantile(0.95),
+            'pending_batches': pending,
+            'dropped_rows': dropped,
+            'skipped_rows': skipped,
+            'errors': errors,
+        }
+
+    def history_fields(self):
+        """Shadow fields for a metrics_history.jsonl record, over the interval since the previous call"""
+        with self._lock:
+            current = (self.rows, self.agreements, self.delta_sum, self.dropped, self.delta_counts.copy())
+            previous, self._last_export = self._last_export, current
+        rows, agreements, delta_sum, dropped, delta_counts = current
+        if previous is not None:
+            rows -= previous[0]
+            agreements -= previous[1]
+            delta_sum -= previous[2]
+            dropped -= previous[3]
+            delta_counts = delta_counts - previous[4]
+        p95 = _delta_quantile(delta_counts, 0.95)
+        return {
+            'challenger_version': self.version,
+            'shadow_rows': rows,
+            'shadow_agreement': round(agreements / rows, 6) if rows else None,
+            'shadow_mean_abs_delta': round(delta_sum / rows, 6) if rows else None,
+            'shadow_p95_abs_delta': round(p95, 6) if p95 is not None else None,
+            'shadow_dropped_rows': dropped,
+        }
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.challenger.retire()
@@ -0,0 +1,257 @@
+# Serving telemetry: per-stage latency and batch-size histograms, error counters,
+# Prometheus text exposition and JSONL export in the metrics_history.jsonl schema.
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+SUB_BUCKET_BITS = 4  # 16 linear sub-buckets per power of two: <= 6.25% relative error
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+
+# Prometheus bucket bounds (seconds for latencies, rows for batch sizes)
+LATENCY_BOUNDS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                  0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BOUNDS = tuple(2 ** i for i in range(15))
+
+STAGES = ('parse', 'build', 'transform', 'score', 'serialize', 'total')
+
+
+def _bucket_index(value):
+    if value < SUB_BUCKETS:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS - 1
+    return shift * SUB_BUCKETS + (value >> shift)
+
+
+def _bucket_upper(index):
+    """Exclusive upper bound of a bucket, in the histogram's integer unit"""
+    if index < 2 * SUB_BUCKETS:
+        return index + 1
+    shift = index // SUB_BUCKETS - 1
+    return (index - shift * SUB_BUCKETS + 1) << shift
+
+
+class Histogram:
+    """HDR-style log-linear histogram over non-negative integers
+
+    Each power of two is split into 16 linear buckets, so any recorded value
+    is known to within 6.25% while the whole range (1us to hours) fits in a
+    few hundred counters. Recording is O(1): a bit_length and a list
+    increment. ``scale`` converts recorded units back to exported units
+    (1e-6 for microsecond-recorded latencies in seconds).
+    """
+
+    def __init__(self, scale=1.0):
+        self.scale = scale
+        self.counts = []
+        self.count = 0
+        self.sum = 0
+        self._lock = threading.Lock()
+
+    def record(self, value):
+        value = int(value)
+        index = _bucket_index(value)
+        with self._lock:
+            if index >= len(self.counts):
+                self.counts.extend([0] * (index + 1 - len(self.counts)))
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+    def snapshot(self):
+        with self._lock:
+            copy = Histogram(self.scale)
+            copy.counts, copy.count, copy.sum = list(self.counts), self.count, self.sum
+        return copy
+
+    def minus(self, earlier):
+        """Histogram of the values recorded since the ``earlier`` snapshot"""
+        delta = Histogram(self.scale)
+        delta.counts = [c - (earlier.counts[i] if i < len(earlier.counts) else 0)
+                        for i, c in enumerate(self.counts)]
+        delta.count = self.count - earlier.count
+        delta.sum = self.sum - earlier.sum
+        return delta
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th value, in exported units (None when empty)"""
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, c in enumerate(self.counts):
+            seen += c
+            if c and seen >= rank:
+                return _bucket_upper(index) * self.scale
+        return _bucket_upper(len(self.counts) - 1) * self.scale
+
+    def cumulative(self, bounds):
+        """Counts of values <= each bound (exported units), for Prometheus buckets
+
+        A histogram bucket is counted once its largest value fits under the
+        bound, so counts are exact to the bucket resolution.
+        """
+        out = []
+        index, seen = 0, 0
+        for bound in bounds:
+            while index < len(self.counts) and (_bucket_upper(index) - 1) * self.scale <= bound:
+                seen += self.counts[index]
+                index += 1
+            out.append(seen)
+        return out
+
+
+class StageTimer:
+    """Per-request stopwatch: mark(stage) records the time since the previous mark"""
+
+    __slots__ = ('telemetry', 'start', 'last')
+
+    def __init__(self, telemetry):
+        self.telemetry = telemetry
+        self.start = self.last = time.perf_counter()
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        self.telemetry.stages[stage].record((now - self.last) * 1e6)
+        self.last = now
+
+    def finish(self):
+        self.telemetry.stages['total'].record((time.perf_counter() - self.start) * 1e6)
+
+
+class Telemetry:
+    """Process-wide serving metrics"""
+
+    def __init__(self, stages=STAGES):
+        self.stages = {stage: Histogram(scale=1e-6) for stage in stages}
+        self.model_seconds = Histogram(scale=1e-6)
+        self.batch_rows = Histogram()
+        self.request_rows = Histogram()
+        self.requests = {}
+        self.errors = {}
+        self._lock = threading.Lock()
+        self._last_export = None
+
+    def timer(self):
+        return StageTimer(self)
+
+    def count_request(self, payload_type):
+        with self._lock:
+            self.requests[payload_type] = self.requests.get(payload_type, 0) + 1
+
+    def count_error(self, kind):
+        with self._lock:
+            self.errors[kind] = self.errors.get(kind, 0) + 1
+
+    def observe_batch(self, rows, seconds):
+        """MicroBatcher observer: rows per model call and model time"""
+        self.batch_rows.record(rows)
+        self.model_seconds.record(seconds * 1e6)
+
+    def prometheus(self, gauges=None):
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+
+        def histogram(name, hist, bounds, labels=''):
+            cumulative = hist.cumulative(bounds)
+            for bound, c in zip(bounds, cumulative):
+                lines.append(f'{name}_bucket{{{labels}le="{bound:g}"}} {c}')
+            lines.append(f'{name}_bucket{{{labels}le="+Inf"}} {hist.count}')
+            label_block = f'{{{labels.rstrip(",")}}}' if labels else ''
+            lines.append(f'{name}_sum{label_block} {hist.sum * hist.scale:.6f}')
+            lines.append(f'{name}_count{label_block} {hist.count}')
+
+        lines += ['# HELP churn_predict_stage_seconds Time spent in each /predict stage',
+                  '# TYPE churn_predict_stage_seconds histogram']
+        for stage, hist in self.stages.items():
+            histogram('churn_predict_stage_seconds', hist.snapshot(), LATENCY_BOUNDS, f'stage="{stage}",')
+        lines += ['# HELP churn_model_batch_seconds Model time per micro-batch',
+                  '# TYPE churn_model_batch_seconds histogram']
+        histogram('churn_model_batch_seconds', self.model_seconds.snapshot(), LATENCY_BOUNDS)
+        lines += ['# HELP churn_model_batch_rows Rows per model call',
+                  '# TYPE churn_model_batch_rows histogram']
+        histogram('churn_model_batch_rows', self.batch_rows.snapshot(), SIZE_BOUNDS)
+        lines += ['# HELP churn_request_rows Rows per /predict request',
+                  '# TYPE churn_request_rows histogram']
+        histogram('churn_request_rows', self.request_rows.snapshot(), SIZE_BOUNDS)
+
+        with self._lock:
+            requests, errors = dict(self.requests), dict(self.errors)
+        lines += ['# HELP churn_requests_total /predict requests by payload type',
+                  '# TYPE churn_requests_total counter']
+        lines += [f'churn_requests_total{{payload="{k}"}} {v}' for k, v in sorted(requests.items())]
+        lines += ['# HELP churn_errors_total /predict errors by kind',
+                  '# TYPE churn_errors_total counter']
+        lines += [f'churn_errors_total{{kind="{k}"}} {v}' for k, v in sorted(errors.items())]
+        for name, (help_text, value) in (gauges or {}).items():
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} gauge', f'{name} {value}']
+        return '\n'.join(lines) + '\n'
+
+    def history_record(self, quality=None):
+        """One metrics_history.jsonl record for the interval since the previous call
+
+        Serving has no labels, so roc_auc/pr_auc/acc come from ``quality``
+        (e.g. an offline evaluation) or are null.
+        """
+        with self._lock:
+            current = (self.stages['total'].snapshot(), sum(self.requests.values()), sum(self.errors.values()))
+            previous, self._last_export = self._last_export, current
+        total, n_requests, n_errors = current
+        if previous is not None:
+            total = total.minus(previous[0])
+            n_requests -= previous[1]
+            n_errors -= previous[2]
+        p95 = total.quantile(0.95)
+        quality = quality or {}
+        return {
+            'ts': datetime.now().isoformat(),
+            'roc_auc': quality.get('roc_auc'),
+            'pr_auc': quality.get('pr_auc'),
+            'acc': quality.get('accuracy'),
+            'latency_p95_ms': round(p95 * 1000, 3) if p95 is not None else None,
+            'error_rate': n_errors / n_requests if n_requests else 0.0,
+        }
+
+
+class HistoryExporter:
+    """Append a metrics_history.jsonl record every ``interval`` seconds
+
+    ``extra_fn()`` returns additional fields merged into each record (e.g.
+    shadow-scoring agreement for the same interval).
+    """
+
+    def __init__(self, telemetry, path, interval=60.0, quality_fn=None, extra_fn=None):
+        self.telemetry = telemetry
+        self.path = path
+        self.interval = interval
+        self.quality_fn = quality_fn
+        self.extra_fn = extra_fn
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.telemetry.history_record()  # start the first interval now
+        if self.extra_fn:
+            self.extra_fn()
+        self._thread = threading.Thread(target=self._run, name='telemetry-export', daemon=True)
+        self._thread.start()
+        return self
+
+    def export(self):
+        quality = self.quality_fn() if self.quality_fn else None
+        record = self.telemetry.history_record(quality)
+        if self.extra_fn:
+            record.update(self.extra_fn())
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.export()
+
+    def stop(self):
+        self._stop.set()
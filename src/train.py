@@ -3,18 +3,31 @@
 import argparse
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
 import json
 import os
 from datetime import datetime
+import shutil
 import subprocess
 import sys
+import tempfile
+import xgboost as xgb
 
 #from features import FeaturePreprocessor
 #from models import ChurnModel
 
 from src.features import FeaturePreprocessor
-from src.models import ChurnModel
+from src.models import ChurnModel, DEFAULT_PARAMS
+from src.drift_sketch import ReferenceProfile
+from src.registry import publish_version
+from src.compiled_features import CompiledPreprocessor, CONSTANTS_FILE, META_FILE
+from src.search import successive_halving
+from src.score import iter_chunks
+from src import out_of_core, evaluation
+from src.tree_compiler import TREES_FILE, TreeEnsemble
+from src.feature_store import load_or_build
+
+# Content-addressed store of split indices and transformed matrices (None disables)
+FEATURE_CACHE_DIR = os.environ.get('FEATURE_CACHE_DIR', '.feature_cache')
 
 def get_git_sha():
     """Get current git SHA if available"""
@@ -23,52 +36,77 @@ def get_git_sha():
     except:
         return "unknown"
 
-def train_model(data_path, outdir):
-    """Train the churn prediction model"""
+def train_model(data_path, outdir, search=False, trials=27, workers=None, seed=42,
+                feature_cache=FEATURE_CACHE_DIR, encoding='onehot', threshold_objective='f1',
+                bootstrap=200, activate=False):
+    """Train the churn prediction model; search=True tunes hyperparameters first
+
+    encoding="native" feeds categoricals to XGBoost as ordinal codes with native
+    categorical splits instead of one-hot columns. The operating threshold
+    maximizes threshold_objective on the validation set; bootstrap replicates
+    (0 disables) give confidence intervals for the validation metrics. The run
+    is published as a new registry version; activate=True also makes it ACTIVE.
+    """
     # Create output directory if it doesn't exist
     os.makedirs(outdir, exist_ok=True)
     
-    # Load data
-    print("Loading data...")
-    data = pd.read_csv(data_path)
-    
-    # Split features and target
-    X = data.drop('churned', axis=1)
-    y = data['churned']
-    
-    # Split train/validation
-    X_train, X_val, y_train, y_val = train_test_split(
-        X, y, test_size=0.2, random_state=42, stratify=y
-    )
+    # Load, split and preprocess, or memory-map the cached result of a previous run
+    print("Loading features...")
+    feature_set = load_or_build(data_path, cache_dir=feature_cache, test_size=0.2, random_state=42,
+                                encoding=encoding)
+    print(f"Feature cache {'hit' if feature_set.hit else 'miss'} ({feature_set.seconds:.2f}s)")
+    preprocessor = feature_set.preprocessor
+    X_train_processed, X_val_processed = feature_set.X_train, feature_set.X_val
+    y_train, y_val = feature_set.y_train, feature_set.y_val
+    feature_types = preprocessor.feature_types()
+    categorical_params = (dict(feature_types=feature_types, enable_categorical=True, tree_method='hist')
+                          if feature_types else {})
     
-    # Preprocess features
-    print("Preprocessing features...")
-    preprocessor = FeaturePreprocessor()
-    X_train_processed = preprocessor.fit_transform(X_train)
-    X_val_processed = preprocessor.transform(X_val)
+    # Optional hyperparameter search
+    search_summary = None
+    params = {}
+    if search:
+        print("Searching hyperparameters...")
+        search_summary = successive_halving(
+            X_train_processed, y_train, X_val_processed, y_val,
+            n_trials=trials, workers=workers, seed=seed, feature_types=feature_types
+        )
+        params = dict(search_summary['best_params'], n_estimators=search_summary['best_iteration'] + 1)
     
     # Train model
     print("Training model...")
-    model = ChurnModel()
+    model = ChurnModel(**params, **categorical_params, random_state=seed)
     model.fit(X_train_processed, y_train)
     
     # Evaluate model
     print("Evaluating model...")
     train_metrics = model.evaluate(X_train_processed, y_train)
-    val_metrics = model.evaluate(X_val_processed, y_val)
+    val_metrics, validation = _validation_report(model.predict_proba(X_val_processed), y_val,
+                                                 threshold_objective, bootstrap, seed)
     
     # Save artifacts
     print("Saving artifacts...")
     model.save(os.path.join(outdir, 'model.pkl'))
+    model.export_booster(os.path.join(outdir, 'model.ubj'))
+    # Array-backed trees for the dependency-light "trees" serving backend
+    TreeEnsemble.from_booster(model.model.get_booster()).save(os.path.join(outdir, TREES_FILE))
     preprocessor.save(os.path.join(outdir, 'feature_pipeline.pkl'))
+    # Serving format: flat NumPy constants that workers memory-map instead of unpickling
+    CompiledPreprocessor.from_preprocessor(preprocessor).save(outdir)
+    feature_set.profile.save(os.path.join(outdir, 'drift_profile.json'))
     
     # Save metrics
     metrics = {
         'timestamp': datetime.now().isoformat(),
         'git_sha': get_git_sha(),
         'train_metrics': train_metrics,
-        'val_metrics': val_metrics
+        'val_metrics': val_metrics,
+        'feature_cache': feature_set.cache_info(),
+        'encoding': encoding,
+        **validation,
     }
+    if search_summary is not None:
+        metrics['search'] = search_summary
     
     with open(os.path.join(outdir, 'metrics.json'), 'w') as f:
         json.dump(metrics, f, indent=2)
@@ -81,17 +119,163 @@ def train_model(data_path, outdir):
     
     feature_importances.to_csv(os.path.join(outdir, 'feature_importances.csv'), index=False)
     
+    # Publish a versioned copy; activating it makes running services hot-reload it
+    artifact_files = ['model.pkl', 'model.ubj', TREES_FILE, 'feature_pipeline.pkl', CONSTANTS_FILE, META_FILE,
+                      'drift_profile.json', 'metrics.json', 'feature_importances.csv']
+    version = publish_version(outdir, [os.path.join(outdir, f) for f in artifact_files],
+                              metrics, metrics['git_sha'], activate=activate)
+    print(f"Published model version {version}{' (active)' if activate else ''}")
+    
+    print(f"Training completed. Validation ROC-AUC: {val_metrics['roc_auc']:.4f}")
+    return val_metrics['roc_auc']
+
+def train_model_out_of_core(data_path, outdir, chunksize=100_000, cache_dir=None,
+                            test_size=0.2, seed=42, threshold_objective='f1', bootstrap=200,
+                            activate=False):
+    """Train without loading the dataset: memory is bounded by chunksize
+
+    Pass 1 streams the training rows into the preprocessor statistics. Pass 2
+    encodes every chunk to float32 .npy files under cache_dir, which XGBoost
+    reads through an external-memory DataIter. The split is a seeded random
+    mask per row (not stratified), so it only depends on the seed and chunksize.
+    """
+    os.makedirs(outdir, exist_ok=True)
+    features = FeaturePreprocessor()
+    columns = features.numeric_features + features.categorical_features
+
+    # Pass 1: streaming statistics over the training rows
+    print("Fitting preprocessor statistics (streaming)...")
+    stats = out_of_core.StreamingFeatureStats(features.numeric_features, features.categorical_features)
+    sample = out_of_core.ReservoirSample(seed=seed)
+    for chunk, is_val in out_of_core.split_masks(iter_chunks(data_path, chunksize), test_size, seed):
+        train_rows = chunk.loc[~is_val, columns]
+        stats.update(train_rows)
+        sample.update(train_rows)
+    compiled = stats.finalize()
+
+    # Pass 2: encode chunks to disk
+    cache_dir = tempfile.mkdtemp(prefix='churn_chunks_', dir=cache_dir)
+    try:
+        print(f"Encoding chunks to {cache_dir}...")
+        train_files, val_files = [], []
+        for i, (chunk, is_val) in enumerate(
+                out_of_core.split_masks(iter_chunks(data_path, chunksize), test_size, seed)):
+            X = compiled.transform_columns({f: chunk[f].to_numpy() for f in columns})
+            y = chunk['churned'].to_numpy()
+            for name, files, mask in [('train', train_files, ~is_val), ('val', val_files, is_val)]:
+                if mask.any():
+                    files.append(out_of_core.write_chunk(cache_dir, name, i, X[mask], y[mask]))
+
+        print("Training model (external memory)...")
+        dtrain = xgb.DMatrix(out_of_core.ChunkIter(train_files, os.path.join(cache_dir, 'dtrain')))
+        params = {k: v for k, v in DEFAULT_PARAMS.items()
+                  if k not in ('n_estimators', 'random_state', 'use_label_encoder')}
+        booster = xgb.train(
+            {**params, 'objective': 'binary:logistic', 'tree_method': 'hist',
+             'seed': seed},
+            dtrain, num_boost_round=DEFAULT_PARAMS['n_estimators'],
+        )
+
+        print("Evaluating model...")
+        train_probs, train_y = out_of_core.predict_chunks(booster, train_files)
+        train_metrics = evaluation.evaluate(train_y, train_probs)
+        val_probs, val_y = out_of_core.predict_chunks(booster, val_files)
+        val_metrics, validation = _validation_report(val_probs, val_y, threshold_objective, bootstrap, seed)
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    # Serving-format artifacts only: there is no sklearn pipeline or pickled
+    # classifier, so this model serves through the native backend.
+    print("Saving artifacts...")
+    booster.save_model(os.path.join(outdir, 'model.ubj'))
+    TreeEnsemble.from_booster(booster).save(os.path.join(outdir, TREES_FILE))
+    compiled.save(outdir)
+    ReferenceProfile.from_frame(sample.frame).save(os.path.join(outdir, 'drift_profile.json'))
+
+    metrics = {
+        'timestamp': datetime.now().isoformat(),
+        'git_sha': get_git_sha(),
+        'train_metrics': train_metrics,
+        'val_metrics': val_metrics,
+        'out_of_core': {
+            'chunksize': chunksize,
+            'train_rows': stats.n,
+            'approximate_medians': [f for f, sketch in zip(compiled.numeric_features, stats.sketches)
+                                    if not sketch.exact],
+        },
+        **validation,
+    }
+    with open(os.path.join(outdir, 'metrics.json'), 'w') as f:
+        json.dump(metrics, f, indent=2)
+
+    gains = booster.get_score(importance_type='gain')
+    importances = np.array([gains.get(f'f{i}', 0.0) for i in range(compiled.n_features_out)])
+    pd.DataFrame({
+        'feature': compiled.output_feature_names(),
+        'importance': importances / importances.sum() if importances.sum() > 0 else importances
+    }).sort_values('importance', ascending=False).to_csv(
+        os.path.join(outdir, 'feature_importances.csv'), index=False)
+
+    artifact_files = ['model.ubj', TREES_FILE, CONSTANTS_FILE, META_FILE, 'drift_profile.json',
+                      'metrics.json', 'feature_importances.csv']
+    version = publish_version(outdir, [os.path.join(outdir, f) for f in artifact_files],
+                              metrics, metrics['git_sha'], activate=activate)
+    print(f"Published model version {version}{' (active)' if activate else ''}")
+
     print(f"Training completed. Validation ROC-AUC: {val_metrics['roc_auc']:.4f}")
     return val_metrics['roc_auc']
 
+def _validation_report(probs, y, threshold_objective='f1', bootstrap=200, seed=42):
+    """(val_metrics at 0.5, metrics.json entries for the operating threshold and CIs), from one sort"""
+    scores = evaluation.SortedScores(y, probs)
+    operating_point = scores.select_threshold(threshold_objective)
+    report = {'operating_threshold': operating_point['threshold'], 'operating_point': operating_point}
+    if bootstrap:
+        report['val_ci'] = {
+            'level': 0.95, 'n_boot': bootstrap, 'method': 'poisson', 'threshold': operating_point['threshold'],
+            **scores.bootstrap(operating_point['threshold'], n_boot=bootstrap, seed=seed),
+        }
+    return scores.evaluate(0.5), report
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Train churn prediction model')
-    parser.add_argument('--data', type=str, required=True, help='Path to training data')
+    parser.add_argument('--data', type=str, required=True, help='Training data: CSV, Parquet file or labelled prediction log directory')
     parser.add_argument('--outdir', type=str, default='artifacts', help='Output directory')
+    parser.add_argument('--search', action='store_true', help='Run successive-halving hyperparameter search')
+    parser.add_argument('--trials', type=int, default=27, help='Configurations sampled by --search')
+    parser.add_argument('--workers', type=int, default=None, help='Search worker processes (default: all cores)')
+    parser.add_argument('--seed', type=int, default=42, help='Seed for the search and the final model fit (out-of-core: also the split)')
+    parser.add_argument('--out-of-core', action='store_true',
+                        help='Stream the data in chunks and train from an external-memory cache')
+    parser.add_argument('--chunksize', type=int, default=100_000, help='Rows per chunk with --out-of-core')
+    parser.add_argument('--cache-dir', type=str, default=None, help='Where --out-of-core caches encoded chunks')
+    parser.add_argument('--feature-cache', type=str, default=FEATURE_CACHE_DIR,
+                        help='Feature store directory for split indices and transformed matrices')
+    parser.add_argument('--no-feature-cache', action='store_true', help='Always re-parse and re-transform')
+    parser.add_argument('--encoding', choices=['onehot', 'native'], default='onehot',
+                        help='Categorical encoding: dense one-hot or XGBoost native categoricals')
+    parser.add_argument('--threshold-objective', choices=list(evaluation.OBJECTIVES), default='f1',
+                        help='Validation metric the operating threshold maximizes')
+    parser.add_argument('--bootstrap', type=int, default=200,
+                        help='Bootstrap replicates for validation confidence intervals (0 disables)')
+    parser.add_argument('--activate', action='store_true',
+                        help='Make the published version ACTIVE (running services hot-reload it)')
     
     args = parser.parse_args()
+    if args.out_of_core and args.search:
+        parser.error('--search is not supported with --out-of-core')
     
-    roc_auc = train_model(args.data, args.outdir)
+    if args.out_of_core:
+        roc_auc = train_model_out_of_core(args.data, args.outdir, chunksize=args.chunksize,
+                                          cache_dir=args.cache_dir, seed=args.seed,
+                                          threshold_objective=args.threshold_objective, bootstrap=args.bootstrap,
+                                          activate=args.activate)
+    else:
+        roc_auc = train_model(args.data, args.outdir, search=args.search, trials=args.trials,
+                              workers=args.workers, seed=args.seed,
+                              feature_cache=None if args.no_feature_cache else args.feature_cache,
+                              encoding=args.encoding, threshold_objective=args.threshold_objective,
+                              bootstrap=args.bootstrap, activate=args.activate)
     
     if roc_auc >= 0.83:
         print("✓ Model meets acceptance criteria (ROC-AUC ≥ 0.83)")
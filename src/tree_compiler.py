@@ -0,0 +1,285 @@
+# Tree-ensemble compiler: turns a trained XGBoost booster (its JSON dump) into
+# flat NumPy node arrays and scores them level by level, so serving needs
+# neither xgboost nor sklearn to evaluate the trees.
+# CLI: python -m src.tree_compiler --model artifacts/model.ubj --out artifacts/model_trees.npz [--check-rows 10000]
+import argparse
+import json
+import math
+import os
+import time
+
+import numpy as np
+
+TREES_FILE = 'model_trees.npz'
+
+# Supported objectives: margins go through the logistic function
+LOGISTIC_OBJECTIVES = ('binary:logistic', 'reg:logistic')
+
+
+class TreeEnsemble:
+    """All trees of a binary logistic booster as one set of node arrays
+
+    Node ids are global across trees (roots[t] is tree t's root). A split
+    sends a row to children[2 * node] (left) or children[2 * node + 1]
+    (right): numeric splits go left when x < threshold, categorical splits
+    go right when the category is in the node's row of cat_table, and
+    missing values follow default_left. Leaves point at themselves, so
+    max_depth steps of the same update walk every tree to its leaf.
+    """
+
+    def __init__(self, feature, threshold, children, default_left, value, roots,
+                 base_margin, max_depth, num_feature, cat_row=None, cat_table=None):
+        self.feature = np.asarray(feature, dtype=np.int32)
+        self.threshold = np.asarray(threshold, dtype=np.float32)
+        self.children = np.asarray(children, dtype=np.int32)
+        self.default_left = np.asarray(default_left, dtype=bool)
+        self.value = np.asarray(value, dtype=np.float32)
+        self.roots = np.asarray(roots, dtype=np.int32)
+        self.base_margin = np.float32(base_margin)
+        self.max_depth = int(max_depth)
+        self.num_feature = int(num_feature)
+        n_nodes = len(self.feature)
+        self.cat_row = (np.full(n_nodes, -1, dtype=np.int32) if cat_row is None
+                        else np.asarray(cat_row, dtype=np.int32))
+        self.cat_table = (np.zeros((0, 0), dtype=bool) if cat_table is None
+                          else np.asarray(cat_table, dtype=bool))
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    @classmethod
+    def from_json(cls, model):
+        """Compile a parsed XGBoost JSON model (Booster.save_raw('json') / model.json)"""
+        learner = model['learner']
+        objective = learner['objective']['name']
+        if objective not in LOGISTIC_OBJECTIVES:
+            raise ValueError(f"Only {LOGISTIC_OBJECTIVES} boosters can be compiled, got {objective!r}")
+        booster = learner['gradient_booster']
+        if booster['name'] != 'gbtree':
+            raise ValueError(f"Only gbtree boosters can be compiled, got {booster['name']!r}")
+        trees = booster['model']['trees']
+        best_iteration = learner.get('attributes', {}).get('best_iteration')
+        if best_iteration is not None:
+            # Same iteration_range as BoosterModel / XGBClassifier.predict_proba
+            indptr = booster['model'].get('iteration_indptr')
+            if indptr is None:
+                per_iteration = int(booster['model']['gbtree_model_param'].get('num_parallel_tree', 1))
+                indptr = [i * per_iteration for i in range(len(trees) // per_iteration + 1)]
+            trees = trees[:indptr[int(best_iteration) + 1]]
+
+        # base_score is a probability ("5E-1", or "[5E-1]" in newer releases)
+        base_score = float(learner['learner_model_param']['base_score'].strip('[]'))
+        base_margin = -math.log(1.0 / base_score - 1.0)
+
+        arrays = [_compile_tree(tree) for tree in trees]
+        offsets = np.cumsum([0] + [len(a['feature']) for a in arrays])
+        width = max([a['cat_table'].shape[1] for a in arrays] + [0])
+        cat_tables, cat_rows, n_cat_rows = [], [], 0
+        for a in arrays:
+            table = a['cat_table']
+            cat_tables.append(np.pad(table, ((0, 0), (0, width - table.shape[1]))))
+            cat_rows.append(np.where(a['cat_row'] >= 0, a['cat_row'] + n_cat_rows, -1))
+            n_cat_rows += len(table)
+        return cls(
+            feature=np.concatenate([a['feature'] for a in arrays]),
+            threshold=np.concatenate([a['threshold'] for a in arrays]),
+            children=np.concatenate([a['children'] + offset for a, offset in zip(arrays, offsets)]),
+            default_left=np.concatenate([a['default_left'] for a in arrays]),
+            value=np.concatenate([a['value'] for a in arrays]),
+            roots=offsets[:-1],
+            base_margin=base_margin,
+            max_depth=max([a['depth'] for a in arrays] + [0]),
+            num_feature=int(learner['learner_model_param']['num_feature']),
+            cat_row=np.concatenate(cat_rows),
+            cat_table=np.concatenate(cat_tables) if cat_tables else None,
+        )
+
+    @classmethod
+    def from_booster(cls, booster):
+        """Compile an in-memory xgboost.Booster"""
+        return cls.from_json(json.loads(booster.save_raw(raw_format='json')))
+
+    @classmethod
+    def from_file(cls, path):
+        """Compile a saved model: .json is parsed directly, other formats go through xgboost"""
+        if path.endswith('.json'):
+            with open(path) as f:
+                return cls.from_json(json.load(f))
+        import xgboost as xgb
+        booster = xgb.Booster()
+        booster.load_model(path)
+        return cls.from_booster(booster)
+
+    def margin(self, X, block_rows=16384):
+        """Log-odds per row: base margin plus every tree's leaf, summed in float32 in tree order"""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] < self.num_feature:
+            raise ValueError(f"Expected a 2-D matrix with {self.num_feature} columns, got shape {X.shape}")
+        out = np.empty(len(X), dtype=np.float32)
+        for start in range(0, len(X), block_rows):
+            out[start:start + block_rows] = self._margin_block(X[start:start + block_rows])
+        return out
+
+    def _margin_block(self, X):
+        n = len(X)
+        nodes = np.broadcast_to(self.roots, (n, self.n_trees)).copy()
+        row_offsets = (np.arange(n, dtype=np.intp) * X.shape[1])[:, None]
+        flat = X.ravel()
+        has_categorical = bool(len(self.cat_table))
+        for _ in range(self.max_depth):
+            x = flat[row_offsets + self.feature[nodes]]
+            missing = np.isnan(x)
+            go_right = ~(x < self.threshold[nodes])
+            if has_categorical:
+                cat_row = self.cat_row[nodes]
+                categorical = cat_row >= 0
+                if categorical.any():
+                    go_right[categorical] = self._in_categories(cat_row[categorical], x[categorical])
+            go_right = np.where(missing, ~self.default_left[nodes], go_right)
+            nodes = self.children[2 * nodes + go_right]
+        # Sequential float32 sum, base margin first, as XGBoost's CPU predictor accumulates
+        leaves = np.concatenate([np.full((n, 1), self.base_margin, dtype=np.float32), self.value[nodes]], axis=1)
+        return np.cumsum(leaves, axis=1, dtype=np.float32)[:, -1]
+
+    def _in_categories(self, cat_row, codes):
+        """Whether each category code is in its node's right-hand set (negative/unseen codes go left)"""
+        valid = (codes >= 0) & (codes < self.cat_table.shape[1])
+        index = np.where(valid, codes, 0).astype(np.intp)
+        return valid & self.cat_table[cat_row, index]
+
+    def predict_proba(self, X):
+        """Churn probabilities (float32, like Booster.inplace_predict)"""
+        margin = self.margin(X)
+        return (np.float32(1.0) / (np.float32(1.0) + np.exp(-margin))).astype(np.float32)
+
+    def save(self, path):
+        """Write every array plus scalars to one uncompressed .npz"""
+        np.savez(path, feature=self.feature, threshold=self.threshold, children=self.children,
+                 default_left=self.default_left, value=self.value, roots=self.roots,
+                 cat_row=self.cat_row, cat_table=self.cat_table,
+                 base_margin=self.base_margin, max_depth=self.max_depth, num_feature=self.num_feature)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            arrays = {name: data[name] for name in data.files}
+        return cls(base_margin=arrays.pop('base_margin').item(), max_depth=arrays.pop('max_depth').item(),
+                   num_feature=arrays.pop('num_feature').item(), **arrays)
+
+    def summary(self):
+        return {'trees': self.n_trees, 'nodes': self.n_nodes, 'max_depth': self.max_depth,
+                'categorical_nodes': int((self.cat_row >= 0).sum()), 'bytes': sum(
+                    a.nbytes for a in (self.feature, self.threshold, self.children, self.default_left,
+                                       self.value, self.roots, self.cat_row, self.cat_table))}
+
+
+def _compile_tree(tree):
+    """Local node arrays for one JSON tree; children are local ids (offset by the caller)"""
+    left = np.asarray(tree['left_children'], dtype=np.int32)
+    right = np.asarray(tree['right_children'], dtype=np.int32)
+    n_nodes = len(left)
+    nodes = np.arange(n_nodes, dtype=np.int32)
+    is_leaf = left == -1
+    conditions = np.asarray(tree['split_conditions'], dtype=np.float32)
+
+    children = np.empty(2 * n_nodes, dtype=np.int32)
+    children[0::2] = np.where(is_leaf, nodes, left)
+    children[1::2] = np.where(is_leaf, nodes, right)
+
+    # Categorical splits: the listed categories go right
+    cat_row = np.full(n_nodes, -1, dtype=np.int32)
+    cat_nodes = tree.get('categories_nodes', [])
+    categories = tree.get('categories', [])
+    segments, sizes = tree.get('categories_segments', []), tree.get('categories_sizes', [])
+    node_categories = [categories[int(s):int(s) + int(k)] for s, k in zip(segments, sizes)]
+    width = max([int(c) + 1 for cats in node_categories for c in cats] + [0])
+    cat_table = np.zeros((len(cat_nodes), width), dtype=bool)
+    for row, (node, cats) in enumerate(zip(cat_nodes, node_categories)):
+        cat_row[node] = row
+        cat_table[row, np.asarray(cats, dtype=np.intp)] = True
+
+    depth = np.zeros(n_nodes, dtype=np.int32)
+    stack = [0]
+    while stack:
+        node = stack.pop()
+        if not is_leaf[node]:
+            for child in (left[node], right[node]):
+                depth[child] = depth[node] + 1
+                stack.append(child)
+
+    return {
+        'feature': np.where(is_leaf, 0, np.asarray(tree['split_indices'], dtype=np.int32)),
+        'threshold': np.where(is_leaf, 0, conditions).astype(np.float32),
+        'children': children,
+        'default_left': np.asarray(tree['default_left'], dtype=bool),
+        # At leaves split_conditions holds the leaf value
+        'value': np.where(is_leaf, conditions, 0).astype(np.float32),
+        'cat_row': cat_row,
+        'cat_table': cat_table,
+        'depth': int(depth.max()) if n_nodes else 0,
+    }
+
+
+class TreeModel:
+    """Serving model backed by a compiled TreeEnsemble; xgboost is only imported for explanations"""
+
+    def __init__(self, ensemble, booster_path=None, nthread=None):
+        self.ensemble = ensemble
+        self.booster_path = booster_path
+        self.nthread = nthread
+        self._booster_model = None
+
+    def predict_proba(self, X):
+        """Predict probabilities by walking the compiled trees"""
+        return self.ensemble.predict_proba(X)
+
+    def predict(self, X, threshold=0.5):
+        """Predict classes"""
+        return (self.predict_proba(X) >= threshold).astype(int)
+
+    def predict_contribs(self, X, feature_types=None):
+        """TreeSHAP contributions from the original booster, loaded on first use"""
+        if self._booster_model is None:
+            if self.booster_path is None or not os.path.exists(self.booster_path):
+                raise FileNotFoundError("Explanations need the booster file next to the compiled trees")
+            from src.models import BoosterModel
+            self._booster_model = BoosterModel.load(self.booster_path, nthread=self.nthread)
+        return self._booster_model.predict_contribs(X, feature_types)
+
+    @classmethod
+    def load(cls, filepath, booster_path=None, nthread=None):
+        """Load trees saved with TreeEnsemble.save"""
+        return cls(TreeEnsemble.load(filepath), booster_path=booster_path, nthread=nthread)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile an XGBoost booster into NumPy node arrays')
+    parser.add_argument('--model', default='artifacts/model.ubj', help='Booster file (.ubj or .json)')
+    parser.add_argument('--out', default=os.path.join('artifacts', TREES_FILE))
+    parser.add_argument('--check-rows', type=int, default=0,
+                        help='Compare against xgboost on this many random rows (0 skips)')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    ensemble = TreeEnsemble.from_file(args.model)
+    ensemble.save(args.out)
+    print(f"Compiled {args.model} -> {args.out} in {time.perf_counter() - start:.2f}s: {ensemble.summary()}")
+
+    if args.check_rows:
+        from src.models import BoosterModel
+        booster = BoosterModel.load(args.model)
+        rng = np.random.default_rng(0)
+        X = rng.normal(size=(args.check_rows, ensemble.num_feature)).astype(np.float32)
+        X[rng.random(X.shape) < 0.05] = np.nan
+        expected = booster.predict_proba(X)
+        diff = np.abs(ensemble.predict_proba(X) - expected)
+        print(f"max |compiled - xgboost| = {diff.max():.3g}, identical rows = {(diff == 0).mean():.2%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import json
+import os
+import random
+import statistics
+import sys
+from datetime import datetime, timedelta
+
+root_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if root_path not in sys.path:
+    sys.path.insert(0, root_path)
+
+from src.agent_monitor import MetricsEvaluator, RollingMedian, analyze_metrics, load_metrics
+
+
+def test_rolling_median_matches_recomputed_window():
+    rng = random.Random(0)
+    window = timedelta(hours=10)
+    rolling = RollingMedian(window)
+    start = datetime(2025, 1, 1)
+    history = []
+    t = start
+    for _ in range(2000):
+        t += timedelta(minutes=rng.choice([5, 30, 60, 180]))
+        value = rng.choice([0.90, 0.91, 0.92]) if rng.random() < 0.5 else rng.random()
+        history.append((t, value))
+        rolling.add(t, value)
+        expected = statistics.median(v for ts, v in history if ts >= t - window)
+        assert rolling.median() == expected
+
+
+def test_evaluator_flags_auc_drop_and_consecutive_latency():
+    t = datetime(2025, 1, 1)
+    evaluator = MetricsEvaluator()
+    for i in range(10):
+        assert evaluator.update({'timestamp': t + timedelta(hours=i), 'roc_auc': 0.9, 'latency_p95_ms': 200}) == []
+    findings = evaluator.update({'timestamp': t + timedelta(hours=10), 'roc_auc': 0.85, 'latency_p95_ms': 450})
+    assert findings == [{'roc_auc_drop_pct': 5.6}]
+    findings = evaluator.update({'timestamp': t + timedelta(hours=11), 'roc_auc': None, 'latency_p95_ms': 410})
+    assert findings == [{'latency_p95_ms': 410.0}]
+
+
+def test_load_metrics_uses_ts_field(tmp_path):
+    path = tmp_path / 'history.jsonl'
+    rows = [{'ts': '2025-08-01T00:00:00', 'roc_auc': 0.9, 'latency_p95_ms': 200},
+            {'ts': '2025-08-20T00:00:00', 'roc_auc': 0.8, 'latency_p95_ms': 200}]
+    path.write_text(''.join(json.dumps(r) + '\n' for r in rows))
+    records = list(load_metrics(str(path)))
+    assert records[1]['timestamp'] == datetime(2025, 8, 20)
+    # The first point is outside the 7-day window of the second, so there is no drop
+    assert analyze_metrics(records) == []
@@ -0,0 +1,37 @@
+import asyncio
+import os
+import sys
+
+import numpy as np
+
+root_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if root_path not in sys.path:
+    sys.path.insert(0, root_path)
+
+from src.batching import MicroBatcher
+
+
+def test_concurrent_requests_share_a_batch():
+    """Each caller gets back its own slice of a single coalesced batch"""
+    calls = []
+
+    def score(X):
+        calls.append(len(X))
+        return X[:, 0] * 2
+
+    async def run():
+        batcher = MicroBatcher(score, max_wait_ms=50, max_batch_rows=1024)
+        inputs = [np.full((n, 3), float(n)) for n in (1, 2, 3)]
+        results = await asyncio.gather(*(batcher.submit(X) for X in inputs))
+        stats = batcher.stats()
+        batcher.close()
+        return inputs, results, stats
+
+    inputs, results, stats = asyncio.run(run())
+
+    assert calls == [6]
+    for X, probs in zip(inputs, results):
+        np.testing.assert_array_equal(probs, X[:, 0] * 2)
+    assert stats["batches"] == 1
+    assert stats["rows_scored"] == 6
+    assert stats["queue_depth_rows"] == 0
@@ -0,0 +1,63 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+root_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if root_path not in sys.path:
+    sys.path.insert(0, root_path)
+
+from src import drift_monitor
+from src.drift_monitor import OnlineDriftMonitor
+from src.drift_sketch import ReferenceProfile
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+def _monitor(monkeypatch, clock):
+    monkeypatch.setattr(drift_monitor, "time", clock)
+    profile = ReferenceProfile.from_frame(pd.DataFrame({"plan_type": ["Basic", "Pro"] * 50,
+                                                        "tenure_months": range(100)}))
+    return OnlineDriftMonitor(profile, bucket_seconds=60, window_seconds=600)
+
+
+def _batch(n):
+    return {"plan_type": ["Pro"] * n, "tenure_months": list(range(n))}
+
+
+def test_windowed_report_merges_buckets_across_boundaries(monkeypatch):
+    clock = FakeClock(1000)
+    monitor = _monitor(monkeypatch, clock)
+    monitor.observe(_batch(2))   # bucket 960
+    clock.now = 1010
+    monitor.observe(_batch(3))   # bucket 960
+    clock.now = 1100
+    monitor.observe(_batch(4))   # bucket 1080
+    clock.now = 1150
+
+    assert monitor.sketch(60).features["plan_type"]["n"] == 4
+    assert monitor.sketch().features["plan_type"]["n"] == 9
+    assert [start for start, _ in monitor._buckets] == [960, 1080]
+    assert "plan_type" in monitor.report(window_seconds=600)["features"]
+
+
+def test_out_of_order_batches_land_in_their_own_bucket(monkeypatch):
+    clock = FakeClock(1150)
+    monitor = _monitor(monkeypatch, clock)
+    monitor._pending.extend([(1100, _batch(4)), (1000, _batch(2))])
+    monitor.drain()
+    assert [start for start, _ in monitor._buckets] == [960, 1080]
+    assert monitor.sketch(60).features["plan_type"]["n"] == 4
+
+
+def test_window_longer_than_retained_is_rejected(monkeypatch):
+    monitor = _monitor(monkeypatch, FakeClock(1000))
+    with pytest.raises(ValueError):
+        monitor.report(window_seconds=601)
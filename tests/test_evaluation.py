@@ -0,0 +1,51 @@
+import os
+import sys
+
+import numpy as np
+from sklearn.metrics import accuracy_score, average_precision_score, f1_score, roc_auc_score
+
+root_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if root_path not in sys.path:
+    sys.path.insert(0, root_path)
+
+from src.evaluation import SortedScores, evaluate
+
+
+def _data(n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    y = rng.integers(0, 2, n)
+    # Rounded scores so many rows tie
+    scores = np.round(np.clip(0.3 * y + rng.normal(0.35, 0.2, n), 0, 1), 2)
+    return y, scores
+
+
+def test_metrics_match_sklearn_with_ties():
+    y, scores = _data()
+    metrics = evaluate(y, scores, threshold=0.5)
+    assert np.isclose(metrics['roc_auc'], roc_auc_score(y, scores))
+    assert np.isclose(metrics['pr_auc'], average_precision_score(y, scores))
+    predicted = (scores >= 0.5).astype(int)
+    assert np.isclose(metrics['accuracy'], accuracy_score(y, predicted))
+    assert np.isclose(metrics['f1'], f1_score(y, predicted))
+
+
+def test_select_threshold_maximizes_objective():
+    y, scores = _data()
+    sorted_scores = SortedScores(y, scores)
+    best = sorted_scores.select_threshold('f1')
+    brute = max(f1_score(y, (scores >= t).astype(int)) for t in np.unique(scores))
+    assert np.isclose(best['f1'], brute)
+    youden = sorted_scores.select_threshold('youden')
+    assert 0 <= youden['threshold'] <= 1
+
+
+def test_bootstrap_intervals_cover_point_estimate():
+    y, scores = _data()
+    sorted_scores = SortedScores(y, scores)
+    point = sorted_scores.evaluate(0.5)
+    for method in ('poisson', 'multinomial'):
+        ci = sorted_scores.bootstrap(0.5, n_boot=200, method=method, max_block_elements=1000)
+        for name in ('roc_auc', 'pr_auc', 'accuracy', 'f1'):
+            lo, hi = ci[name]
+            assert lo <= point[name] <= hi
+            assert hi - lo < 0.1
@@ -0,0 +1,48 @@
+import os
+import sys
+
+import numpy as np
+import xgboost as xgb
+
+root_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if root_path not in sys.path:
+    sys.path.insert(0, root_path)
+
+from src.compiled_features import CompiledPreprocessor
+from src.explain import fold_contributions, fold_starts, probabilities, top_k_indices
+from src.models import BoosterModel
+
+
+def _compiled():
+    return CompiledPreprocessor(["tenure_months", "discount_pct"], ["plan_type", "autopay"],
+                                np.zeros(2), np.zeros(2), np.ones(2),
+                                [["Basic", "Pro", "Standard"], ["No", "Yes"]])
+
+
+def test_fold_sums_one_hot_blocks_and_keeps_bias():
+    compiled = _compiled()
+    contribs = np.arange(2 * 8, dtype=np.float32).reshape(2, 8)  # 7 encoded columns + bias
+    folded = fold_contributions(contribs, fold_starts(compiled))
+    assert folded.shape == (2, 5)
+    np.testing.assert_array_equal(folded[0], [0, 1, 2 + 3 + 4, 5 + 6, 7])
+
+
+def test_top_k_orders_by_magnitude():
+    folded = np.array([[0.1, -0.9, 0.5, 0.0, 1.0]])  # last column is the bias
+    assert top_k_indices(folded, 2).tolist() == [[1, 2]]
+    assert top_k_indices(folded, 10).tolist() == [[1, 2, 0, 3]]
+
+
+def test_booster_contributions_add_up_to_prediction():
+    compiled = _compiled()
+    rng = np.random.default_rng(0)
+    columns = {"tenure_months": rng.integers(0, 60, 500), "discount_pct": rng.random(500) * 30,
+               "plan_type": rng.choice(["Basic", "Pro", "Standard"], 500).tolist(),
+               "autopay": rng.choice(["No", "Yes"], 500).tolist()}
+    X = compiled.transform_columns(columns)
+    y = (X[:, 0] < 0.2 * X[:, 1]).astype(int)
+    booster = xgb.train({"objective": "binary:logistic", "max_depth": 3}, xgb.DMatrix(X, label=y), 20)
+    model = BoosterModel(booster)
+
+    folded = fold_contributions(model.predict_contribs(X), fold_starts(compiled))
+    np.testing.assert_allclose(probabilities(folded), model.predict_proba(X), atol=1e-5)
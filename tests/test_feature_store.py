@@ -0,0 +1,32 @@
+import os
+import sys
+
+import numpy as np
+
+root_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if root_path not in sys.path:
+    sys.path.insert(0, root_path)
+
+from src.feature_store import load_or_build
+
+DATA_PATH = os.path.join(root_path, "data", "churn_ref_sample.csv")
+
+
+def test_second_load_hits_cache_with_identical_features(tmp_path):
+    """A rerun memory-maps the stored split and matrices instead of recomputing"""
+    first = load_or_build(DATA_PATH, cache_dir=str(tmp_path))
+    second = load_or_build(DATA_PATH, cache_dir=str(tmp_path))
+
+    assert not first.hit and second.hit
+    assert first.key == second.key
+    assert isinstance(second.X_train, np.memmap)
+    assert second.X_train.dtype == np.float32
+    for name in ("train_idx", "val_idx", "X_train", "X_val", "y_train", "y_val"):
+        np.testing.assert_array_equal(getattr(first, name), getattr(second, name))
+
+
+def test_cache_key_changes_with_split_settings(tmp_path):
+    default = load_or_build(DATA_PATH, cache_dir=str(tmp_path))
+    other = load_or_build(DATA_PATH, cache_dir=str(tmp_path), random_state=7)
+    assert default.key != other.key
+    assert not other.hit
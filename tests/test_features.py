@@ -0,0 +1,91 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+root_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if root_path not in sys.path:
+    sys.path.insert(0, root_path)
+
+from src.features import FeaturePreprocessor
+from src.compiled_features import CompiledPreprocessor
+from src import schema
+
+
+def _fitted_preprocessor():
+    data = pd.read_csv(os.path.join(root_path, "data", "churn_ref_sample.csv"))
+    X = data.drop("churned", axis=1)
+    preprocessor = FeaturePreprocessor()
+    preprocessor.fit(X)
+    return preprocessor, X
+
+
+def test_compiled_matches_sklearn_transform():
+    """Compiled lookup tables reproduce the ColumnTransformer output"""
+    preprocessor, X = _fitted_preprocessor()
+    compiled = CompiledPreprocessor.from_preprocessor(preprocessor)
+
+    expected = preprocessor.transform(X)
+    rows = X.to_dict(orient="records")
+    actual = compiled.transform_rows(rows)
+
+    assert actual.dtype == np.float32
+    assert actual.shape == expected.shape
+    np.testing.assert_allclose(actual, expected, rtol=1e-6, atol=1e-6)
+
+
+def test_compiled_handles_missing_and_unknown():
+    """Missing numerics take the median, unknown categories encode to zeros"""
+    preprocessor, X = _fitted_preprocessor()
+    compiled = CompiledPreprocessor.from_preprocessor(preprocessor)
+
+    row = X.iloc[[0]].copy()
+    row["tenure_months"] = np.nan
+    row["plan_type"] = "Enterprise"
+
+    expected = preprocessor.transform(row)
+    actual = compiled.transform_rows(row.to_dict(orient="records"))
+    np.testing.assert_allclose(actual, expected, rtol=1e-6, atol=1e-6)
+
+
+def test_schema_reads_compact_dtypes():
+    """Categoricals load as category, counts as int16, measurements as float32"""
+    X = schema.read_csv(os.path.join(root_path, "data", "churn_ref_sample.csv"))
+    assert str(X["plan_type"].dtype) == "category"
+    assert X["tenure_months"].dtype == np.int16
+    assert X["monthly_usage_gb"].dtype == np.float32
+
+
+def test_compiled_matches_native_categorical_encoding():
+    """Ordinal codes match OrdinalEncoder; unknown categories become NaN"""
+    data = schema.read_csv(os.path.join(root_path, "data", "churn_ref_sample.csv"))
+    X = data.drop("churned", axis=1)
+    preprocessor = FeaturePreprocessor(encoding="native").fit(X)
+    compiled = CompiledPreprocessor.from_preprocessor(preprocessor)
+    assert compiled.n_features_out == len(compiled.feature_names)
+
+    rows = X.to_dict(orient="records")
+    rows[0]["plan_type"] = "Enterprise"
+    expected = preprocessor.transform(pd.DataFrame(rows, columns=X.columns))
+    actual = compiled.transform_rows(rows)
+    assert np.isnan(actual[0, compiled.offsets[0]])
+    np.testing.assert_allclose(actual, expected, rtol=1e-6, atol=1e-6)
+
+
+def test_serving_path_predicts_like_training_path():
+    """A model trained on schema.read_csv matrices scores request rows identically"""
+    from src.models import ChurnModel
+
+    data = schema.read_csv(os.path.join(root_path, "data", "customer_churn_synth.csv"), nrows=5000)
+    X, y = data.drop("churned", axis=1), data["churned"]
+    preprocessor = FeaturePreprocessor()
+    X_train = preprocessor.fit_transform(X)
+    model = ChurnModel(n_estimators=50).fit(X_train, y)
+    compiled = CompiledPreprocessor.from_preprocessor(preprocessor)
+
+    # JSON-style request rows: Python floats/ints, as /predict receives them
+    served = compiled.transform_rows(pd.read_csv(os.path.join(root_path, "data", "customer_churn_synth.csv"),
+                                                 nrows=5000).drop("churned", axis=1).to_dict(orient="records"))
+    np.testing.assert_array_equal(served, np.asarray(X_train, dtype=np.float32))
+    np.testing.assert_array_equal(model.predict_proba(served), model.predict_proba(X_train))
@@ -0,0 +1,56 @@
+import os
+import sys
+
+root_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if root_path not in sys.path:
+    sys.path.insert(0, root_path)
+
+from src import registry
+from src.model_bundle import BundleWatcher
+
+
+class FakeBundle:
+    def __init__(self, version):
+        self.version = version
+
+    def warm_up(self):
+        return self
+
+
+def _publish(tmp_path, outdir, content):
+    path = tmp_path / "model.ubj"
+    path.write_bytes(content)
+    return registry.publish_version(outdir, [str(path)], {}, "abc")
+
+
+def test_watcher_swaps_once_per_active_change(tmp_path):
+    outdir = str(tmp_path / "artifacts")
+    first = _publish(tmp_path, outdir, b"first")
+    swaps = []
+    watcher = BundleWatcher(outdir, first, lambda: FakeBundle(registry.active_version(outdir)), swaps.append)
+
+    assert not watcher.check()
+    assert swaps == []
+
+    second = _publish(tmp_path, outdir, b"second")
+    assert watcher.check()
+    assert not watcher.check()
+    assert [bundle.version for bundle in swaps] == [second]
+
+
+def test_failed_load_keeps_current_bundle(tmp_path):
+    outdir = str(tmp_path / "artifacts")
+    first = _publish(tmp_path, outdir, b"first")
+    swaps = []
+
+    def broken_load():
+        raise ValueError("Checksum mismatch")
+
+    watcher = BundleWatcher(outdir, first, broken_load, swaps.append)
+    second = _publish(tmp_path, outdir, b"second")
+    assert not watcher.check()
+    assert swaps == []
+    assert watcher.version == first
+    # A broken version is not retried on every poll
+    watcher.load_fn = lambda: FakeBundle(second)
+    assert not watcher.check()
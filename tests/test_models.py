@@ -0,0 +1,41 @@
+import os
+import sys
+
+import numpy as np
+
+root_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if root_path not in sys.path:
+    sys.path.insert(0, root_path)
+
+from src.models import BoosterModel, ChurnModel
+
+
+def _data(n=1500, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 6)).astype(np.float32)
+    y = (X[:, 0] + rng.normal(scale=1.5, size=n) > 0).astype(int)
+    X[rng.random(X.shape) < 0.05] = np.nan
+    return X[:1000], y[:1000], X[1000:], y[1000:]
+
+
+def test_native_booster_matches_classifier(tmp_path):
+    X_train, y_train, X_val, y_val = _data()
+    model = ChurnModel(n_estimators=50).fit(X_train, y_train)
+    path = str(tmp_path / "model.ubj")
+    model.export_booster(path)
+    np.testing.assert_allclose(BoosterModel.load(path).predict_proba(X_val), model.predict_proba(X_val),
+                               rtol=1e-6)
+
+
+def test_native_booster_honours_best_iteration(tmp_path):
+    X_train, y_train, X_val, y_val = _data()
+    # Noisy labels and a high learning rate so early stopping kicks in well before 300 rounds
+    model = ChurnModel(n_estimators=300, learning_rate=0.5, early_stopping_rounds=5)
+    model.model.fit(X_train, y_train, eval_set=[(X_val, y_val)], verbose=False)
+    best_iteration = int(model.model.get_booster().attr("best_iteration"))
+    assert best_iteration < 299
+    path = str(tmp_path / "model.ubj")
+    model.export_booster(path)
+    native = BoosterModel.load(path)
+    assert native.iteration_range == (0, best_iteration + 1)
+    np.testing.assert_allclose(native.predict_proba(X_val), model.predict_proba(X_val), rtol=1e-6)
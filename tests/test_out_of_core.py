@@ -0,0 +1,53 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+root_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if root_path not in sys.path:
+    sys.path.insert(0, root_path)
+
+from src.features import FeaturePreprocessor
+from src.compiled_features import CompiledPreprocessor
+from src.out_of_core import StreamingFeatureStats, QuantileSketch
+
+
+def _reference_data():
+    data = pd.read_csv(os.path.join(root_path, "data", "churn_ref_sample.csv"))
+    X = data.drop("churned", axis=1)
+    # Some missing values so the imputation correction is exercised
+    X.loc[X.index[::7], "tenure_months"] = np.nan
+    X.loc[X.index[::11], "plan_type"] = np.nan
+    return X
+
+
+def test_streaming_stats_match_fitted_preprocessor():
+    """Chunked statistics reproduce FeaturePreprocessor.fit on the whole frame"""
+    X = _reference_data()
+    preprocessor = FeaturePreprocessor().fit(X)
+    expected = CompiledPreprocessor.from_preprocessor(preprocessor)
+
+    stats = StreamingFeatureStats(preprocessor.numeric_features, preprocessor.categorical_features)
+    for start in range(0, len(X), 37):
+        stats.update(X.iloc[start:start + 37])
+    actual = stats.finalize()
+
+    np.testing.assert_allclose(actual.medians, expected.medians)
+    np.testing.assert_allclose(actual.means, expected.means, rtol=1e-9)
+    np.testing.assert_allclose(actual.scales, expected.scales, rtol=1e-9)
+    assert actual.categories == expected.categories
+    np.testing.assert_allclose(actual.transform_rows(X.to_dict(orient="records")),
+                               preprocessor.transform(X), rtol=1e-6, atol=1e-6)
+
+
+def test_quantile_sketch_compresses_with_bounded_error():
+    rng = np.random.default_rng(0)
+    values = rng.normal(size=50_000)
+    sketch = QuantileSketch(max_centroids=512)
+    for chunk in np.array_split(values, 10):
+        sketch.update(chunk)
+
+    assert not sketch.exact
+    assert len(sketch.values) <= 512
+    assert abs(np.mean(values <= sketch.quantile(0.5)) - 0.5) < 0.01
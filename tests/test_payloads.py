@@ -0,0 +1,93 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+root_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if root_path not in sys.path:
+    sys.path.insert(0, root_path)
+
+from src import payloads
+from src.compiled_features import CompiledPreprocessor
+
+ROW = {
+    "plan_type": "Standard", "contract_type": "Monthly", "autopay": "Yes", "is_promo_user": "No",
+    "add_on_count": 2, "tenure_months": 12, "monthly_usage_gb": 45.6, "avg_latency_ms": 120.5,
+    "support_tickets_30d": 1, "discount_pct": 10.0, "payment_failures_90d": 0, "downtime_hours_30d": 2.5,
+}
+
+
+def _compiled():
+    numeric = [name for name, kind in payloads.FIELD_TYPES.items() if kind is not str]
+    categorical = [name for name, kind in payloads.FIELD_TYPES.items() if kind is str]
+    categories = {"plan_type": ["Basic", "Pro", "Standard"], "contract_type": ["Annual", "Monthly"],
+                  "autopay": ["No", "Yes"], "is_promo_user": ["No", "Yes"]}
+    return CompiledPreprocessor(numeric, categorical, np.zeros(len(numeric)), np.zeros(len(numeric)),
+                                np.ones(len(numeric)), [categories[c] for c in categorical])
+
+
+def test_columnar_and_row_payloads_encode_identically():
+    compiled = _compiled()
+    rows = [ROW, dict(ROW, plan_type="Pro", tenure_months=3)]
+    columnar = {name: [row[name] for row in rows] for name in ROW}
+
+    from_rows = compiled.columns_from_rows(payloads.parse_rows({"data": rows}))
+    from_columns = payloads.parse_columnar(payloads.decode_json(payloads.orjson.dumps(columnar)))
+    np.testing.assert_array_equal(compiled.transform_columns(from_rows),
+                                  compiled.transform_columns(from_columns))
+
+
+def test_columnar_validation_reports_every_problem():
+    columnar = {name: [value] for name, value in ROW.items()}
+    del columnar["discount_pct"]
+    columnar["tenure_months"] = [1.5]
+    columnar["plan_type"] = [3]
+
+    with pytest.raises(payloads.PayloadError) as excinfo:
+        payloads.parse_columnar(columnar)
+    types = {error["loc"][0]: error["type"] for error in excinfo.value.errors}
+    assert types == {"discount_pct": "missing", "tenure_months": "int_type", "plan_type": "string_type"}
+
+
+def test_unknown_categories_are_rejected():
+    columns = payloads.parse_columnar({name: [value] for name, value in dict(ROW, plan_type="Enterprise").items()})
+    with pytest.raises(payloads.PayloadError, match="Enterprise"):
+        payloads.check_categories(columns, _compiled())
+
+
+def test_columnar_response_shape():
+    body = payloads.orjson.loads(payloads.encode_predictions(np.array([0.2, 0.7]), 0.5, columnar=True))
+    assert body == {"churn_probability": [0.2, 0.7], "churned": [False, True]}
+
+
+def test_arrow_payload_matches_json_and_round_trips():
+    pa = pytest.importorskip("pyarrow")
+    compiled = _compiled()
+    rows = [ROW, dict(ROW, plan_type="Pro", tenure_months=3)]
+    columnar = {name: [row[name] for row in rows] for name in ROW}
+
+    sink = pa.BufferOutputStream()
+    table = pa.table(columnar)
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    columns = payloads.parse_arrow(sink.getvalue().to_pybytes())
+    payloads.check_categories(columns, compiled)
+    np.testing.assert_array_equal(compiled.transform_columns(columns),
+                                  compiled.transform_columns(payloads.parse_columnar(columnar)))
+
+    body, media_type = payloads.encode_response(np.array([0.2, 0.7]), 0.5, payloads.ARROW_STREAM)
+    result = pa.ipc.open_stream(body).read_all().to_pydict()
+    assert media_type == payloads.ARROW_STREAM
+    assert result == {"churn_probability": [0.2, 0.7], "churned": [False, True]}
+
+
+def test_npy_payload_rejects_invalid_category_encoding():
+    import io
+    compiled = _compiled()
+    X = compiled.transform_columns(payloads.parse_columnar({name: [value] for name, value in ROW.items()}))
+    X[0, compiled.offsets[0]:compiled.offsets[1]] = 0.0  # no plan_type set
+    buffer = io.BytesIO()
+    np.save(buffer, X)
+    with pytest.raises(payloads.PayloadError, match="plan_type"):
+        payloads.parse_npy(buffer.getvalue(), compiled)
@@ -0,0 +1,63 @@
+import os
+import sys
+import time
+
+root_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if root_path not in sys.path:
+    sys.path.insert(0, root_path)
+
+from src.prediction_cache import PredictionCache
+
+NUMERIC = ["tenure_months", "discount_pct"]
+CATEGORICAL = ["plan_type"]
+
+
+def _keys(columns, version="v1"):
+    return PredictionCache.keys_for(columns, NUMERIC, CATEGORICAL, version)
+
+
+def test_keys_canonicalize_numbers_and_missing_values():
+    ints = _keys({"tenure_months": [12], "discount_pct": [None], "plan_type": ["Pro"]})
+    floats = _keys({"tenure_months": [12.0], "discount_pct": [float("nan")], "plan_type": ["Pro"]})
+    assert ints == floats
+    assert ints != _keys({"tenure_months": [13], "discount_pct": [None], "plan_type": ["Pro"]})
+
+
+def test_keys_differ_across_model_versions():
+    columns = {"tenure_months": [12], "discount_pct": [5.0], "plan_type": ["Pro"]}
+    assert _keys(columns, "v1") != _keys(columns, "v2")
+
+
+def test_hits_and_misses():
+    cache = PredictionCache(max_entries=10, ttl_seconds=60)
+    keys = _keys({"tenure_months": [1, 2], "discount_pct": [0, 0], "plan_type": ["Basic", "Pro"]})
+    assert cache.get_many(keys) == [None, None]
+    cache.put_many(keys[:1], [0.25])
+    assert cache.get_many(keys) == [0.25, None]
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 3)
+
+
+def test_entries_expire_after_ttl():
+    cache = PredictionCache(max_entries=10, ttl_seconds=0.01)
+    cache.put_many([b"a"], [0.5])
+    time.sleep(0.02)
+    assert cache.get_many([b"a"]) == [None]
+    assert cache.stats()["expirations"] == 1
+
+
+def test_evicts_least_recently_used_at_max_entries():
+    cache = PredictionCache(max_entries=2, ttl_seconds=60)
+    cache.put_many([b"a", b"b"], [0.1, 0.2])
+    cache.get_many([b"a"])  # b is now least recently used
+    cache.put_many([b"c"], [0.3])
+    assert cache.get_many([b"a", b"b", b"c"]) == [0.1, None, 0.3]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_invalidate_drops_every_entry():
+    cache = PredictionCache(max_entries=10, ttl_seconds=60)
+    cache.put_many([b"a", b"b"], [0.1, 0.2])
+    cache.invalidate()
+    assert cache.get_many([b"a", b"b"]) == [None, None]
+    assert cache.stats()["invalidations"] == 1
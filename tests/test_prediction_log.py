@@ -0,0 +1,59 @@
+import os
+import sys
+
+import numpy as np
+
+root_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if root_path not in sys.path:
+    sys.path.insert(0, root_path)
+
+from src import schema
+from src.prediction_log import PredictionLog
+
+ROW = {
+    "plan_type": "Standard", "contract_type": "Monthly", "autopay": "Yes", "is_promo_user": "No",
+    "add_on_count": 2, "tenure_months": 12, "monthly_usage_gb": 45.6, "avg_latency_ms": 120.5,
+    "support_tickets_30d": 1, "discount_pct": 10.0, "payment_failures_90d": 0, "downtime_hours_30d": 2.5,
+}
+
+
+def _columns(n, tenure_start=0):
+    columns = {name: [value] * n for name, value in ROW.items()}
+    columns["tenure_months"] = list(range(tenure_start, tenure_start + n))
+    return columns
+
+
+def test_log_round_trips_through_wrapped_ring(tmp_path):
+    log = PredictionLog(str(tmp_path), capacity=8, flush_interval=3600)
+    assert log.append(_columns(5), np.full(5, 0.25), "v1")
+    assert log.flush() == 5
+    # Starts at slot 5 and wraps around the end of the ring
+    assert log.append(_columns(6, tenure_start=5), np.full(6, 0.75), "v2")
+    assert log.flush() == 6
+    assert schema.dataset_files(str(tmp_path)) == []  # still being written
+    log.close()
+
+    frame = schema.read_table(str(tmp_path))
+    assert frame["tenure_months"].tolist() == list(range(11))
+    assert frame["model_version"].tolist() == ["v1"] * 5 + ["v2"] * 6
+    np.testing.assert_allclose(frame["churn_probability"], [0.25] * 5 + [0.75] * 6)
+    assert str(frame["plan_type"].dtype) == "category"
+    assert log.stats()["rows_written"] == 11 and log.stats()["files_written"] == 1
+
+
+def test_full_ring_drops_and_counts(tmp_path):
+    log = PredictionLog(str(tmp_path), capacity=4, flush_interval=3600)
+    assert log.append(_columns(3), np.zeros(3), "v1")
+    assert not log.append(_columns(2), np.zeros(2), "v1")
+    stats = log.stats()
+    assert stats["rows_dropped"] == 2 and stats["rows_buffered"] == 3
+
+
+def test_bad_rows_are_counted_not_raised(tmp_path):
+    log = PredictionLog(str(tmp_path), capacity=8, flush_interval=3600)
+    columns = _columns(2)
+    columns["tenure_months"] = ["twelve", "thirteen"]
+    assert not log.append(columns, np.zeros(2), "v1")
+    assert log.append(_columns(2), np.zeros(2), "v1")
+    stats = log.stats()
+    assert stats["append_errors"] == 1 and stats["rows_dropped"] == 2 and stats["rows_buffered"] == 2
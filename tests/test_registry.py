@@ -0,0 +1,47 @@
+import os
+import sys
+
+import pytest
+
+root_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if root_path not in sys.path:
+    sys.path.insert(0, root_path)
+
+from src import registry
+
+
+def _artifact(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_bytes(content)
+    return str(path)
+
+
+def test_publish_then_activate_moves_active_version(tmp_path):
+    outdir = str(tmp_path / "artifacts")
+    model = _artifact(tmp_path, "model.ubj", b"first")
+    first = registry.publish_version(outdir, [model], {"val_metrics": {"roc_auc": 0.8}}, "abc")
+    assert registry.active_version(outdir) == first
+
+    model = _artifact(tmp_path, "model.ubj", b"second")
+    second = registry.publish_version(outdir, [model], {}, "abc", activate=False)
+    assert second != first
+    assert registry.active_version(outdir) == first
+    assert registry.list_versions(outdir) == sorted([first, second])
+
+    registry.set_active(outdir, second)
+    assert registry.active_version(outdir) == second
+    assert registry.verify_checksums(outdir, second)["files"]["model.ubj"] == registry.file_sha256(model)
+
+
+def test_activating_unpublished_version_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        registry.set_active(str(tmp_path), "missing")
+
+
+def test_checksum_mismatch_raises(tmp_path):
+    outdir = str(tmp_path / "artifacts")
+    version = registry.publish_version(outdir, [_artifact(tmp_path, "model.ubj", b"weights")], {}, "abc")
+    with open(os.path.join(registry.version_dir(outdir, version), "model.ubj"), "wb") as f:
+        f.write(b"tampered")
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        registry.verify_checksums(outdir, version)
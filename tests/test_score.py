@@ -0,0 +1,71 @@
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+root_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if root_path not in sys.path:
+    sys.path.insert(0, root_path)
+
+from src import registry, score
+from src.features import FeaturePreprocessor
+from src.models import ChurnModel
+
+
+class CountingPool(ProcessPoolExecutor):
+    """ProcessPoolExecutor that tracks how many submitted chunks have not been collected"""
+    max_outstanding = 0
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.outstanding = 0
+
+    def submit(self, fn, *args, **kwargs):
+        future = super().submit(fn, *args, **kwargs)
+        self.outstanding += 1
+        CountingPool.max_outstanding = max(CountingPool.max_outstanding, self.outstanding)
+        result = future.result
+
+        def collect(timeout=None):
+            self.outstanding -= 1
+            return result(timeout)
+
+        future.result = collect
+        return future
+
+
+def test_bulk_scores_keep_input_order_with_bounded_inflight(tmp_path, monkeypatch):
+    data = pd.read_csv(os.path.join(root_path, "data", "customer_churn_synth.csv"), nrows=1000)
+    X, y = data.drop("churned", axis=1), data["churned"]
+    preprocessor = FeaturePreprocessor()
+    model = ChurnModel(n_estimators=20).fit(preprocessor.fit_transform(X), y)
+    # Only a registry version holds the model, so scoring must follow ACTIVE like the service
+    build = tmp_path / "build"
+    build.mkdir()
+    preprocessor.save(str(build / "feature_pipeline.pkl"))
+    model.save(str(build / "model.pkl"))
+    (build / "metrics.json").write_text(json.dumps({"operating_threshold": 0.3}))
+    artifacts = tmp_path / "artifacts"
+    files = [str(build / name) for name in ("feature_pipeline.pkl", "model.pkl", "metrics.json")]
+    registry.publish_version(str(artifacts), files, {}, "test", activate=True)
+
+    in_path = str(tmp_path / "input.csv")
+    X.assign(customer_id=np.arange(len(X))).to_csv(in_path, index=False)
+    out_path = str(tmp_path / "scores.csv")
+    CountingPool.max_outstanding = 0
+    monkeypatch.setattr(score, "ProcessPoolExecutor", CountingPool)
+    summary = score.score_file(in_path, out_path, artifacts_dir=str(artifacts), chunksize=97,
+                               workers=2, id_column="customer_id")
+
+    scored = pd.read_csv(out_path)
+    assert summary["rows"] == len(X)
+    np.testing.assert_array_equal(scored["customer_id"], np.arange(len(X)))
+    # One pass over the whole file, read with the same dtypes as the chunks
+    expected = model.predict_proba(preprocessor.transform(next(score.iter_chunks(in_path, len(X)))))
+    np.testing.assert_allclose(scored["churn_probability"], expected, rtol=1e-6)
+    # Without --threshold the active version's operating threshold decides churned
+    np.testing.assert_array_equal(scored["churned"], scored["churn_probability"] >= 0.3)
+    assert 0 < CountingPool.max_outstanding <= 2 * 2  # 11 chunks, 2 workers
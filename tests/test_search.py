@@ -0,0 +1,27 @@
+import os
+import sys
+
+import numpy as np
+
+root_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if root_path not in sys.path:
+    sys.path.insert(0, root_path)
+
+from src.search import successive_halving
+
+
+def _toy_data(n=600, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 5)).astype(np.float32)
+    y = (X[:, 0] - 0.5 * X[:, 1] + rng.normal(scale=0.5, size=n) > 0).astype(int)
+    return X[:400], y[:400], X[400:], y[400:]
+
+
+def test_search_is_deterministic_under_a_seed():
+    data = _toy_data()
+    kwargs = dict(n_trials=6, min_rounds=5, eta=3, max_rounds=15, early_stopping_rounds=5, workers=2, seed=7)
+    first = successive_halving(*data, **kwargs)
+    second = successive_halving(*data, **kwargs)
+    assert first['best_params'] == second['best_params']
+    assert first['best_iteration'] == second['best_iteration']
+    assert first['trial_runs'] == second['trial_runs']
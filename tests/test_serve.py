@@ -0,0 +1,27 @@
+import os
+import sys
+
+root_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if root_path not in sys.path:
+    sys.path.insert(0, root_path)
+
+from src.serve import plan_workers
+
+
+def test_plan_workers_partitions_cores_without_overlap():
+    workers, threads, core_sets = plan_workers(list(range(32)), workers=8)
+    assert (workers, threads) == (8, 4)
+    assert all(len(cores) == 4 for cores in core_sets)
+    assert set().union(*core_sets) == set(range(32))
+
+
+def test_plan_workers_defaults_to_one_thread_per_cpu():
+    workers, threads, core_sets = plan_workers([2, 3, 5])
+    assert (workers, threads) == (3, 1)
+    assert core_sets == [{2}, {3}, {5}]
+
+
+def test_plan_workers_wraps_when_oversubscribed():
+    workers, threads, core_sets = plan_workers([0, 1], workers=3, threads_per_worker=1)
+    assert workers == 3
+    assert core_sets == [{0}, {1}, {0}]
@@ -0,0 +1,12 @@
+import os
+import subprocess
+import sys
+
+root_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def test_serving_path_does_not_import_training_modules():
+    """Importing the API must not pull in sklearn/pandas/scipy or training code"""
+    result = subprocess.run([sys.executable, "-m", "src.import_audit", "--no-load"],
+                            cwd=root_path, capture_output=True, text=True)
+    assert result.returncode == 0, result.stdout + result.stderr
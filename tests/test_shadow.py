@@ -0,0 +1,67 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+root_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if root_path not in sys.path:
+    sys.path.insert(0, root_path)
+
+from src.compiled_features import CompiledPreprocessor
+from src.shadow import ShadowScorer
+
+
+def _compiled(median=0.0):
+    return CompiledPreprocessor(["tenure_months"], ["autopay"], [median], [0.0], [1.0], [["No", "Yes"]])
+
+
+class FakeBundle:
+    version = "challenger"
+
+    def __init__(self, compiled):
+        self.compiled = compiled
+        self.seen = []
+
+    def score(self, X):
+        self.seen.append(np.array(X))
+        return np.clip(X[:, 0] / 10, 0, 1)
+
+    def retire(self):
+        pass
+
+
+def _wait(shadow, rows):
+    deadline = time.monotonic() + 5
+    while shadow.stats()["rows"] < rows and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_shadow_reuses_matrix_and_records_agreement():
+    compiled = _compiled()
+    challenger = FakeBundle(_compiled())
+    shadow = ShadowScorer(challenger)
+    X = compiled.transform_columns({"tenure_months": [1.0, 4.0, 6.0, 9.0], "autopay": ["No"] * 4})
+    assert shadow.submit(np.array([0.1, 0.6, 0.6, 0.9]), compiled, X=X)
+    _wait(shadow, 4)
+    stats = shadow.stats()
+    assert stats["reuses_champion_matrix"]
+    np.testing.assert_array_equal(challenger.seen[0], X)
+    assert stats["agreement_rate"] == 0.75  # 0.4 vs 0.6 disagrees at 0.5
+    # float32 scores, as real models return
+    np.testing.assert_allclose(stats["mean_abs_delta"], (0.0 + 0.2 + 0.0 + 0.0) / 4, atol=1e-6)
+    assert shadow.history_fields()["shadow_rows"] == 4
+    assert shadow.history_fields()["shadow_rows"] == 0  # interval since the previous call
+    shadow.close()
+
+
+def test_shadow_reencodes_columns_for_a_different_preprocessor():
+    compiled = _compiled()
+    challenger = FakeBundle(_compiled(median=5.0))
+    shadow = ShadowScorer(challenger)
+    columns = {"tenure_months": [np.nan, 2.0], "autopay": ["Yes", "No"]}
+    shadow.submit(np.array([0.5, 0.2]), compiled, X=compiled.transform_columns(columns), columns=columns)
+    _wait(shadow, 2)
+    assert not shadow.stats()["reuses_champion_matrix"]
+    assert challenger.seen[0][0, 0] == 5.0  # imputed with the challenger's median
+    shadow.close()
@@ -0,0 +1,58 @@
+import json
+import os
+import sys
+
+root_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if root_path not in sys.path:
+    sys.path.insert(0, root_path)
+
+from src.telemetry import Histogram, HistoryExporter, Telemetry
+
+
+def test_histogram_quantiles_within_bucket_error():
+    hist = Histogram()
+    for value in range(1, 10001):
+        hist.record(value)
+    for q in (0.5, 0.95, 0.99):
+        exact = q * 10000
+        assert exact <= hist.quantile(q) <= exact * 1.07
+
+
+def test_history_record_covers_only_the_last_interval():
+    telemetry = Telemetry()
+    telemetry.history_record()
+    for _ in range(10):
+        telemetry.count_request("application/json")
+        telemetry.stages["total"].record(500_000)  # 500 ms
+    telemetry.count_error("invalid_payload")
+    first = telemetry.history_record()
+    assert set(first) == {"ts", "roc_auc", "pr_auc", "acc", "latency_p95_ms", "error_rate"}
+    assert 500 <= first["latency_p95_ms"] <= 535
+    assert first["error_rate"] == 0.1
+
+    telemetry.count_request("application/json")
+    telemetry.stages["total"].record(1_000)
+    second = telemetry.history_record()
+    assert second["latency_p95_ms"] <= 1.07
+    assert second["error_rate"] == 0.0
+
+
+def test_prometheus_exposition_has_cumulative_buckets():
+    telemetry = Telemetry()
+    telemetry.stages["parse"].record(200)  # 0.2 ms
+    telemetry.observe_batch(32, 0.004)
+    text = telemetry.prometheus()
+    assert 'churn_predict_stage_seconds_bucket{stage="parse",le="0.0001"} 0' in text
+    assert 'churn_predict_stage_seconds_bucket{stage="parse",le="0.00025"} 1' in text
+    assert 'churn_predict_stage_seconds_count{stage="parse"} 1' in text
+    assert 'churn_model_batch_rows_bucket{le="16"} 0' in text
+    assert 'churn_model_batch_rows_bucket{le="64"} 1' in text
+
+
+def test_exporter_merges_extra_fields(tmp_path):
+    path = tmp_path / "history.jsonl"
+    exporter = HistoryExporter(Telemetry(), str(path), interval=3600,
+                               extra_fn=lambda: {"shadow_agreement": 0.97})
+    exporter.export()
+    record = json.loads(path.read_text())
+    assert record["shadow_agreement"] == 0.97 and "latency_p95_ms" in record
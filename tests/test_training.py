@@ -9,12 +9,13 @@ root_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if root_path not in sys.path:
     sys.path.insert(0, root_path)
 
+from src import registry
 from src.train import train_model
 
-def test_training_artifacts_exist():
+def test_training_artifacts_exist(tmp_path):
     """Test that training produces all required artifacts and meets ROC-AUC threshold."""
-    data_path = "data/customer_churn_synth.csv"
-    outdir = "artifacts"
+    data_path = os.path.join(root_path, "data", "customer_churn_synth.csv")
+    outdir = str(tmp_path)
 
     # Saves artifacts
     roc_auc = train_model(data_path, outdir)
@@ -35,6 +36,12 @@ def test_training_artifacts_exist():
     roc_auc = metrics["val_metrics"]["roc_auc"]
     assert roc_auc >= 0.83, f"ROC-AUC {roc_auc} is below required threshold 0.83"
 
+    # Published as a registry version, but only activated on request
+    assert len(registry.list_versions(outdir)) == 1
+    assert registry.active_version(outdir) is None
+
 if __name__ == "__main__":
-    test_training_artifacts_exist()
+    import tempfile
+    with tempfile.TemporaryDirectory() as tmp:
+        test_training_artifacts_exist(tmp)
     print("All tests passed!")
@@ -0,0 +1,53 @@
+import os
+import sys
+
+import numpy as np
+import xgboost as xgb
+
+root_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if root_path not in sys.path:
+    sys.path.insert(0, root_path)
+
+from src.models import BoosterModel
+from src.tree_compiler import TreeEnsemble, TreeModel
+
+
+def _data(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 4)).astype(np.float32)
+    X[:, 3] = rng.integers(0, 5, n)  # category codes
+    y = ((X[:, 0] + 0.5 * X[:, 1] > 0) ^ (X[:, 3] == 2)).astype(int)
+    X[:, :3][rng.random((n, 3)) < 0.1] = np.nan
+    return X, y
+
+
+def test_matches_booster_with_missing_values():
+    X, y = _data()
+    booster = xgb.train({"objective": "binary:logistic", "max_depth": 6, "base_score": 0.3},
+                        xgb.DMatrix(X, label=y), 50)
+    ensemble = TreeEnsemble.from_booster(booster)
+    assert ensemble.n_trees == 50 and ensemble.max_depth <= 6
+    np.testing.assert_allclose(ensemble.predict_proba(X), BoosterModel(booster).predict_proba(X), atol=1e-6)
+
+
+def test_matches_booster_with_categorical_splits():
+    X, y = _data()
+    types = ["q", "q", "q", "c"]
+    dtrain = xgb.DMatrix(X, label=y, feature_types=types, enable_categorical=True)
+    booster = xgb.train({"objective": "binary:logistic", "max_depth": 4, "tree_method": "hist",
+                         "max_cat_to_onehot": 1}, dtrain, 30)
+    ensemble = TreeEnsemble.from_booster(booster)
+    assert (ensemble.cat_row >= 0).any()
+    X[:3, 3] = [7, np.nan, 2]  # unseen and missing categories
+    expected = booster.predict(xgb.DMatrix(X, feature_types=types, enable_categorical=True))
+    np.testing.assert_allclose(ensemble.predict_proba(X), expected, atol=1e-6)
+
+
+def test_save_load_round_trip_and_block_boundaries(tmp_path):
+    X, y = _data()
+    booster = xgb.train({"objective": "binary:logistic", "max_depth": 3}, xgb.DMatrix(X, label=y), 10)
+    path = str(tmp_path / "model_trees.npz")
+    TreeEnsemble.from_booster(booster).save(path)
+    model = TreeModel.load(path)
+    np.testing.assert_array_equal(model.ensemble.margin(X, block_rows=7), model.ensemble.margin(X))
+    np.testing.assert_allclose(model.predict_proba(X), booster.inplace_predict(X), atol=1e-6)